@@ -0,0 +1,195 @@
+import argparse
+import functools
+import io
+import json
+import multiprocessing
+import os
+import signal
+import sys
+import time
+
+import interpreter
+import error
+
+
+# an exception raised in a worker when a case runs longer than the timeout
+class CaseTimeout(Exception):
+    pass
+
+
+# a class for one case of the manifest, the paths are relative to the directory of the manifest
+class Case:
+    def __init__(self, index, entry, directory):
+        self.index = index  # position in the manifest (the report keeps the order of the manifest)
+        self.source = os.path.join(directory, entry["source"])
+        self.input = os.path.join(directory, entry["input"]) if entry.get("input") else None
+        self.output = os.path.join(directory, entry["output"]) if entry.get("output") else None
+        self.exit_code = entry.get("exit_code", 0)
+        self.name = entry.get("name", entry["source"])
+
+
+# reads the manifest, every line is a JSON object with the keys:
+#   "source" - path to the XML source (required)
+#   "input" - path to the input file (an empty input if missing)
+#   "output" - path to the expected output (the output is not compared if missing)
+#   "exit_code" - expected exit code (0 if missing)
+#   "name" - name of the case in the report (the source if missing)
+def read_manifest(path):
+    directory = os.path.dirname(os.path.abspath(path))
+    cases = []
+    try:
+        with open(path, encoding="utf-8") as manifest:
+            for number, line in enumerate(manifest, 1):
+                if not line.strip():
+                    continue
+                try:
+                    cases.append(Case(len(cases), json.loads(line), directory))
+                except (ValueError, KeyError, TypeError):
+                    error.error_exit("Invalid case on line " + str(number) + " of the manifest!", 10)
+    except OSError:
+        error.error_exit("Cannot open the manifest file!", 11)
+    return cases
+
+
+# the settings of a worker process (set once by the initializer of the pool)
+worker_engine = "reference"
+worker_timeout = None
+
+
+def init_worker(engine, timeout):
+    global worker_engine, worker_timeout
+    worker_engine = engine
+    worker_timeout = timeout
+    signal.signal(signal.SIGINT, signal.SIG_IGN)  # the main process ends the pool on Ctrl+C
+    signal.signal(signal.SIGALRM, raise_timeout)
+
+
+def raise_timeout(signal_number, frame):
+    raise CaseTimeout()
+
+
+# loads the program once per worker, the cases of the same source reuse it
+# (a source that cannot be loaded is cached with its error, so it is not parsed again either)
+@functools.lru_cache(maxsize=1024)
+def load_program(source):
+    try:
+        return interpreter.load(source), None
+    except error.InterpretError as interpret_error:
+        return None, interpret_error
+
+
+# runs one case in a worker and returns the result for the report
+def run_case(case):
+    result = {"index": case.index, "name": case.name, "expected_exit_code": case.exit_code}
+    start = time.perf_counter()
+    try:
+        # the timer is started and cancelled inside the outer "try", so an alarm coming right after it is started
+        # or just before it is cancelled is still caught below
+        try:
+            if worker_timeout:
+                # the alarm interrupts the running program, so the worker is free for the next case
+                signal.setitimer(signal.ITIMER_REAL, worker_timeout)
+            program, load_error = load_program(case.source)
+            output = io.BytesIO()
+            if load_error is not None:
+                exit_code = load_error.exit_code
+            else:
+                with open(case.input, "rb") if case.input else io.BytesIO() as read_input:
+                    try:
+                        exit_code = interpreter.Interpreter(worker_engine, "exit").run(
+                            program, read_input, output, io.StringIO())
+                    except error.InterpretError as interpret_error:
+                        exit_code = interpret_error.exit_code
+        finally:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+    except CaseTimeout:
+        result["status"] = "timeout"
+        result["exit_code"] = None
+        return result
+    except Exception as exception:
+        # a bug of the interpreter (or an unreadable input) does not end the whole batch
+        result["status"] = "crashed"
+        result["exit_code"] = None
+        result["message"] = type(exception).__name__ + ": " + str(exception)
+        return result
+    finally:
+        result["time"] = time.perf_counter() - start
+
+    result["exit_code"] = exit_code
+    result["status"] = "passed"
+    if exit_code != case.exit_code:
+        result["status"] = "failed"
+    elif case.output is not None:
+        try:
+            with open(case.output, "rb") as expected:
+                if expected.read() != output.getvalue():
+                    result["status"] = "failed"
+                    result["message"] = "different output"
+        except OSError:
+            result["status"] = "crashed"
+            result["message"] = "cannot open the expected output"
+    return result
+
+
+# runs all the cases over a pool of processes and returns the results in the order of the manifest
+def run_batch(cases, jobs, engine, timeout):
+    # the cases of the same source go one after another, so a worker usually has the program loaded already
+    ordered = sorted(cases, key=lambda case: case.source)
+    chunk_size = max(1, min(64, len(cases) // (jobs * 8)))
+    results = [None] * len(cases)
+    with multiprocessing.Pool(jobs, init_worker, (engine, timeout)) as pool:
+        for result in pool.imap_unordered(run_case, ordered, chunk_size):
+            results[result["index"]] = result
+    return results
+
+
+# prints the report with a line for each case and a summary
+def write_report(results, elapsed, stream):
+    counts = {"passed": 0, "failed": 0, "timeout": 0, "crashed": 0}
+    for result in results:
+        counts[result["status"]] += 1
+        line = "{:<8} {:>9.3f}s  {}".format(result["status"].upper(), result["time"], result["name"])
+        if result["status"] == "failed" and result["exit_code"] != result["expected_exit_code"]:
+            line += "  (exit code {}, expected {})".format(result["exit_code"], result["expected_exit_code"])
+        elif "message" in result:
+            line += "  (" + result["message"] + ")"
+        stream.write(line + "\n")
+    stream.write("{} cases: {} passed, {} failed, {} timeout, {} crashed in {:.3f}s\n".format(
+        len(results), counts["passed"], counts["failed"], counts["timeout"], counts["crashed"], elapsed))
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run many IPPcode23 programs from a manifest in parallel.")
+    parser.add_argument("manifest", help="a path to the manifest (a JSON object for each case on a line)")
+    parser.add_argument("--jobs", dest="jobs", type=int, default=os.cpu_count() or 1,
+                        help="the number of worker processes (the number of cores by default)")
+    parser.add_argument("--timeout", dest="timeout", type=float, default=10.0,
+                        help="the maximum time of one case in seconds (0 for no limit)")
+    parser.add_argument("--engine", dest="engine", choices=["reference", "closure", "aot"], default="reference",
+                        help="the engine running the programs (see interpret.py)")
+    parser.add_argument("--report", dest="report", help="a path to write the results as JSON to")
+    arguments = parser.parse_args()
+
+    try:
+        if arguments.jobs < 1:
+            error.error_exit("The number of jobs has to be positive!", 10)
+        cases = read_manifest(arguments.manifest)
+    except error.InterpretError as interpret_error:
+        sys.stderr.write(interpret_error.message + "\n")
+        sys.exit(interpret_error.exit_code)
+
+    start = time.perf_counter()
+    results = run_batch(cases, arguments.jobs, arguments.engine, arguments.timeout)
+    elapsed = time.perf_counter() - start
+
+    counts = write_report(results, elapsed, sys.stdout)
+    if arguments.report is not None:
+        with open(arguments.report, "w", encoding="utf-8") as report:
+            json.dump({"elapsed": elapsed, "counts": counts, "cases": results}, report, indent=2)
+
+    sys.exit(0 if counts["passed"] == len(results) else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,263 @@
+import argparse
+import html
+import os
+import random
+
+
+# a class for building an IPPcode23 program in the XML format one instruction after another
+# (the orders grow by step plus a random gap and the instruction elements can be written shuffled,
+# the interpreter sorts them by their orders while loading)
+class ProgramBuilder:
+    types = ("int", "bool", "string", "nil", "label", "type")
+
+    def __init__(self, step=1, gap=0, shuffle=False, seed=0):
+        self.step = step
+        self.gap = gap
+        self.shuffle = shuffle
+        self.random = random.Random(seed)  # the same program is generated every time
+        self.elements = []  # XML of the instructions
+        self.order = 0
+
+    # adds an instruction, the arguments are written like in the source ("GF@x", "int@5", "string@a\032b")
+    # and labels and types of READ have their own prefixes ("label@loop", "type@int")
+    def add(self, opcode, *arguments):
+        self.order += self.step + (self.random.randint(0, self.gap) if self.gap else 0)
+        lines = ['  <instruction order="{}" opcode="{}">'.format(self.order, opcode)]
+        for position, argument in enumerate(arguments, 1):
+            prefix, value = argument.split("@", 1)
+            arg_type = prefix if prefix in ProgramBuilder.types else "var"
+            if arg_type == "var":
+                value = argument
+            lines.append('    <arg{0} type="{1}">{2}</arg{0}>'.format(position, arg_type, html.escape(value, False)))
+        lines.append("  </instruction>")
+        self.elements.append("\n".join(lines))
+
+    def xml(self):
+        elements = list(self.elements)
+        if self.shuffle:
+            self.random.shuffle(elements)
+        return ('<?xml version="1.0" encoding="UTF-8"?>\n<program language="IPPcode23">\n'
+                + "\n".join(elements) + "\n</program>\n").encode("utf-8")
+
+
+# WORKLOADS (each one gets its size and returns the XML of the program and its input as bytes):
+
+# a tight loop of integer arithmetic and a conditional jump
+def integer_loop(size):
+    program = ProgramBuilder()
+    for name in ("i", "t", "sum", "c"):
+        program.add("DEFVAR", "GF@" + name)
+    program.add("MOVE", "GF@i", "int@0")
+    program.add("MOVE", "GF@sum", "int@0")
+    program.add("LABEL", "label@loop")
+    program.add("MUL", "GF@t", "GF@i", "int@3")
+    program.add("IDIV", "GF@t", "GF@t", "int@2")
+    program.add("ADD", "GF@sum", "GF@sum", "GF@t")
+    program.add("SUB", "GF@sum", "GF@sum", "GF@i")
+    program.add("ADD", "GF@i", "GF@i", "int@1")
+    program.add("LT", "GF@c", "GF@i", "int@" + str(size // 8))
+    program.add("JUMPIFEQ", "label@loop", "GF@c", "bool@true")
+    program.add("WRITE", "GF@sum")
+    return program.xml(), b""
+
+
+# recursive functions with their own frames (CREATEFRAME, PUSHFRAME, CALL, POPFRAME and RETURN),
+# every call goes 100 calls deep
+def recursion(size):
+    depth = 100
+    program = ProgramBuilder()
+    for name in ("ret", "total", "j"):
+        program.add("DEFVAR", "GF@" + name)
+    program.add("MOVE", "GF@total", "int@0")
+    program.add("MOVE", "GF@j", "int@0")
+    program.add("LABEL", "label@repeat")
+    program.add("CREATEFRAME")
+    program.add("DEFVAR", "TF@k")
+    program.add("MOVE", "TF@k", "int@" + str(depth))
+    program.add("CALL", "label@sum")
+    program.add("ADD", "GF@total", "GF@total", "GF@ret")
+    program.add("ADD", "GF@j", "GF@j", "int@1")
+    program.add("JUMPIFNEQ", "label@repeat", "GF@j", "int@" + str(max(1, size // (depth * 11))))
+    program.add("WRITE", "GF@total")
+    program.add("JUMP", "label@end")
+
+    # sum(k) = k + sum(k - 1), the result is in GF@ret
+    program.add("LABEL", "label@sum")
+    program.add("PUSHFRAME")
+    program.add("JUMPIFEQ", "label@base", "LF@k", "int@0")
+    program.add("CREATEFRAME")
+    program.add("DEFVAR", "TF@k")
+    program.add("SUB", "TF@k", "LF@k", "int@1")
+    program.add("CALL", "label@sum")
+    program.add("ADD", "GF@ret", "GF@ret", "LF@k")
+    program.add("POPFRAME")
+    program.add("RETURN")
+    program.add("LABEL", "label@base")
+    program.add("MOVE", "GF@ret", "int@0")
+    program.add("POPFRAME")
+    program.add("RETURN")
+    program.add("LABEL", "label@end")
+    return program.xml(), b""
+
+
+# a string built by CONCAT one character at a time, then changed by GETCHAR, STRI2INT and SETCHAR
+def string_building(size):
+    length = size // 16
+    program = ProgramBuilder()
+    for name in ("s", "c", "i", "n", "k"):
+        program.add("DEFVAR", "GF@" + name)
+    program.add("MOVE", "GF@s", "string@")
+    program.add("MOVE", "GF@i", "int@0")
+    program.add("LABEL", "label@build")
+    program.add("IDIV", "GF@k", "GF@i", "int@26")
+    program.add("MUL", "GF@k", "GF@k", "int@26")
+    program.add("SUB", "GF@k", "GF@i", "GF@k")
+    program.add("ADD", "GF@k", "GF@k", "int@97")
+    program.add("INT2CHAR", "GF@c", "GF@k")
+    program.add("CONCAT", "GF@s", "GF@s", "GF@c")
+    program.add("ADD", "GF@i", "GF@i", "int@1")
+    program.add("JUMPIFNEQ", "label@build", "GF@i", "int@" + str(length))
+
+    # every character is made upper case
+    program.add("MOVE", "GF@i", "int@0")
+    program.add("STRLEN", "GF@n", "GF@s")
+    program.add("LABEL", "label@change")
+    program.add("GETCHAR", "GF@c", "GF@s", "GF@i")
+    program.add("STRI2INT", "GF@k", "GF@s", "GF@i")
+    program.add("SUB", "GF@k", "GF@k", "int@32")
+    program.add("INT2CHAR", "GF@c", "GF@k")
+    program.add("SETCHAR", "GF@s", "GF@i", "GF@c")
+    program.add("ADD", "GF@i", "GF@i", "int@1")
+    program.add("JUMPIFNEQ", "label@change", "GF@i", "GF@n")
+    program.add("STRLEN", "GF@n", "GF@s")
+    program.add("WRITE", "GF@n")
+    program.add("GETCHAR", "GF@c", "GF@s", "int@0")
+    program.add("WRITE", "GF@c")
+    return program.xml(), b""
+
+
+# lines of the input read as integers and strings until the input ends
+def input_processing(size):
+    program = ProgramBuilder()
+    for name in ("x", "s", "n", "sum", "t"):
+        program.add("DEFVAR", "GF@" + name)
+    program.add("MOVE", "GF@sum", "int@0")
+    program.add("LABEL", "label@read")
+    program.add("READ", "GF@x", "type@int")
+    program.add("TYPE", "GF@t", "GF@x")
+    program.add("JUMPIFEQ", "label@done", "GF@t", "string@nil")
+    program.add("ADD", "GF@sum", "GF@sum", "GF@x")
+    program.add("READ", "GF@s", "type@string")
+    program.add("TYPE", "GF@t", "GF@s")
+    program.add("JUMPIFEQ", "label@done", "GF@t", "string@nil")
+    program.add("STRLEN", "GF@n", "GF@s")
+    program.add("ADD", "GF@sum", "GF@sum", "GF@n")
+    program.add("JUMP", "label@read")
+    program.add("LABEL", "label@done")
+    program.add("WRITE", "GF@sum")
+    read_input = "".join("{}\nline number {}\n".format(number, number) for number in range(size // 10))
+    return program.xml(), read_input.encode("utf-8")
+
+
+# long lines of the input read as strings until the input ends (like a program reading a large text file,
+# the input is kept small, so its generation does not grow the peak memory of the other workloads)
+def input_lines(size):
+    program = ProgramBuilder()
+    for name in ("s", "n", "sum", "t"):
+        program.add("DEFVAR", "GF@" + name)
+    program.add("MOVE", "GF@sum", "int@0")
+    program.add("LABEL", "label@read")
+    program.add("READ", "GF@s", "type@string")
+    program.add("TYPE", "GF@t", "GF@s")
+    program.add("JUMPIFEQ", "label@done", "GF@t", "string@nil")
+    program.add("STRLEN", "GF@n", "GF@s")
+    program.add("ADD", "GF@sum", "GF@sum", "GF@n")
+    program.add("JUMP", "label@read")
+    program.add("LABEL", "label@done")
+    program.add("WRITE", "GF@sum")
+    line = "".join(chr(ord("a") + number % 26) for number in range(399))
+    read_input = "".join("{} {}\n".format(number, line) for number in range(size // 30))
+    return program.xml(), read_input.encode("utf-8")
+
+
+# values of all the types written in a loop
+def output(size):
+    program = ProgramBuilder()
+    for name in ("i", "b"):
+        program.add("DEFVAR", "GF@" + name)
+    program.add("MOVE", "GF@i", "int@0")
+    program.add("LABEL", "label@write")
+    program.add("WRITE", "GF@i")
+    program.add("WRITE", "string@\\032value\\032")
+    program.add("LT", "GF@b", "GF@i", "int@100")
+    program.add("WRITE", "GF@b")
+    program.add("WRITE", "nil@nil")
+    program.add("WRITE", "string@\\010")
+    program.add("ADD", "GF@i", "GF@i", "int@1")
+    program.add("JUMPIFNEQ", "label@write", "GF@i", "int@" + str(size // 8))
+    return program.xml(), b""
+
+
+# a long loop body of instructions with large random gaps between their orders, the instructions are written
+# shuffled (so loading has to sort them)
+def sparse_orders(size):
+    body = 1000
+    program = ProgramBuilder(step=1000, gap=100000, shuffle=True)
+    program.add("DEFVAR", "GF@i")
+    program.add("DEFVAR", "GF@x")
+    program.add("MOVE", "GF@i", "int@0")
+    program.add("MOVE", "GF@x", "int@0")
+    program.add("LABEL", "label@loop")
+    for number in range(body):
+        program.add("ADD", "GF@x", "GF@x", "int@" + str(number % 7))
+    program.add("ADD", "GF@i", "GF@i", "int@1")
+    program.add("JUMPIFNEQ", "label@loop", "GF@i", "int@" + str(max(1, size // (body + 2))))
+    program.add("WRITE", "GF@x")
+    return program.xml(), b""
+
+
+# name of the workload : function generating it
+workloads = {
+    "integer_loop": integer_loop,
+    "recursion": recursion,
+    "string_building": string_building,
+    "input_processing": input_processing,
+    "input_lines": input_lines,
+    "output": output,
+    "sparse_orders": sparse_orders,
+}
+
+default_size = 1000000  # about the number of executed instructions of every workload
+
+
+# writes the programs (NAME.xml) and their inputs (NAME.in) into the directory, returns the paths
+# as {name: (source, input)}
+def write_workloads(directory, names, size):
+    os.makedirs(directory, exist_ok=True)
+    paths = {}
+    for name in names:
+        source, read_input = workloads[name](size)
+        paths[name] = (os.path.join(directory, name + ".xml"), os.path.join(directory, name + ".in"))
+        with open(paths[name][0], "wb") as file:
+            file.write(source)
+        with open(paths[name][1], "wb") as file:
+            file.write(read_input)
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate the IPPcode23 programs of the benchmarks.")
+    parser.add_argument("directory", help="a path to the directory to write the programs and their inputs to")
+    parser.add_argument("--workload", dest="workloads", action="append", choices=list(workloads),
+                        help="generate only the given workload (can be repeated)")
+    parser.add_argument("--scale", dest="scale", type=float, default=1.0,
+                        help="multiply the size of the workloads")
+    arguments = parser.parse_args()
+
+    for name, (source, read_input) in write_workloads(arguments.directory, arguments.workloads or list(workloads),
+                                                      int(default_size * arguments.scale)).items():
+        print(source)
+
+
+if __name__ == '__main__':
+    main()
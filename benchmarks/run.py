@@ -0,0 +1,180 @@
+import argparse
+import io
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import sys
+import tempfile
+import time
+
+# the modules of the interpreter are in the parent directory
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import interpreter
+import optimizer
+import profiler
+import error
+import generate
+
+
+# loads and runs one workload in a new process (so the peak memory is only of this workload) and returns
+# its result, the times are the best of the repeated loads and runs
+def measure(name, source, input_path, engine, optimize, repeat):
+    result = {"workload": name, "engine": engine, "optimize": optimize}
+
+    load_times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        program = interpreter.load(source)
+        load_times.append(time.perf_counter() - start)
+    if optimize:
+        program, statistics = optimizer.optimize(program)
+
+    # the aot engine translates the program on the first run, the next runs use the translated function
+    run_times = []
+    for _ in range(repeat):
+        with open(input_path, "rb") as read_input:
+            start = time.perf_counter()
+            try:
+                interpreter.Interpreter(engine).run(program, read_input, io.BytesIO(), io.StringIO())
+            except error.InterpretError as interpret_error:
+                result["error"] = interpret_error.message
+            run_times.append(time.perf_counter() - start)
+
+    # ru_maxrss is in kilobytes on Linux (and in bytes on macOS)
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    result["peak_memory"] = peak if sys.platform == "darwin" else peak * 1024
+
+    # the instructions of the loaded program are counted by the profiler in another run (fused instructions
+    # of the optimized program would be counted as one)
+    program_profiler = profiler.Profiler()
+    with open(input_path, "rb") as read_input:
+        try:
+            interpreter.Interpreter("reference", profiler=program_profiler).run(
+                interpreter.load(source), read_input, io.BytesIO(), io.StringIO())
+        except error.InterpretError:
+            pass
+
+    result["instructions"] = sum(program_profiler.counts)
+    result["load_time"] = min(load_times)
+    result["run_time"] = min(run_times)
+    result["instructions_per_second"] = result["instructions"] / result["run_time"] if result["run_time"] else 0.0
+    return result
+
+
+def run_measure(arguments):
+    return measure(*arguments)
+
+
+# runs all the measurements one after another, every one in its own process
+def run_benchmarks(paths, engines, optimize, repeat):
+    context = multiprocessing.get_context("spawn")
+    with context.Pool(1, maxtasksperchild=1) as pool:
+        for name, (source, input_path) in paths.items():
+            for engine in engines:
+                yield pool.apply(run_measure, ((name, source, input_path, engine, optimize, repeat),))
+
+
+# compares the results with the baseline, returns a list of (result, the changes that are regressions)
+# (the instructions per second must not drop and the load time and the peak memory must not grow
+# by more than the threshold)
+def compare(results, baseline, threshold):
+    old_results = {(result["workload"], result["engine"], result["optimize"]): result
+                   for result in baseline["results"]}
+    comparison = []
+    for result in results:
+        old = old_results.get((result["workload"], result["engine"], result["optimize"]))
+        if old is None:
+            comparison.append((result, None))
+            continue
+        changes = {key: (result[key] - old[key]) / old[key] if old[key] else 0.0
+                   for key in ("instructions_per_second", "load_time", "peak_memory")}
+        regressions = [key for key, change in changes.items()
+                       if (-change if key == "instructions_per_second" else change) > threshold]
+        comparison.append((result, (changes, regressions)))
+    return comparison
+
+
+# prints a line for a result with the changes against the baseline
+def write_result(result, compared, stream):
+    line = "{:<18} {:<10} {:>12} {:>10.2f} {:>10.2f} {:>12.0f} {:>10.1f}".format(
+        result["workload"], result["engine"], result["instructions"], result["load_time"] * 1e3,
+        result["run_time"] * 1e3, result["instructions_per_second"], result["peak_memory"] / 2 ** 20)
+    if compared is not None:
+        changes, regressions = compared
+        line += "  {:+6.1f}% {:+6.1f}% {:+6.1f}%".format(changes["instructions_per_second"] * 100,
+                                                         changes["load_time"] * 100, changes["peak_memory"] * 100)
+        if regressions:
+            line += "  REGRESSION (" + ", ".join(regressions) + ")"
+    if "error" in result:
+        line += "  (" + result["error"] + ")"
+    stream.write(line + "\n")
+    stream.flush()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the benchmarks of the IPPcode23 interpreter and compare "
+                                                 "them with a baseline.")
+    parser.add_argument("--workload", dest="workloads", action="append", choices=list(generate.workloads),
+                        help="run only the given workload (can be repeated)")
+    parser.add_argument("--engine", dest="engines", action="append", choices=["reference", "closure", "aot"],
+                        help="run only the given engine (can be repeated)")
+    parser.add_argument("--optimize", dest="optimize", action="store_true",
+                        help="run the peephole optimizer over the loaded programs")
+    parser.add_argument("--scale", dest="scale", type=float, default=1.0,
+                        help="multiply the size of the workloads")
+    parser.add_argument("--repeat", dest="repeat", type=int, default=3,
+                        help="the number of loads and runs of each workload (the best time is reported)")
+    parser.add_argument("--baseline", dest="baseline",
+                        help="a path to the results of an earlier run (JSON) to compare with")
+    parser.add_argument("--threshold", dest="threshold", type=float, default=10.0,
+                        help="the change against the baseline in percent reported as a regression")
+    parser.add_argument("--save", dest="save", help="a path to write the results as JSON to")
+    arguments = parser.parse_args()
+
+    baseline = None
+    if arguments.baseline is not None:
+        try:
+            with open(arguments.baseline, encoding="utf-8") as file:
+                baseline = json.load(file)
+        except (OSError, ValueError):
+            sys.stderr.write("Cannot read the baseline file!\n")
+            sys.exit(11)
+        if baseline.get("scale") != arguments.scale:
+            sys.stderr.write("The baseline was measured with another scale!\n")
+            sys.exit(10)
+    if arguments.repeat < 1:
+        sys.stderr.write("The number of repeats has to be positive!\n")
+        sys.exit(10)
+
+    sys.stdout.write("{:<18} {:<10} {:>12} {:>10} {:>10} {:>12} {:>10}{}\n".format(
+        "workload", "engine", "instructions", "load [ms]", "run [ms]", "instr/s", "peak [MiB]",
+        "" if baseline is None else "  instr/s    load    peak"))
+
+    results = []
+    regressed = False
+    with tempfile.TemporaryDirectory() as directory:
+        paths = generate.write_workloads(directory, arguments.workloads or list(generate.workloads),
+                                         int(generate.default_size * arguments.scale))
+        for result in run_benchmarks(paths, arguments.engines or ["reference", "closure", "aot"],
+                                     arguments.optimize, arguments.repeat):
+            results.append(result)
+            compared = None
+            if baseline is not None:
+                compared = compare([result], baseline, arguments.threshold / 100)[0][1]
+                regressed = regressed or (compared is not None and bool(compared[1]))
+            write_result(result, compared, sys.stdout)
+
+    if arguments.save is not None:
+        document = {"python": platform.python_version(), "scale": arguments.scale, "repeat": arguments.repeat,
+                    "results": results}
+        with open(arguments.save, "w", encoding="utf-8") as file:
+            json.dump(document, file, indent=2)
+
+    sys.exit(1 if regressed else 0)
+
+
+if __name__ == '__main__':
+    main()
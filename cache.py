@@ -0,0 +1,138 @@
+import functools
+import hashlib
+import os
+import pickle
+import tempfile
+import time
+
+import error
+
+
+# the version of the cached programs, it has to be changed whenever the instruction classes change
+VERSION = "5"
+
+
+# a class for a binary file adding the bytes read from it to a hash of the source (the parser reads through it)
+class HashingFile:
+    def __init__(self, file):
+        self.file = file
+        self.digest = hashlib.sha256(VERSION.encode())
+
+    def read(self, size=-1):
+        data = self.file.read(size)
+        self.digest.update(data)
+        return data
+
+    # gets the hash of the whole file (the rest the parser did not read is read now)
+    def key(self):
+        for _ in iter(functools.partial(self.read, ProgramCache.chunk_size), b""):
+            pass
+        return self.digest.hexdigest()
+
+
+# a class for storing loaded programs (memory.Program with the sorted instructions and the labels) in a directory,
+# the files are named by a hash of the source and the version, so a changed source is simply a new entry
+class ProgramCache:
+    stale_age = 3600  # seconds after which a temporary file is left by a killed writer (and can be removed)
+    chunk_size = 1 << 16  # number of bytes hashed at once
+    spool_size = 1 << 20  # number of bytes of a source that cannot be read again kept in the memory
+
+    def __init__(self, directory, max_size):
+        self.directory = directory
+        self.max_size = max_size  # the oldest entries are removed once the directory is bigger than this
+
+    # gets the hash of the source (read in chunks) and the source to parse on a miss, a path is opened again
+    # and a file that cannot be read again (the standard input) is copied into a temporary file meanwhile
+    def key(self, source):
+        if isinstance(source, str):
+            try:
+                with open(source, "rb") as file:
+                    return HashingFile(file).key(), source
+            except OSError:
+                error.error_exit("Cannot open the source file!", 11)
+
+        spool = tempfile.SpooledTemporaryFile(ProgramCache.spool_size)
+        hashed = HashingFile(source)
+        for chunk in iter(functools.partial(hashed.read, ProgramCache.chunk_size), b""):
+            spool.write(chunk)
+        spool.seek(0)
+        return hashed.key(), spool
+
+    # loads the program from the source (got by key) by the function and saves it with the hash of the bytes
+    # that were parsed (a file changed since it was hashed is saved with its new hash, so an entry always
+    # belongs to its key)
+    def load_source(self, source, load):
+        if isinstance(source, str):
+            try:
+                source = open(source, "rb")
+            except OSError:
+                error.error_exit("Cannot open the source file!", 11)
+        with source:
+            hashed = HashingFile(source)
+            program = load(hashed)
+            key = hashed.key()
+        self.store(key, program)
+        return program
+
+    def path(self, key):
+        return os.path.join(self.directory, key + ".pickle")
+
+    # gets the program saved with the key or None if there is none (or it is unreadable)
+    def load(self, key):
+        try:
+            with open(self.path(key), "rb") as file:
+                program = pickle.load(file)
+            os.utime(self.path(key))  # the entry was used, so it is the last one to be removed
+            return program
+        except Exception:
+            # a missing entry, an entry removed by another process right now or a damaged one
+            return None
+
+    # saves the program with the key, the file is written under a temporary name and then
+    # renamed, so other processes never see a half-written entry
+    def store(self, key, program):
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            descriptor, temporary = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            try:
+                with os.fdopen(descriptor, "wb") as file:
+                    pickle.dump(program, file, protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(temporary, self.path(key))
+            except BaseException:
+                os.unlink(temporary)
+                raise
+            self.evict()
+        except OSError:
+            # the program can run without the cache
+            pass
+
+    # removes the least recently used entries until the directory fits into the maximum size
+    # and the temporary files of writers killed before they renamed them
+    def evict(self):
+        entries = []
+        total_size = 0
+        stale = time.time() - ProgramCache.stale_age
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(".tmp"):
+                try:
+                    if entry.stat().st_mtime < stale:
+                        os.unlink(entry.path)
+                except FileNotFoundError:
+                    pass  # renamed or removed by another process
+            elif entry.name.endswith(".pickle"):
+                try:
+                    status = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((status.st_mtime, status.st_size, entry.path))
+                total_size += status.st_size
+
+        entries.sort()
+        for modified, size, path in entries:
+            if total_size <= self.max_size:
+                break
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass  # removed by another process
+            total_size -= size
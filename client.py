@@ -0,0 +1,106 @@
+import socket
+import sys
+
+import protocol
+
+
+usage = ("usage: client.py [--source SOURCE] [--input INPUT] [--engine {reference,closure,aot}]\n"
+         "                 [--flush {always,line,exit}] [--socket SOCKET]\n")
+
+
+# parses the arguments like interpret.py does (argparse is not imported, the client has to start fast)
+def parse_arguments(arguments):
+    options = {"source": None, "input": None, "engine": None, "flush": "line", "socket": protocol.default_socket()}
+    choices = {"engine": protocol.engines, "flush": protocol.flush_policies}
+    arguments = iter(arguments)
+    for argument in arguments:
+        if argument in ("-h", "--help"):
+            sys.stdout.write(usage)
+            sys.exit(0)
+        name, separator, value = argument.partition("=")
+        if not name.startswith("--") or name[2:] not in options:
+            sys.stderr.write(usage + "client.py: error: unrecognized argument: " + argument + "\n")
+            sys.exit(2)
+        if not separator:
+            value = next(arguments, None)
+            if value is None:
+                sys.stderr.write(usage + "client.py: error: argument " + name + ": expected one argument\n")
+                sys.exit(2)
+        if name[2:] in choices and value not in choices[name[2:]]:
+            sys.stderr.write(usage + "client.py: error: argument " + name + ": invalid choice: " + value + "\n")
+            sys.exit(2)
+        options[name[2:]] = value
+    return options
+
+
+# sends the request to the server and writes the output of the program as it comes,
+# returns the exit code of the program
+def request(options):
+    header = {"source": None, "program_size": 0, "input_size": 0, "flush": options["flush"]}
+    if options["engine"] is not None:
+        header["engine"] = options["engine"]
+
+    # the program is sent (the server opens only the files inside its root), the server finds
+    # a program it loaded before by the hash of the bytes
+    if options["source"] is not None:
+        try:
+            with open(options["source"], "rb") as file:
+                program = file.read()
+        except OSError:
+            sys.stderr.write("Cannot open the source file!\n")
+            return 11
+    else:
+        program = sys.stdin.buffer.read()
+    header["program_size"] = len(program)
+
+    if options["input"] is not None:
+        try:
+            with open(options["input"], "rb") as file:
+                read_input = file.read()
+        except OSError:
+            sys.stderr.write("Cannot open the input file!\n")
+            return 11
+    else:
+        read_input = sys.stdin.buffer.read()
+    header["input_size"] = len(read_input)
+
+    connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        connection.connect(options["socket"])
+    except OSError:
+        sys.stderr.write("Cannot connect to the server on " + options["socket"] + "!\n")
+        return 99
+
+    with connection, connection.makefile("rwb") as file:
+        protocol.write_header(file, header)
+        file.write(program)
+        file.write(read_input)
+        file.flush()
+
+        try:
+            while True:
+                kind, data = protocol.read_frame(file)
+                if kind == protocol.OUTPUT:
+                    sys.stdout.buffer.write(data)
+                    sys.stdout.buffer.flush()
+                elif kind == protocol.ERROR:
+                    sys.stdout.buffer.flush()
+                    sys.stderr.buffer.write(data)
+                    sys.stderr.buffer.flush()
+                else:
+                    return int(data)
+        except EOFError:
+            sys.stderr.write("The server closed the connection!\n")
+            return 99
+
+
+def main():
+    options = parse_arguments(sys.argv[1:])
+    if options["source"] is None and options["input"] is None:
+        sys.stderr.write("No argument was specified!\n")
+        sys.exit(10)
+    sys.exit(request(options))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,788 @@
+import functools
+import gc
+import itertools
+import operator
+
+import instructions as ins
+import memory as mem
+import error
+
+
+# a helper function for getting a function that returns the dictionary of the frame of a given variable
+# (the global frame never changes, so its dictionary is bound right away, repeat() returns it without
+# calling any Python code)
+def make_frame_getter(var, vm):
+    if var.frame == "global_f":
+        return itertools.repeat(vm.global_f.dictionary).__next__
+
+    frame_name = var.frame
+
+    def get_frame():
+        frame = getattr(vm, frame_name)
+        if frame is None:
+            error.error_exit("The frame does not exists!", 55)
+        return frame.dictionary
+
+    return get_frame
+
+
+# a helper function for getting a function that returns the value of a symbol
+# (with buffer, a string in a character buffer is returned as the buffer, see memory.CharBuffer)
+def make_reader(symbol, vm, buffer=False):
+    # constants were decoded while parsing
+    if symbol.arg_type != "var":
+        return itertools.repeat(symbol.value).__next__
+
+    name = symbol.name
+    uninitialized = mem.UNINITIALIZED
+
+    # only the variables changed by SETCHAR can hold a character buffer
+    if not buffer and name in ins.buffered_names(vm.program):
+        return make_string_reader(symbol, vm)
+
+    if symbol.frame == "global_f":
+        dictionary = vm.global_f.dictionary
+
+        def read_global():
+            value = dictionary.get(name, uninitialized)
+            if value is uninitialized:
+                error.error_exit("The variable does not exist!", 54)
+            return value
+
+        return read_global
+
+    get_frame = make_frame_getter(symbol, vm)
+
+    def read():
+        value = get_frame().get(name, uninitialized)
+        if value is uninitialized:
+            error.error_exit("The variable does not exist!", 54)
+        return value
+
+    return read
+
+
+# a helper function for getting a function that returns the value of a variable that can hold a character
+# buffer, the variable gets the string back from the buffer
+def make_string_reader(symbol, vm):
+    get_frame = make_frame_getter(symbol, vm)
+    name = symbol.name
+    uninitialized = mem.UNINITIALIZED
+    char_buffer = mem.CharBuffer
+
+    def read_string():
+        frame = get_frame()
+        value = frame.get(name, uninitialized)
+        if value is uninitialized:
+            error.error_exit("The variable does not exist!", 54)
+        if type(value) is char_buffer:
+            value = frame[name] = value.string()
+        return value
+
+    return read_string
+
+
+# MOVE, POPS and other instructions storing a value without any checks
+def compile_move(instruction, vm):
+    get_frame = make_frame_getter(instruction.arg1, vm)
+    name = instruction.arg1.name
+    read = make_reader(instruction.arg2, vm)
+
+    def move():
+        frame = get_frame()
+        value = read()
+        if name in frame:
+            frame[name] = value
+        else:
+            error.error_exit("The variable does not exist!", 54)
+
+    return move
+
+
+def compile_pushs(instruction, vm):
+    stack = vm.stack.list
+    read = make_reader(instruction.arg1, vm)
+
+    def pushs():
+        stack.append(read())
+
+    return pushs
+
+
+def compile_pops(instruction, vm):
+    get_frame = make_frame_getter(instruction.arg1, vm)
+    name = instruction.arg1.name
+    stack = vm.stack.list
+
+    def pops():
+        frame = get_frame()
+        if len(stack) == 0:
+            error.error_exit("The stack is empty!", 56)
+        value = stack.pop()
+        if name in frame:
+            frame[name] = value
+        else:
+            error.error_exit("The variable does not exist!", 54)
+
+    return pops
+
+
+# ADD, SUB and MUL, the operation is one of the functions from the operator module
+def compile_arithmetic(instruction, vm, operation):
+    get_frame = make_frame_getter(instruction.arg1, vm)
+    name = instruction.arg1.name
+    read1 = make_reader(instruction.arg2, vm)
+    read2 = make_reader(instruction.arg3, vm)
+
+    def arithmetic():
+        frame = get_frame()
+        value1 = read1()
+        value2 = read2()
+        if type(value1) != int or type(value2) != int:
+            error.error_exit("Wrong operand type!", 53)
+        if name in frame:
+            frame[name] = operation(value1, value2)
+        else:
+            error.error_exit("The variable does not exist!", 54)
+
+    return arithmetic
+
+
+def compile_idiv(instruction, vm):
+    get_frame = make_frame_getter(instruction.arg1, vm)
+    name = instruction.arg1.name
+    read1 = make_reader(instruction.arg2, vm)
+    read2 = make_reader(instruction.arg3, vm)
+
+    def idiv():
+        frame = get_frame()
+        value1 = read1()
+        value2 = read2()
+        if type(value1) != int or type(value2) != int:
+            error.error_exit("Wrong operand type!", 53)
+        elif value2 == 0:
+            error.error_exit("Division by zero!", 57)
+        if name in frame:
+            frame[name] = value1 // value2
+        else:
+            error.error_exit("The variable does not exist!", 54)
+
+    return idiv
+
+
+# LT and GT, the operation is one of the functions from the operator module
+def compile_relational(instruction, vm, operation):
+    get_frame = make_frame_getter(instruction.arg1, vm)
+    name = instruction.arg1.name
+    read1 = make_reader(instruction.arg2, vm)
+    read2 = make_reader(instruction.arg3, vm)
+
+    def relational():
+        frame = get_frame()
+        value1 = read1()
+        value2 = read2()
+        if value1 is None or value2 is None:
+            error.error_exit("Cannot compare with nil@nil", 53)
+        elif not type(value1) == type(value2):
+            error.error_exit("Cannot compare operands with different types!", 53)
+        if name in frame:
+            frame[name] = operation(value1, value2)
+        else:
+            error.error_exit("The variable does not exist!", 54)
+
+    return relational
+
+
+def compile_eq(instruction, vm):
+    get_frame = make_frame_getter(instruction.arg1, vm)
+    name = instruction.arg1.name
+    read1 = make_reader(instruction.arg2, vm)
+    read2 = make_reader(instruction.arg3, vm)
+
+    def eq():
+        frame = get_frame()
+        value1 = read1()
+        value2 = read2()
+        if not type(value1) == type(value2) and value1 is not None and value2 is not None:
+            error.error_exit("Cannot compare operands with different types!", 53)
+        if name in frame:
+            frame[name] = value1 == value2
+        else:
+            error.error_exit("The variable does not exist!", 54)
+
+    return eq
+
+
+# AND and OR, the operation is a function of two bools
+def compile_logical(instruction, vm, operation):
+    get_frame = make_frame_getter(instruction.arg1, vm)
+    name = instruction.arg1.name
+    read1 = make_reader(instruction.arg2, vm)
+    read2 = make_reader(instruction.arg3, vm)
+
+    def logical():
+        frame = get_frame()
+        value1 = read1()
+        value2 = read2()
+        if type(value1) != bool or type(value2) != bool:
+            error.error_exit("Wrong operand type!", 53)
+        if name in frame:
+            frame[name] = operation(value1, value2)
+        else:
+            error.error_exit("The variable does not exist!", 54)
+
+    return logical
+
+
+def compile_not(instruction, vm):
+    get_frame = make_frame_getter(instruction.arg1, vm)
+    name = instruction.arg1.name
+    read = make_reader(instruction.arg2, vm)
+
+    def not_():
+        frame = get_frame()
+        value = read()
+        if type(value) != bool:
+            error.error_exit("Wrong operand type!", 53)
+        if name in frame:
+            frame[name] = not value
+        else:
+            error.error_exit("The variable does not exist!", 54)
+
+    return not_
+
+
+def compile_concat(instruction, vm):
+    if instruction.appends():
+        return compile_append(instruction, vm)
+
+    get_frame = make_frame_getter(instruction.arg1, vm)
+    name = instruction.arg1.name
+    read1 = make_reader(instruction.arg2, vm)
+    read2 = make_reader(instruction.arg3, vm)
+
+    def concat():
+        frame = get_frame()
+        value1 = read1()
+        value2 = read2()
+        if type(value1) != str or type(value2) != str:
+            error.error_exit("Wrong operand type!", 53)
+        if name in frame:
+            frame[name] = value1 + value2
+        else:
+            error.error_exit("The variable does not exist!", 54)
+
+    return concat
+
+
+# CONCAT appending to the string of its own variable, the variable drops its string first, so if nothing
+# else refers to it, CPython resizes the string in place instead of copying it (see instructions.Concat)
+def compile_append(instruction, vm):
+    get_frame = make_frame_getter(instruction.arg1, vm)
+    name = instruction.arg1.name
+    read = make_reader(instruction.arg3, vm)
+    uninitialized = mem.UNINITIALIZED
+    char_buffer = mem.CharBuffer
+    checked = instruction.checked
+
+    def append():
+        frame = get_frame()
+        value1 = frame.get(name, uninitialized)
+        if value1 is uninitialized:
+            error.error_exit("The variable does not exist!", 54)
+        if type(value1) is char_buffer:
+            value1 = value1.string()
+        value2 = read()
+        if checked and (type(value1) != str or type(value2) != str):
+            error.error_exit("Wrong operand type!", 53)
+        frame[name] = None
+        value1 += value2
+        frame[name] = value1
+
+    return append
+
+
+def compile_strlen(instruction, vm):
+    get_frame = make_frame_getter(instruction.arg1, vm)
+    name = instruction.arg1.name
+    read = make_reader(instruction.arg2, vm, buffer=True)
+    strings = ins.string_types
+
+    def strlen():
+        frame = get_frame()
+        value = read()
+        if type(value) not in strings:
+            error.error_exit("Wrong operand type!", 53)
+        if name in frame:
+            frame[name] = len(value)
+        else:
+            error.error_exit("The variable does not exist!", 54)
+
+    return strlen
+
+
+def compile_getchar(instruction, vm):
+    get_frame = make_frame_getter(instruction.arg1, vm)
+    name = instruction.arg1.name
+    read1 = make_reader(instruction.arg2, vm, buffer=True)
+    read2 = make_reader(instruction.arg3, vm)
+    strings = ins.string_types
+
+    def getchar():
+        frame = get_frame()
+        value1 = read1()
+        value2 = read2()
+        if type(value1) not in strings or type(value2) != int:
+            error.error_exit("Wrong operand type!", 53)
+        elif value2 >= len(value1):
+            error.error_exit("Index out of range!", 58)
+        character = value1[value2]  # taken before the target is checked, like the reference engine does
+        if name in frame:
+            frame[name] = character
+        else:
+            error.error_exit("The variable does not exist!", 54)
+
+    return getchar
+
+
+# SETCHAR changes the string in the character buffer of the variable (see instructions.SetChar)
+def compile_setchar(instruction, vm):
+    get_frame = make_frame_getter(instruction.arg1, vm)
+    name = instruction.arg1.name
+    read1 = make_reader(instruction.arg1, vm, buffer=True)
+    read2 = make_reader(instruction.arg2, vm)
+    read3 = make_reader(instruction.arg3, vm)
+    strings = ins.string_types
+    char_buffer = mem.CharBuffer
+
+    def setchar():
+        frame = get_frame()
+        value1 = read1()
+        value2 = read2()
+        value3 = read3()
+        if type(value1) not in strings or type(value2) != int or type(value3) != str:
+            error.error_exit("Wrong operand type!", 53)
+        elif value2 >= len(value1) or value3 == "":
+            error.error_exit("Wrong operation with strings!", 58)
+        if type(value1) is not char_buffer:
+            value1 = char_buffer(value1)
+        value1.set_char(value2, value3)
+        frame[name] = value1
+
+    return setchar
+
+
+# a helper function for getting the position of a label, undefined labels fail only when they are used
+def make_label_position(label, vm):
+    position = vm.labels.dictionary.get(label.value)
+    if position is None:
+        return lambda: vm.labels.get(label.value)
+    return lambda: position
+
+
+def compile_jump(instruction, vm):
+    position = vm.labels.dictionary.get(instruction.arg1.value)
+    if position is None:
+        return functools.partial(instruction.do, vm)
+
+    def jump():
+        vm.pc = position
+
+    return jump
+
+
+# JUMPIFEQ and JUMPIFNEQ, the jump is taken when the result of the comparison equals the condition
+def compile_conditional_jump(instruction, vm, condition):
+    get_position = make_label_position(instruction.arg1, vm)
+    read1 = make_reader(instruction.arg2, vm)
+    read2 = make_reader(instruction.arg3, vm)
+
+    def conditional_jump():
+        value1 = read1()
+        value2 = read2()
+        if not type(value1) == type(value2) and value1 is not None and value2 is not None:
+            error.error_exit("Wrong operand type!", 53)
+        if (value1 == value2) == condition:
+            vm.pc = get_position()
+
+    return conditional_jump
+
+
+def compile_call(instruction, vm):
+    get_position = make_label_position(instruction.arg1, vm)
+    orders = vm.order_stack.list
+
+    def call():
+        orders.append(vm.pc)
+        vm.pc = get_position()
+
+    return call
+
+
+def compile_return(instruction, vm):
+    orders = vm.order_stack.list
+
+    def return_():
+        if len(orders) == 0:
+            error.error_exit("The stack is empty!", 56)
+        vm.pc = orders.pop()
+
+    return return_
+
+
+def compile_label(instruction, vm):
+    return lambda: None
+
+
+# UNCHECKED INSTRUCTIONS (the types were proven by the type inference, the other unchecked variants use
+# the closures of the instructions they are made from):
+
+# unchecked ADD, SUB, MUL, LT, GT, EQ and CONCAT, the operation is one of the functions from the operator module
+def compile_unchecked_operation(instruction, vm, operation):
+    get_frame = make_frame_getter(instruction.arg1, vm)
+    name = instruction.arg1.name
+    read1 = make_reader(instruction.arg2, vm)
+    read2 = make_reader(instruction.arg3, vm)
+
+    def unchecked_operation():
+        frame = get_frame()
+        value = operation(read1(), read2())
+        if name in frame:
+            frame[name] = value
+        else:
+            error.error_exit("The variable does not exist!", 54)
+
+    return unchecked_operation
+
+
+# unchecked JUMPIFEQ and JUMPIFNEQ
+def compile_unchecked_conditional_jump(instruction, vm, condition):
+    get_position = make_label_position(instruction.arg1, vm)
+    read1 = make_reader(instruction.arg2, vm)
+    read2 = make_reader(instruction.arg3, vm)
+
+    def unchecked_conditional_jump():
+        if (read1() == read2()) == condition:
+            vm.pc = get_position()
+
+    return unchecked_conditional_jump
+
+
+# FUSED INSTRUCTIONS (the same checks as their parts, but one closure):
+
+# LT or GT followed by a jump on the result
+def compile_relational_jump(instruction, vm):
+    get_frame = make_frame_getter(instruction.arg1, vm)
+    name = instruction.arg1.name
+    read1 = make_reader(instruction.arg2, vm)
+    read2 = make_reader(instruction.arg3, vm)
+    operation = instruction.operation
+    expected = instruction.expected
+    get_position = make_label_position(ins.Argument("label", instruction.label), vm)
+
+    def relational_jump():
+        frame = get_frame()
+        value1 = read1()
+        value2 = read2()
+        if value1 is None or value2 is None:
+            error.error_exit("Cannot compare with nil@nil", 53)
+        elif not type(value1) == type(value2):
+            error.error_exit("Cannot compare operands with different types!", 53)
+        result = operation(value1, value2)
+        if name in frame:
+            frame[name] = result
+        else:
+            error.error_exit("The variable does not exist!", 54)
+        if result == expected:
+            vm.pc = get_position()
+
+    return relational_jump
+
+
+# EQ followed by a jump on the result
+def compile_equal_jump(instruction, vm):
+    get_frame = make_frame_getter(instruction.arg1, vm)
+    name = instruction.arg1.name
+    read1 = make_reader(instruction.arg2, vm)
+    read2 = make_reader(instruction.arg3, vm)
+    expected = instruction.expected
+    get_position = make_label_position(ins.Argument("label", instruction.label), vm)
+
+    def equal_jump():
+        frame = get_frame()
+        value1 = read1()
+        value2 = read2()
+        if not type(value1) == type(value2) and value1 is not None and value2 is not None:
+            error.error_exit("Cannot compare operands with different types!", 53)
+        result = value1 == value2
+        if name in frame:
+            frame[name] = result
+        else:
+            error.error_exit("The variable does not exist!", 54)
+        if result == expected:
+            vm.pc = get_position()
+
+    return equal_jump
+
+
+# ADD or SUB followed by a jump comparing the result with a symbol
+def compile_arithmetic_jump(instruction, vm):
+    get_frame = make_frame_getter(instruction.arg1, vm)
+    name = instruction.arg1.name
+    read1 = make_reader(instruction.arg2, vm)
+    read2 = make_reader(instruction.arg3, vm)
+    read_other = make_reader(instruction.other, vm)
+    operation = instruction.operation
+    equal = instruction.equal
+    get_position = make_label_position(ins.Argument("label", instruction.label), vm)
+
+    def arithmetic_jump():
+        frame = get_frame()
+        value1 = read1()
+        value2 = read2()
+        if type(value1) != int or type(value2) != int:
+            error.error_exit("Wrong operand type!", 53)
+        value = operation(value1, value2)
+        if name in frame:
+            frame[name] = value
+        else:
+            error.error_exit("The variable does not exist!", 54)
+        other = read_other()
+        if type(other) != int and other is not None:
+            error.error_exit("Wrong operand type!", 53)
+        if (value == other) == equal:
+            vm.pc = get_position()
+
+    return arithmetic_jump
+
+
+# DEFVAR followed by MOVE into the variable
+def compile_defvar_move(instruction, vm):
+    get_frame = make_frame_getter(instruction.arg1, vm)
+    name = instruction.arg1.name
+    read = make_reader(instruction.arg2, vm)
+    uninitialized = mem.UNINITIALIZED
+
+    def defvar_move():
+        frame = get_frame()
+        if name in frame:
+            error.error_exit("Redefinition of a variable!", 52)
+        frame[name] = uninitialized
+        frame[name] = read()
+
+    return defvar_move
+
+
+# CREATEFRAME, PUSHFRAME and CALL
+def compile_call_frame(instruction, vm):
+    get_position = make_label_position(instruction.arg1, vm)
+    frames = vm.frame_stack.list
+    orders = vm.order_stack.list
+    new_frame = mem.Frame
+    statistics = vm.statistics
+
+    def call_frame():
+        if statistics is not None:
+            statistics.create_frame(vm)
+        frames.append(vm.local_f)
+        vm.local_f = new_frame()
+        vm.temporary_f = None
+        orders.append(vm.pc)
+        vm.pc = get_position()
+
+    return call_frame
+
+
+# ADDS, SUBS and MULS (the second symbol is on the top of the stack)
+def compile_stack_arithmetic(instruction, vm, operation):
+    stack = vm.stack.list
+
+    def stack_arithmetic():
+        if len(stack) < 2:
+            error.error_exit("The stack is empty!", 56)
+        value2 = stack.pop()
+        value1 = stack.pop()
+        if type(value1) != int or type(value2) != int:
+            error.error_exit("Wrong operand type!", 53)
+        stack.append(operation(value1, value2))
+
+    return stack_arithmetic
+
+
+def compile_idivs(instruction, vm):
+    stack = vm.stack.list
+
+    def idivs():
+        if len(stack) < 2:
+            error.error_exit("The stack is empty!", 56)
+        value2 = stack.pop()
+        value1 = stack.pop()
+        if type(value1) != int or type(value2) != int:
+            error.error_exit("Wrong operand type!", 53)
+        elif value2 == 0:
+            error.error_exit("Division by zero!", 57)
+        stack.append(value1 // value2)
+
+    return idivs
+
+
+# LTS and GTS
+def compile_stack_relational(instruction, vm, operation):
+    stack = vm.stack.list
+
+    def stack_relational():
+        if len(stack) < 2:
+            error.error_exit("The stack is empty!", 56)
+        value2 = stack.pop()
+        value1 = stack.pop()
+        if value1 is None or value2 is None:
+            error.error_exit("Cannot compare with nil@nil", 53)
+        elif not type(value1) == type(value2):
+            error.error_exit("Cannot compare operands with different types!", 53)
+        stack.append(operation(value1, value2))
+
+    return stack_relational
+
+
+def compile_eqs(instruction, vm):
+    stack = vm.stack.list
+
+    def eqs():
+        if len(stack) < 2:
+            error.error_exit("The stack is empty!", 56)
+        value2 = stack.pop()
+        value1 = stack.pop()
+        if not type(value1) == type(value2) and value1 is not None and value2 is not None:
+            error.error_exit("Cannot compare operands with different types!", 53)
+        stack.append(value1 == value2)
+
+    return eqs
+
+
+# ANDS and ORS
+def compile_stack_logical(instruction, vm, operation):
+    stack = vm.stack.list
+
+    def stack_logical():
+        if len(stack) < 2:
+            error.error_exit("The stack is empty!", 56)
+        value2 = stack.pop()
+        value1 = stack.pop()
+        if type(value1) != bool or type(value2) != bool:
+            error.error_exit("Wrong operand type!", 53)
+        stack.append(operation(value1, value2))
+
+    return stack_logical
+
+
+def compile_nots(instruction, vm):
+    stack = vm.stack.list
+
+    def nots():
+        if len(stack) == 0:
+            error.error_exit("The stack is empty!", 56)
+        value = stack.pop()
+        if type(value) != bool:
+            error.error_exit("Wrong operand type!", 53)
+        stack.append(not value)
+
+    return nots
+
+
+# JUMPIFEQS and JUMPIFNEQS
+def compile_stack_conditional_jump(instruction, vm, condition):
+    get_position = make_label_position(instruction.arg1, vm)
+    stack = vm.stack.list
+
+    def stack_conditional_jump():
+        if len(stack) < 2:
+            error.error_exit("The stack is empty!", 56)
+        value2 = stack.pop()
+        value1 = stack.pop()
+        if not type(value1) == type(value2) and value1 is not None and value2 is not None:
+            error.error_exit("Wrong operand type!", 53)
+        if (value1 == value2) == condition:
+            vm.pc = get_position()
+
+    return stack_conditional_jump
+
+
+# instruction class : function compiling the instruction into a closure
+compilers = {
+    ins.Move: compile_move,
+    ins.PushS: compile_pushs,
+    ins.PopS: compile_pops,
+    ins.Add: lambda instruction, vm: compile_arithmetic(instruction, vm, operator.add),
+    ins.Sub: lambda instruction, vm: compile_arithmetic(instruction, vm, operator.sub),
+    ins.Mul: lambda instruction, vm: compile_arithmetic(instruction, vm, operator.mul),
+    ins.IDiv: compile_idiv,
+    ins.Lt: lambda instruction, vm: compile_relational(instruction, vm, operator.lt),
+    ins.Gt: lambda instruction, vm: compile_relational(instruction, vm, operator.gt),
+    ins.Eq: compile_eq,
+    ins.And: lambda instruction, vm: compile_logical(instruction, vm, lambda value1, value2: value1 and value2),
+    ins.Or: lambda instruction, vm: compile_logical(instruction, vm, lambda value1, value2: value1 or value2),
+    ins.Not: compile_not,
+    ins.Concat: compile_concat,
+    ins.StrLen: compile_strlen,
+    ins.GetChar: compile_getchar,
+    ins.SetChar: compile_setchar,
+    ins.Label: compile_label,
+    ins.Jump: compile_jump,
+    ins.JumpIfEq: lambda instruction, vm: compile_conditional_jump(instruction, vm, True),
+    ins.JumpIfNEq: lambda instruction, vm: compile_conditional_jump(instruction, vm, False),
+    ins.Call: compile_call,
+    ins.Return: compile_return,
+    ins.RelationalJump: compile_relational_jump,
+    ins.EqualJump: compile_equal_jump,
+    ins.ArithmeticJump: compile_arithmetic_jump,
+    ins.DefVarMove: compile_defvar_move,
+    ins.CallFrame: compile_call_frame,
+    ins.AddS: lambda instruction, vm: compile_stack_arithmetic(instruction, vm, operator.add),
+    ins.SubS: lambda instruction, vm: compile_stack_arithmetic(instruction, vm, operator.sub),
+    ins.MulS: lambda instruction, vm: compile_stack_arithmetic(instruction, vm, operator.mul),
+    ins.IDivS: compile_idivs,
+    ins.LtS: lambda instruction, vm: compile_stack_relational(instruction, vm, operator.lt),
+    ins.GtS: lambda instruction, vm: compile_stack_relational(instruction, vm, operator.gt),
+    ins.EqS: compile_eqs,
+    ins.AndS: lambda instruction, vm: compile_stack_logical(instruction, vm, lambda value1, value2: value1 and value2),
+    ins.OrS: lambda instruction, vm: compile_stack_logical(instruction, vm, lambda value1, value2: value1 or value2),
+    ins.NotS: compile_nots,
+    ins.JumpIfEqS: lambda instruction, vm: compile_stack_conditional_jump(instruction, vm, True),
+    ins.JumpIfNEqS: lambda instruction, vm: compile_stack_conditional_jump(instruction, vm, False),
+    ins.UncheckedAdd: lambda instruction, vm: compile_unchecked_operation(instruction, vm, operator.add),
+    ins.UncheckedSub: lambda instruction, vm: compile_unchecked_operation(instruction, vm, operator.sub),
+    ins.UncheckedMul: lambda instruction, vm: compile_unchecked_operation(instruction, vm, operator.mul),
+    ins.UncheckedLt: lambda instruction, vm: compile_unchecked_operation(instruction, vm, operator.lt),
+    ins.UncheckedGt: lambda instruction, vm: compile_unchecked_operation(instruction, vm, operator.gt),
+    ins.UncheckedEq: lambda instruction, vm: compile_unchecked_operation(instruction, vm, operator.eq),
+    ins.UncheckedConcat: lambda instruction, vm: (compile_append(instruction, vm) if instruction.appends() else
+                                                  compile_unchecked_operation(instruction, vm, operator.add)),
+    ins.UncheckedJumpIfEq: lambda instruction, vm: compile_unchecked_conditional_jump(instruction, vm, True),
+    ins.UncheckedJumpIfNEq: lambda instruction, vm: compile_unchecked_conditional_jump(instruction, vm, False),
+}
+
+
+# compiles every instruction of the program into a closure with its operands already resolved
+# for the given interpreter, instructions without a specialized closure use the "do" method of their class
+# (the garbage collector is paused meanwhile, the closures are no garbage and the collections would scan
+# all the objects of a large program again and again)
+def compile_program(program, vm):
+    code = []
+    collecting = gc.isenabled()
+    gc.disable()
+    try:
+        for instruction in program.instructions:
+            # the other unchecked variants are compiled like the instructions they are made from
+            compiler = None
+            for instruction_class in type(instruction).__mro__:
+                compiler = compilers.get(instruction_class)
+                if compiler is not None:
+                    break
+            if compiler is None:
+                code.append(functools.partial(instruction.do, vm))
+            else:
+                code.append(compiler(instruction, vm))
+    finally:
+        if collecting:
+            gc.enable()
+    return code
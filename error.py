@@ -1,7 +1,80 @@
-import sys
+# a base class for all errors of the interpretation, it stores the message and the exit code
+class InterpretError(Exception):
+    exit_code = 99
 
+    def __init__(self, message, exit_code=None):
+        super().__init__(message)
+        self.message = message
+        if exit_code is not None:
+            self.exit_code = exit_code
 
-# function for printing an error message and exiting with given error code
+
+# CLASSES FOR EACH ERROR CODE:
+
+class ParameterError(InterpretError):
+    exit_code = 10
+
+
+class InputFileError(InterpretError):
+    exit_code = 11
+
+
+class OutputFileError(InterpretError):
+    exit_code = 12
+
+
+class XmlFormatError(InterpretError):
+    exit_code = 31
+
+
+class XmlStructureError(InterpretError):
+    exit_code = 32
+
+
+class SemanticError(InterpretError):
+    exit_code = 52
+
+
+class OperandTypeError(InterpretError):
+    exit_code = 53
+
+
+class VariableError(InterpretError):
+    exit_code = 54
+
+
+class FrameError(InterpretError):
+    exit_code = 55
+
+
+class MissingValueError(InterpretError):
+    exit_code = 56
+
+
+class OperandValueError(InterpretError):
+    exit_code = 57
+
+
+class StringError(InterpretError):
+    exit_code = 58
+
+
+class LimitError(InterpretError):
+    exit_code = 59
+
+
+# exit code : class of the error
+errors = {error_class.exit_code: error_class for error_class in InterpretError.__subclasses__()}
+
+
+# an exception for ending the program by the EXIT instruction (it is not an error)
+class ProgramExit(Exception):
+    def __init__(self, exit_code):
+        super().__init__(exit_code)
+        self.exit_code = exit_code
+
+
+# function for ending the interpretation with an error message and given error code
+# (raises the error class for the code, the caller of the interpreter prints the message and exits)
 def error_exit(string, exit_code):
-    sys.stderr.write(string + "\n")
-    sys.exit(exit_code)
+    raise errors.get(exit_code, InterpretError)(string, exit_code)
@@ -0,0 +1,185 @@
+import instructions as ins
+
+
+# the types of values (sets of them say which types a symbol can have at an instruction)
+ANY = frozenset(("int", "bool", "string", "nil"))
+NONE = frozenset()
+
+# class of the instruction : types of the value it writes into its first argument
+# (MOVE writes the types of its symbol, READ the read type or nil, DEFVAR no value)
+result_types = {
+    ins.Add: frozenset(("int",)), ins.Sub: frozenset(("int",)), ins.Mul: frozenset(("int",)),
+    ins.IDiv: frozenset(("int",)), ins.StrLen: frozenset(("int",)), ins.Stri2Int: frozenset(("int",)),
+    ins.Lt: frozenset(("bool",)), ins.Gt: frozenset(("bool",)), ins.Eq: frozenset(("bool",)),
+    ins.And: frozenset(("bool",)), ins.Or: frozenset(("bool",)), ins.Not: frozenset(("bool",)),
+    ins.Int2Char: frozenset(("string",)), ins.Concat: frozenset(("string",)), ins.GetChar: frozenset(("string",)),
+    ins.SetChar: frozenset(("string",)), ins.Type: frozenset(("string",)), ins.PopS: ANY,
+}
+
+single_int = frozenset(("int",))
+single_bool = frozenset(("bool",))
+single_string = frozenset(("string",))
+
+
+def are_same_types(types1, types2):
+    # LT and GT need the same types without nil
+    return all(type1 == type2 and type1 != "nil" for type1 in types1 for type2 in types2)
+
+
+def are_comparable(types1, types2):
+    # EQ, JUMPIFEQ and JUMPIFNEQ need the same types or nil
+    return all(type1 == type2 or "nil" in (type1, type2) for type1 in types1 for type2 in types2)
+
+
+# class of the instruction : its unchecked variant with a function telling if the types of the symbols
+# (as sets) can never fail the type checks of the instruction
+specializations = {
+    ins.Add: (ins.UncheckedAdd, lambda types1, types2: types1 <= single_int and types2 <= single_int),
+    ins.Sub: (ins.UncheckedSub, lambda types1, types2: types1 <= single_int and types2 <= single_int),
+    ins.Mul: (ins.UncheckedMul, lambda types1, types2: types1 <= single_int and types2 <= single_int),
+    ins.IDiv: (ins.UncheckedIDiv, lambda types1, types2: types1 <= single_int and types2 <= single_int),
+    ins.Lt: (ins.UncheckedLt, are_same_types),
+    ins.Gt: (ins.UncheckedGt, are_same_types),
+    ins.Eq: (ins.UncheckedEq, are_comparable),
+    ins.And: (ins.UncheckedAnd, lambda types1, types2: types1 <= single_bool and types2 <= single_bool),
+    ins.Or: (ins.UncheckedOr, lambda types1, types2: types1 <= single_bool and types2 <= single_bool),
+    ins.Not: (ins.UncheckedNot, lambda types1: types1 <= single_bool),
+    ins.Concat: (ins.UncheckedConcat, lambda types1, types2: types1 <= single_string and types2 <= single_string),
+    ins.StrLen: (ins.UncheckedStrLen, lambda types1: types1 <= single_string),
+    ins.GetChar: (ins.UncheckedGetChar, lambda types1, types2: types1 <= single_string and types2 <= single_int),
+    ins.JumpIfEq: (ins.UncheckedJumpIfEq, are_comparable),
+    ins.JumpIfNEq: (ins.UncheckedJumpIfNEq, are_comparable),
+}
+
+jumps = (ins.Jump, ins.JumpIfEq, ins.JumpIfNEq, ins.JumpIfEqS, ins.JumpIfNEqS, ins.Call)  # with a label operand
+ends = (ins.Jump, ins.Return, ins.Exit)  # instructions never continuing with the next one
+calls = (ins.Call, ins.CallFrame)
+
+
+# a helper function for getting the instructions a fused instruction was made of (or the instruction itself)
+def parts(instruction):
+    return getattr(instruction, "parts", (instruction,))
+
+
+# a class for the type inference, it finds the types every variable can have before each instruction:
+#   - global variables by a data flow analysis over the graph of the program (the instructions after CALL
+#     continue from every RETURN, so a function is analysed once for all its calls)
+#   - local and temporary variables by all the values written into a variable of the name in any of the
+#     frames (a frame moves between TF and LF, so a variable there can have any value written into it)
+# a variable without a value has no types, reading it fails before any type check
+class TypeInference:
+    def __init__(self, instructions, positions):
+        self.instructions = instructions
+        self.positions = positions  # label : position of the label in the instructions
+        self.states = []  # index of the instruction : {global variable : types} before the instruction
+        self.frame_types = {}  # name of a LF or TF variable : types
+
+        # the instructions after the calls, RETURN continues with any of them
+        self.returns = [index + 1 for index, instruction in enumerate(instructions) if isinstance(instruction, calls)]
+
+    # gets the types of the symbol with the global variables in the state
+    def types(self, symbol, state):
+        if symbol.arg_type == "var":
+            if symbol.frame == "global_f":
+                return state.get(symbol.name, NONE)
+            return self.frame_types.get(symbol.name, NONE)
+        return frozenset((symbol.arg_type,))
+
+    # gets the types of the value the instruction writes into its first argument
+    def written_types(self, instruction, state):
+        if isinstance(instruction, ins.Move):
+            return self.types(instruction.arg2, state)
+        if isinstance(instruction, ins.Read):
+            return frozenset((instruction.arg2.value, "nil"))
+        for instruction_class, types in result_types.items():
+            if isinstance(instruction, instruction_class):
+                return types
+        return None
+
+    # changes the state by the instruction (the frame types only grow), returns True if the frame types changed
+    def transfer(self, instruction, state):
+        changed = False
+        for part in parts(instruction):
+            argument = getattr(part, "arg1", None)
+            if argument is None or argument.arg_type != "var":
+                continue
+            if isinstance(part, ins.DefVar):
+                types = NONE
+            else:
+                types = self.written_types(part, state)
+                if types is None:
+                    continue  # the instruction only reads the variable
+            if argument.frame == "global_f":
+                state[argument.name] = types
+            else:
+                known = self.frame_types.get(argument.name, NONE)
+                if not types <= known:
+                    self.frame_types[argument.name] = known | types
+                    changed = True
+        return changed
+
+    def successors(self, index):
+        instruction = parts(self.instructions[index])[-1]
+        following = []
+        if isinstance(instruction, jumps) and instruction.arg1.value in self.positions:
+            following.append(self.positions[instruction.arg1.value])
+        if isinstance(instruction, ins.Return):
+            following.extend(self.returns)
+        elif not isinstance(instruction, ends) and not isinstance(instruction, ins.Call):
+            following.append(index + 1)
+        return [successor for successor in following if successor < len(self.instructions)]
+
+    # runs the analysis until nothing changes (the types only grow, so it ends)
+    def run(self):
+        while True:
+            frame_changed = False
+            self.states = [None] * len(self.instructions)
+            pending = [0] if self.instructions else []
+            if pending:
+                self.states[0] = {}
+            while pending:
+                index = pending.pop()
+                state = dict(self.states[index])
+                frame_changed = self.transfer(self.instructions[index], state) or frame_changed
+                for successor in self.successors(index):
+                    old = self.states[successor]
+                    if old is None:
+                        self.states[successor] = state
+                        pending.append(successor)
+                        continue
+                    merged = None
+                    for name, types in state.items():
+                        if not types <= old.get(name, NONE):
+                            merged = merged or dict(old)
+                            merged[name] = merged.get(name, NONE) | types
+                    if merged is not None:
+                        self.states[successor] = merged
+                        pending.append(successor)
+            # the frame types changed while some instructions were already analysed with the old ones
+            if not frame_changed:
+                return
+
+    # replaces the instructions whose symbols have proven types by their unchecked variants,
+    # returns the new instructions and the number of the replaced ones
+    def specialize(self):
+        specialized = []
+        count = 0
+        for index, instruction in enumerate(self.instructions):
+            variant = specializations.get(type(instruction))
+            state = self.states[index]
+            if variant is not None and state is not None:
+                unchecked_class, is_safe = variant
+                symbols = [instruction.arg2] + ([instruction.arg3] if hasattr(instruction, "arg3") else [])
+                if is_safe(*(self.types(symbol, state) for symbol in symbols)):
+                    instruction = unchecked_class(instruction.order, *[getattr(instruction, "arg" + str(position))
+                                                                       for position in range(1, len(symbols) + 2)])
+                    count += 1
+            specialized.append(instruction)
+        return specialized, count
+
+
+# gets the instructions with the unchecked variants where the types are proven and the number of them
+def specialize(instructions, positions):
+    inference = TypeInference(instructions, positions)
+    inference.run()
+    return inference.specialize()
@@ -1,83 +1,118 @@
 import sys
-import re
 
-import globals as g
 import memory as mem
 import error
 
 
 # a helper function for getting the frame of a given variable
-def get_var_frame(var):
-    frame = None
-    # it checks the first letter of the variable (L, T or G) and decides based on that
-    if var.value[0] == "L":
-        frame = g.LOCAL_F
-    elif var.value[0] == "T":
-        frame = g.TEMPORARY_F
-    elif var.value[0] == "G":
-        frame = g.GLOBAL_F
-    else:
-        error.error_exit("Wrong variable syntax!", 52)
-
+def get_var_frame(vm, var):
+    # the frame was already resolved while parsing to the name of the frame attribute of the interpreter
+    frame = getattr(vm, var.frame)
     if frame is None:
         error.error_exit("The frame does not exists!", 55)
-    else:
-        return frame
+    return frame
 
 
 # a helper function for getting the value from a symbol (can be either a variable or a constant)
-def get_symbol_value(symbol):
-    value = None
+def get_symbol_value(vm, symbol):
     # if it is variable, check its frame and get value
     if symbol.arg_type == "var":
-        if symbol.value[0] == "L":
-            value = g.LOCAL_F.get(symbol.value[3:])
-        elif symbol.value[0] == "T":
-            value = g.TEMPORARY_F.get(symbol.value[3:])
-        elif symbol.value[0] == "G":
-            value = g.GLOBAL_F.get(symbol.value[3:])
-    # if it is nil, return None
-    elif symbol.arg_type == "nil":
-        value = None
-    # if it is int, return the value
-    elif symbol.arg_type == "int":
-        value = int(symbol.value)
-    # if it is bool, check its value
-    elif symbol.arg_type == "bool":
-        if symbol.value.lower() == "true":
-            value = True
-        elif symbol.value.lower() == "false":
-            value = False
-        else:
-            error.error_exit("Bool must be TRUE or FALSE!", 32)
-    # if it is a string...
-    elif symbol.arg_type == "string":
-        # ...first check if it is an empty string
-        if symbol.value is None:
-            value = ""
-        # ...or else replace all escape sequences with their corresponding value and return the result
-        else:
-            string = symbol.value
+        frame = getattr(vm, symbol.frame)
+        if frame is None:
+            error.error_exit("The frame does not exists!", 55)
+        return frame.get(symbol.name)
+    # constants are already decoded while parsing, so just return the value
+    return symbol.value
 
-            escape_sequences = re.findall(r"\\[0-9]{3}", string)
 
-            for escape in escape_sequences:
-                char_value = chr(int(escape[1:]))
-                string = string.replace(escape, char_value)
+# a helper function for getting the value from a symbol for GETCHAR, STRLEN, STRI2INT and SETCHAR,
+# a string in a character buffer (memory.CharBuffer) is returned as the buffer
+def get_buffered_symbol_value(vm, symbol):
+    if symbol.arg_type == "var":
+        frame = getattr(vm, symbol.frame)
+        if frame is None:
+            error.error_exit("The frame does not exists!", 55)
+        return frame.get_buffered(symbol.name)
+    return symbol.value
+
+
+# the types of the values with a string (a character buffer holds a string too)
+string_types = (str, mem.CharBuffer)
+
+
+# a helper function for getting the names of the variables that can hold a character buffer, they are the
+# variables changed by SETCHAR (only by the name, a frame can move between TF and LF), the engines check
+# for the buffer only when reading these variables (the names are found once for each program)
+def buffered_names(program):
+    if program.buffered is None:
+        program.buffered = frozenset(part.arg1.name for instruction in program.instructions
+                                     for part in getattr(instruction, "parts", (instruction,))
+                                     if isinstance(part, SetChar))
+    return program.buffered
+
+
+# a helper function for popping the two symbols of a stack instruction (the second symbol is on the top)
+def pop_operands(vm):
+    value2 = vm.stack.pop()
+    value1 = vm.stack.pop()
+    return value1, value2
+
+
+# a helper function for reading a line from the input source and converting it into a value of given type
+# (returns nil if there is nothing to read or the line cannot be converted)
+def read_value(vm, value_type):
+    inputted = vm.read_input.readline()
+    if inputted == "":
+        # nothing was inputted
+        return None
+    elif value_type == "int":
+        # try to convert the input into int
+        try:
+            return int(inputted)
+        except ValueError:
+            return None
+    elif value_type == "string":
+        # get the string
+        return inputted
+    # get bool value
+    elif inputted.lower() == "true":
+        return True
+    elif inputted.lower() == "false":
+        return False
+    return None
+
+
+# a helper function for printing a value to the output of the program
+def write_value(vm, value):
+    if type(value) == bool:
+        if value:
+            vm.output.write("true")
+        else:
+            vm.output.write("false")
+    elif value is not None:
+        vm.output.write(str(value))
 
-            value = string
-    # if it is something else, just return its value
-    else:
-        value = symbol.value
 
-    return value
+# a helper function for printing the sizes of the stacks (for BREAK and the limits of watchdog.Watchdog)
+def print_stack_sizes(vm):
+    print("Number of elements in stack: " + str(len(vm.stack.list)), file=vm.stderr)
+    # -1, since there is the first helper None element
+    print("Number of elements in frame stack: " + str(len(vm.frame_stack.list) - 1), file=vm.stderr)
+    print("Number of elements in orders stack: " + str(len(vm.order_stack.list)), file=vm.stderr)
 
 
-# a class for arguments, it stores the argument typo (int, bool, string etc.) and a value
+# a class for arguments, it stores the argument type (int, bool, string etc.) and a value
+# (constants hold the decoded Python value: int, bool, str or None for nil)
+# (variables are split into the frame and the name, e.g. "GF@x" into "global_f" and "x")
 class Argument:
+    frames = {"GF": "global_f", "LF": "local_f", "TF": "temporary_f"}
+
     def __init__(self, arg_type, value):
         self.arg_type = arg_type
         self.value = value
+        if arg_type == "var":
+            self.frame = Argument.frames[value[:2]]
+            self.name = sys.intern(value[3:])
 
 
 # a base class for all instructions => all instruction classes are inherited from this
@@ -86,8 +121,9 @@ class Instruction:
         self.order = order
 
     order: int  # the order of the instruction
+    checked = True  # False for the variants without the type checks (see UNCHECKED INSTRUCTIONS)
 
-    def do(self):  # implementation of the instruction behaviour
+    def do(self, vm):  # implementation of the instruction behaviour (vm is the running Interpreter)
         pass
 
 
@@ -99,52 +135,59 @@ class Move(Instruction):
         self.arg1 = arg1
         self.arg2 = arg2
 
-    def do(self):
+    def do(self, vm):
         # gets the frame of the destination variable and value of the second argument (symbol)
-        frame = get_var_frame(self.arg1)
-        value = get_symbol_value(self.arg2)
+        frame = get_var_frame(vm, self.arg1)
+        value = get_symbol_value(vm, self.arg2)
 
         # stores the value in the variable
-        # [3:], since the name of variable is after three characters (GF@)
-        frame.update(self.arg1.value[3:], value)
+        frame.update(self.arg1.name, value)
 
 
 class CreateFrame(Instruction):
     def __init__(self, order):
         super().__init__(order)
 
-    def do(self):
-        # creates a new frame and stores it into the global temporary frame variable
-        g.TEMPORARY_F = mem.Frame()
+    def do(self, vm):
+        if vm.statistics is not None:
+            vm.statistics.create_frame(vm)
+
+        # creates a new frame and stores it into the temporary frame of the interpreter
+        vm.temporary_f = mem.Frame()
 
 
 class PushFrame(Instruction):
     def __init__(self, order):
         super().__init__(order)
 
-    def do(self):
+    def do(self, vm):
         # check if there was CREATEFRAME before calling this
-        if g.TEMPORARY_F is None:
+        if vm.temporary_f is None:
             error.error_exit("No frame was created!", 55)
+        if vm.statistics is not None:
+            vm.statistics.record_frames(vm)
 
-        g.FRAME_STACK.push(g.LOCAL_F)  # push the local frame into the frame stack
-        g.LOCAL_F = g.TEMPORARY_F  # save the temporary frame into the local frame
-        g.TEMPORARY_F = None  # temporary frame is now uninitialized
+        vm.frame_stack.push(vm.local_f)  # push the local frame into the frame stack
+        vm.local_f = vm.temporary_f  # save the temporary frame into the local frame
+        vm.temporary_f = None  # temporary frame is now uninitialized
 
 
 class PopFrame(Instruction):
     def __init__(self, order):
         super().__init__(order)
 
-    def do(self):
-        g.TEMPORARY_F = g.LOCAL_F  # move local frame into temporary frame
-        popped = g.FRAME_STACK.pop()  # take frame from stack
-        if len(g.FRAME_STACK.list) == 0:
+    def do(self, vm):
+        if vm.statistics is not None:
+            vm.statistics.record_frames(vm)
+
+        vm.temporary_f = vm.local_f  # move local frame into temporary frame
+        popped = vm.frame_stack.pop()  # take frame from stack
+        if len(vm.frame_stack.list) == 0:
             # if the stack is now empty, there was no frame in stack
             error.error_exit("There is no frame in stack!", 55)
         else:
             # else move the popped stack into local frame
-            g.LOCAL_F = popped
+            vm.local_f = popped
 
 
 class DefVar(Instruction):
@@ -152,10 +195,10 @@ class DefVar(Instruction):
         super().__init__(order)
         self.arg1 = arg1
 
-    def do(self):
+    def do(self, vm):
         # initialize new variable
-        frame = get_var_frame(self.arg1)
-        frame.create(self.arg1.value[3:])
+        frame = get_var_frame(vm, self.arg1)
+        frame.create(self.arg1.name)
 
 
 class Call(Instruction):
@@ -163,18 +206,18 @@ class Call(Instruction):
         super().__init__(order)
         self.arg1 = arg1
 
-    def do(self):
-        g.ORDER_STACK.push(g.CURRENT_ORDER)  # save current order into order stack
-        g.CURRENT_ORDER = g.LABELS.get(self.arg1.value)  # set the current label to the label order
+    def do(self, vm):
+        vm.order_stack.push(vm.pc)  # save current program counter into order stack
+        vm.pc = vm.labels.get(self.arg1.value)  # set the program counter to the label position
 
 
 class Return(Instruction):
     def __init__(self, order):
         super().__init__(order)
 
-    def do(self):
-        # pop the order from stack into current order global variable
-        g.CURRENT_ORDER = g.ORDER_STACK.pop()
+    def do(self, vm):
+        # pop the program counter from stack into the program counter of the interpreter
+        vm.pc = vm.order_stack.pop()
 
 
 class PushS(Instruction):
@@ -182,10 +225,10 @@ class PushS(Instruction):
         super().__init__(order)
         self.arg1 = arg1
 
-    def do(self):
+    def do(self, vm):
         # push a value into stack
-        value = get_symbol_value(self.arg1)
-        g.STACK.push(value)
+        value = get_symbol_value(vm, self.arg1)
+        vm.stack.push(value)
 
 
 class PopS(Instruction):
@@ -193,10 +236,10 @@ class PopS(Instruction):
         super().__init__(order)
         self.arg1 = arg1
 
-    def do(self):
+    def do(self, vm):
         # get a value from stack into variable
-        frame = get_var_frame(self.arg1)
-        frame.update(self.arg1.value[3:], g.STACK.pop())
+        frame = get_var_frame(vm, self.arg1)
+        frame.update(self.arg1.name, vm.stack.pop())
 
 
 class Add(Instruction):
@@ -206,17 +249,17 @@ class Add(Instruction):
         self.arg2 = arg2
         self.arg3 = arg3
 
-    def do(self):
+    def do(self, vm):
         # gets the variable frame and the two values
-        frame = get_var_frame(self.arg1)
-        value1 = get_symbol_value(self.arg2)
-        value2 = get_symbol_value(self.arg3)
+        frame = get_var_frame(vm, self.arg1)
+        value1 = get_symbol_value(vm, self.arg2)
+        value2 = get_symbol_value(vm, self.arg3)
 
         # checks the value types and does the addition
         if type(value1) != int or type(value2) != int:
             error.error_exit("Wrong operand type!", 53)
         else:
-            frame.update(self.arg1.value[3:], value1 + value2)
+            frame.update(self.arg1.name, value1 + value2)
 
 
 class Sub(Instruction):
@@ -226,17 +269,17 @@ class Sub(Instruction):
         self.arg2 = arg2
         self.arg3 = arg3
 
-    def do(self):
+    def do(self, vm):
         # gets the variable frame and the two values
-        frame = get_var_frame(self.arg1)
-        value1 = get_symbol_value(self.arg2)
-        value2 = get_symbol_value(self.arg3)
+        frame = get_var_frame(vm, self.arg1)
+        value1 = get_symbol_value(vm, self.arg2)
+        value2 = get_symbol_value(vm, self.arg3)
 
         # checks the value types and does the subtraction
         if type(value1) != int or type(value2) != int:
             error.error_exit("Wrong operand type!", 53)
         else:
-            frame.update(self.arg1.value[3:], value1 - value2)
+            frame.update(self.arg1.name, value1 - value2)
 
 
 class Mul(Instruction):
@@ -246,17 +289,17 @@ class Mul(Instruction):
         self.arg2 = arg2
         self.arg3 = arg3
 
-    def do(self):
+    def do(self, vm):
         # gets the variable frame and the two values
-        frame = get_var_frame(self.arg1)
-        value1 = get_symbol_value(self.arg2)
-        value2 = get_symbol_value(self.arg3)
+        frame = get_var_frame(vm, self.arg1)
+        value1 = get_symbol_value(vm, self.arg2)
+        value2 = get_symbol_value(vm, self.arg3)
 
         # checks the value types and does the multiplication
         if type(value1) != int or type(value2) != int:
             error.error_exit("Wrong operand type!", 53)
         else:
-            frame.update(self.arg1.value[3:], value1 * value2)
+            frame.update(self.arg1.name, value1 * value2)
 
 
 class IDiv(Instruction):
@@ -266,11 +309,11 @@ class IDiv(Instruction):
         self.arg2 = arg2
         self.arg3 = arg3
 
-    def do(self):
+    def do(self, vm):
         # gets the variable frame and the two values
-        frame = get_var_frame(self.arg1)
-        value1 = get_symbol_value(self.arg2)
-        value2 = get_symbol_value(self.arg3)
+        frame = get_var_frame(vm, self.arg1)
+        value1 = get_symbol_value(vm, self.arg2)
+        value2 = get_symbol_value(vm, self.arg3)
 
         # checks the value type
         if type(value1) != int or type(value2) != int:
@@ -280,7 +323,7 @@ class IDiv(Instruction):
             error.error_exit("Division by zero!", 57)
         # does the whole number division
         else:
-            frame.update(self.arg1.value[3:], value1 // value2)
+            frame.update(self.arg1.name, value1 // value2)
 
 
 class Lt(Instruction):
@@ -290,10 +333,10 @@ class Lt(Instruction):
         self.arg2 = arg2
         self.arg3 = arg3
 
-    def do(self):
-        frame = get_var_frame(self.arg1)
-        value1 = get_symbol_value(self.arg2)
-        value2 = get_symbol_value(self.arg3)
+    def do(self, vm):
+        frame = get_var_frame(vm, self.arg1)
+        value1 = get_symbol_value(vm, self.arg2)
+        value2 = get_symbol_value(vm, self.arg3)
 
         # checks for nil
         if value1 is None or value2 is None:
@@ -303,7 +346,7 @@ class Lt(Instruction):
             error.error_exit("Cannot compare operands with different types!", 53)
         # does the comparison itself
         else:
-            frame.update(self.arg1.value[3:], value1 < value2)
+            frame.update(self.arg1.name, value1 < value2)
 
 
 class Gt(Instruction):
@@ -313,10 +356,10 @@ class Gt(Instruction):
         self.arg2 = arg2
         self.arg3 = arg3
 
-    def do(self):
-        frame = get_var_frame(self.arg1)
-        value1 = get_symbol_value(self.arg2)
-        value2 = get_symbol_value(self.arg3)
+    def do(self, vm):
+        frame = get_var_frame(vm, self.arg1)
+        value1 = get_symbol_value(vm, self.arg2)
+        value2 = get_symbol_value(vm, self.arg3)
 
         # checks for nil
         if value1 is None or value2 is None:
@@ -326,7 +369,7 @@ class Gt(Instruction):
             error.error_exit("Cannot compare operands with different types!", 53)
         # does the comparison
         else:
-            frame.update(self.arg1.value[3:], value1 > value2)
+            frame.update(self.arg1.name, value1 > value2)
 
 
 class Eq(Instruction):
@@ -336,16 +379,16 @@ class Eq(Instruction):
         self.arg2 = arg2
         self.arg3 = arg3
 
-    def do(self):
-        frame = get_var_frame(self.arg1)
-        value1 = get_symbol_value(self.arg2)
-        value2 = get_symbol_value(self.arg3)
+    def do(self, vm):
+        frame = get_var_frame(vm, self.arg1)
+        value1 = get_symbol_value(vm, self.arg2)
+        value2 = get_symbol_value(vm, self.arg3)
 
         # checks if the types are the same or if at least one type is nil
         if not type(value1) == type(value2) and value1 is not None and value2 is not None:
             error.error_exit("Cannot compare operands with different types!", 53)
         else:
-            frame.update(self.arg1.value[3:], value1 == value2) # compares
+            frame.update(self.arg1.name, value1 == value2) # compares
 
 
 class And(Instruction):
@@ -355,16 +398,16 @@ class And(Instruction):
         self.arg2 = arg2
         self.arg3 = arg3
 
-    def do(self):
-        frame = get_var_frame(self.arg1)
-        value1 = get_symbol_value(self.arg2)
-        value2 = get_symbol_value(self.arg3)
+    def do(self, vm):
+        frame = get_var_frame(vm, self.arg1)
+        value1 = get_symbol_value(vm, self.arg2)
+        value2 = get_symbol_value(vm, self.arg3)
 
         # checks for types and does the operation
         if type(value1) != bool or type(value2) != bool:
             error.error_exit("Wrong operand type!", 53)
         else:
-            frame.update(self.arg1.value[3:], value1 and value2)
+            frame.update(self.arg1.name, value1 and value2)
 
 
 class Or(Instruction):
@@ -374,16 +417,16 @@ class Or(Instruction):
         self.arg2 = arg2
         self.arg3 = arg3
 
-    def do(self):
-        frame = get_var_frame(self.arg1)
-        value1 = get_symbol_value(self.arg2)
-        value2 = get_symbol_value(self.arg3)
+    def do(self, vm):
+        frame = get_var_frame(vm, self.arg1)
+        value1 = get_symbol_value(vm, self.arg2)
+        value2 = get_symbol_value(vm, self.arg3)
 
         # checks for types and does the operation
         if type(value1) != bool or type(value2) != bool:
             error.error_exit("Wrong operand type!", 53)
         else:
-            frame.update(self.arg1.value[3:], value1 or value2)
+            frame.update(self.arg1.name, value1 or value2)
 
 
 class Not(Instruction):
@@ -392,15 +435,15 @@ class Not(Instruction):
         self.arg1 = arg1
         self.arg2 = arg2
 
-    def do(self):
-        frame = get_var_frame(self.arg1)
-        value = get_symbol_value(self.arg2)
+    def do(self, vm):
+        frame = get_var_frame(vm, self.arg1)
+        value = get_symbol_value(vm, self.arg2)
 
         # checks for type and does the operation
         if type(value) != bool:
             error.error_exit("Wrong operand type!", 53)
         else:
-            frame.update(self.arg1.value[3:], not value)
+            frame.update(self.arg1.name, not value)
 
 
 class Int2Char(Instruction):
@@ -409,9 +452,9 @@ class Int2Char(Instruction):
         self.arg1 = arg1
         self.arg2 = arg2
 
-    def do(self):
-        frame = get_var_frame(self.arg1)
-        value = get_symbol_value(self.arg2)
+    def do(self, vm):
+        frame = get_var_frame(vm, self.arg1)
+        value = get_symbol_value(vm, self.arg2)
 
         # checks if the value is int
         if type(value) != int:
@@ -419,7 +462,7 @@ class Int2Char(Instruction):
 
         # tries to convert the int into char with chr()
         try:
-            frame.update(self.arg1.value[3:], chr(value))
+            frame.update(self.arg1.name, chr(value))
         except ValueError:
             # captures the exception when given wrong value and prints the error message
             error.error_exit("Non valid value!", 58)
@@ -432,20 +475,20 @@ class Stri2Int(Instruction):
         self.arg2 = arg2
         self.arg3 = arg3
 
-    def do(self):
-        frame = get_var_frame(self.arg1)
-        value1 = get_symbol_value(self.arg2)
-        value2 = get_symbol_value(self.arg3)
+    def do(self, vm):
+        frame = get_var_frame(vm, self.arg1)
+        value1 = get_buffered_symbol_value(vm, self.arg2)
+        value2 = get_symbol_value(vm, self.arg3)
 
         # checks for symbol types
-        if type(value1) != str or type(value2) != int:
+        if type(value1) not in string_types or type(value2) != int:
             error.error_exit("Wrong operand type!", 53)
         if value2 >= len(value1):
             error.error_exit("Index out of range!", 58)
 
         # tries to convert the char into int
         try:
-            frame.update(self.arg1.value[3:], ord(value1[value2]))
+            frame.update(self.arg1.name, ord(value1[value2]))
         except ValueError:
             # captures the exception and prints the error message
             error.error_exit("Non valid value!", 58)
@@ -457,41 +500,10 @@ class Read(Instruction):
         self.arg1 = arg1
         self.arg2 = arg2
 
-    def do(self):
-        frame = get_var_frame(self.arg1)
-
-        # check if the arguments is of the type "type"
-        if self.arg2.arg_type != "type":
-            error.error_exit("Type must be specified!", 32)
-
-        value = get_symbol_value(self.arg2)  # get its value
-
-        # it MUST be either int, string or bool
-        if value not in ["int", "string", "bool"]:
-            error.error_exit("Wrong specified type!", 53)
-
-        # read line from the input source
-        inputted = g.READ_INPUT.readline()
-        if inputted == "":
-            # nothing was inputted
-            frame.update(self.arg1.value[3:], None)
-        elif value == "int":
-            # try to convert the input into int
-            try:
-                frame.update(self.arg1.value[3:], int(inputted))
-            except ValueError:
-                frame.update(self.arg1.value[3:], None)
-        elif value == "string":
-            # get the string
-            frame.update(self.arg1.value[3:], inputted)
-        elif value == "bool":
-            # get bool value
-            if inputted.lower() == "true":
-                frame.update(self.arg1.value[3:], True)
-            elif inputted.lower() == "false":
-                frame.update(self.arg1.value[3:], False)
-            else:
-                frame.update(self.arg1.value[3:], None)
+    def do(self, vm):
+        frame = get_var_frame(vm, self.arg1)
+        # the type was checked to be int, string or bool while parsing
+        frame.update(self.arg1.name, read_value(vm, self.arg2.value))
 
 
 class Write(Instruction):
@@ -499,18 +511,9 @@ class Write(Instruction):
         super().__init__(order)
         self.arg1 = arg1
 
-    def do(self):
-        # gets the value and prints it (and flushes it to be printed right now)
-        value = get_symbol_value(self.arg1)
-        if type(value) == bool:
-            if value:
-                print("true", end="", flush=True)
-            else:
-                print("false", end="", flush=True)
-        elif value is None:
-            print("", end="", flush=True)
-        else:
-            print(value, end="", flush=True)
+    def do(self, vm):
+        # gets the value and prints it
+        write_value(vm, get_symbol_value(vm, self.arg1))
 
 
 class Concat(Instruction):
@@ -520,17 +523,28 @@ class Concat(Instruction):
         self.arg2 = arg2
         self.arg3 = arg3
 
-    def do(self):
-        frame = get_var_frame(self.arg1)
-        value1 = get_symbol_value(self.arg2)
-        value2 = get_symbol_value(self.arg3)
+    def do(self, vm):
+        frame = get_var_frame(vm, self.arg1)
+        value1 = get_symbol_value(vm, self.arg2)
+        value2 = get_symbol_value(vm, self.arg3)
 
         # checks for correct types
         if type(value1) != str or type(value2) != str:
             error.error_exit("Wrong operand type!", 53)
 
         # concats the strings
-        frame.update(self.arg1.value[3:], value1 + value2)
+        if self.appends():
+            # the variable drops its string first, so if nothing else refers to it,
+            # CPython resizes the string in place instead of copying it (amortized O(1) appends)
+            frame.dictionary[self.arg1.name] = None
+            value1 += value2
+            frame.dictionary[self.arg1.name] = value1
+        else:
+            frame.update(self.arg1.name, value1 + value2)
+
+    # checks if the instruction appends to the string of its own variable (e.g. CONCAT GF@s GF@s GF@c)
+    def appends(self):
+        return self.arg2.arg_type == "var" and self.arg2.value == self.arg1.value
 
 
 class StrLen(Instruction):
@@ -539,14 +553,14 @@ class StrLen(Instruction):
         self.arg1 = arg1
         self.arg2 = arg2
 
-    def do(self):
-        frame = get_var_frame(self.arg1)
-        value = get_symbol_value(self.arg2)
+    def do(self, vm):
+        frame = get_var_frame(vm, self.arg1)
+        value = get_buffered_symbol_value(vm, self.arg2)
 
-        if type(value) != str:
+        if type(value) not in string_types:
             error.error_exit("Wrong operand type!", 53)
 
-        frame.update(self.arg1.value[3:], len(value)) # gets the string length
+        frame.update(self.arg1.name, len(value)) # gets the string length
 
 
 class GetChar(Instruction):
@@ -556,20 +570,20 @@ class GetChar(Instruction):
         self.arg2 = arg2
         self.arg3 = arg3
 
-    def do(self):
-        frame = get_var_frame(self.arg1)
-        value1 = get_symbol_value(self.arg2)
-        value2 = get_symbol_value(self.arg3)
+    def do(self, vm):
+        frame = get_var_frame(vm, self.arg1)
+        value1 = get_buffered_symbol_value(vm, self.arg2)
+        value2 = get_symbol_value(vm, self.arg3)
 
         # check for correct types
-        if type(value1) != str or type(value2) != int:
+        if type(value1) not in string_types or type(value2) != int:
             error.error_exit("Wrong operand type!", 53)
         # and if the index is in the range
         elif value2 >= len(value1):
             error.error_exit("Index out of range!", 58)
         # then get the char
         else:
-            frame.update(self.arg1.value[3:], value1[value2])
+            frame.update(self.arg1.name, value1[value2])
 
 
 class SetChar(Instruction):
@@ -579,23 +593,25 @@ class SetChar(Instruction):
         self.arg2 = arg2
         self.arg3 = arg3
 
-    def do(self):
-        frame = get_var_frame(self.arg1)
-        value1 = get_symbol_value(self.arg1)
-        value2 = get_symbol_value(self.arg2)
-        value3 = get_symbol_value(self.arg3)
+    def do(self, vm):
+        frame = get_var_frame(vm, self.arg1)
+        value1 = get_buffered_symbol_value(vm, self.arg1)
+        value2 = get_symbol_value(vm, self.arg2)
+        value3 = get_symbol_value(vm, self.arg3)
 
         # check for the values, if they have the correct types
-        if type(value1) != str or type(value2) != int or type(value3) != str:
+        if type(value1) not in string_types or type(value2) != int or type(value3) != str:
             error.error_exit("Wrong operand type!", 53)
         # check if the index is out of range or the string is empty
         elif value2 >= len(value1) or value3 == "":
             error.error_exit("Wrong operation with strings!", 58)
         else:
-            string = value1
-            # split the string and set the char
-            final_string = string[:value2] + value3 + string[value2 + 1:]
-            frame.update(self.arg1.value[3:], final_string)
+            # the first change moves the string into a character buffer, the next ones change it in place
+            # (it is stored again, reading the third symbol could have made the variable a string)
+            if type(value1) == str:
+                value1 = mem.CharBuffer(value1)
+            value1.set_char(value2, value3)
+            frame.update(self.arg1.name, value1)
 
 
 class Type(Instruction):
@@ -604,30 +620,30 @@ class Type(Instruction):
         self.arg1 = arg1
         self.arg2 = arg2
 
-    def do(self):
-        frame = get_var_frame(self.arg1)
+    def do(self, vm):
+        frame = get_var_frame(vm, self.arg1)
 
         # if the type of the symbol is variable
         if self.arg2.arg_type == "var":
-            symbol_frame = get_var_frame(self.arg2)
+            symbol_frame = get_var_frame(vm, self.arg2)
             # and the variable has no type (it is uninitialized)
-            if self.arg2.value[3:] in symbol_frame.defined_vars:
+            if symbol_frame.is_uninitialized(self.arg2.name):
                 # return empty string
-                frame.update(self.arg1.value[3:], "")
+                frame.update(self.arg1.name, "")
                 return
 
         # get the value
-        value = get_symbol_value(self.arg2)
+        value = get_symbol_value(vm, self.arg2)
 
         # check for its type and save the string corresponding to the type
         if value is None:
-            frame.update(self.arg1.value[3:], "nil")
+            frame.update(self.arg1.name, "nil")
         elif type(value) == int:
-            frame.update(self.arg1.value[3:], "int")
+            frame.update(self.arg1.name, "int")
         elif type(value) == bool:
-            frame.update(self.arg1.value[3:], "bool")
+            frame.update(self.arg1.name, "bool")
         elif type(value) == str:
-            frame.update(self.arg1.value[3:], "string")
+            frame.update(self.arg1.name, "string")
 
 
 class Label(Instruction):
@@ -635,17 +651,8 @@ class Label(Instruction):
         super().__init__(order)
         self.arg1 = arg1
 
-    def do(self):
-        # add the label into the labels variable (with the order of this instruction)
-        g.LABELS.add(self.arg1.value, self.order)
-
-
-class PassLabel(Instruction):
-    def __init__(self, order):
-        super().__init__(order)
-
-    def do(self):
-        # a function representing labels once the labels were already checked
+    def do(self, vm):
+        # labels are saved into the labels variable while parsing, so there is nothing to do
         pass
 
 
@@ -654,9 +661,9 @@ class Jump(Instruction):
         super().__init__(order)
         self.arg1 = arg1
 
-    def do(self):
-        # set the current order variable to the order of the label
-        g.CURRENT_ORDER = g.LABELS.get(self.arg1.value)
+    def do(self, vm):
+        # set the program counter to the position of the label
+        vm.pc = vm.labels.get(self.arg1.value)
 
 
 class JumpIfEq(Instruction):
@@ -666,9 +673,9 @@ class JumpIfEq(Instruction):
         self.arg2 = arg2
         self.arg3 = arg3
 
-    def do(self):
-        value1 = get_symbol_value(self.arg2)
-        value2 = get_symbol_value(self.arg3)
+    def do(self, vm):
+        value1 = get_symbol_value(vm, self.arg2)
+        value2 = get_symbol_value(vm, self.arg3)
 
         # check if the types are the same (or there is nil)
         if not type(value1) == type(value2) and value1 is not None and value2 is not None:
@@ -676,7 +683,7 @@ class JumpIfEq(Instruction):
 
         # check the condition itself
         if value1 == value2:
-            g.CURRENT_ORDER = g.LABELS.get(self.arg1.value)
+            vm.pc = vm.labels.get(self.arg1.value)
 
 
 class JumpIfNEq(Instruction):
@@ -686,9 +693,9 @@ class JumpIfNEq(Instruction):
         self.arg2 = arg2
         self.arg3 = arg3
 
-    def do(self):
-        value1 = get_symbol_value(self.arg2)
-        value2 = get_symbol_value(self.arg3)
+    def do(self, vm):
+        value1 = get_symbol_value(vm, self.arg2)
+        value2 = get_symbol_value(vm, self.arg3)
 
         # check if the types are the same (or there is nil)
         if not type(value1) == type(value2) and value1 is not None and value2 is not None:
@@ -696,7 +703,7 @@ class JumpIfNEq(Instruction):
 
         # check the condition itself
         if value1 != value2:
-            g.CURRENT_ORDER = g.LABELS.get(self.arg1.value)
+            vm.pc = vm.labels.get(self.arg1.value)
 
 
 class Exit(Instruction):
@@ -704,8 +711,8 @@ class Exit(Instruction):
         super().__init__(order)
         self.arg1 = arg1
 
-    def do(self):
-        value = get_symbol_value(self.arg1)
+    def do(self, vm):
+        value = get_symbol_value(vm, self.arg1)
 
         # check if the type is int
         if type(value) != int:
@@ -714,7 +721,7 @@ class Exit(Instruction):
         if value < 0 or value > 49:
             error.error_exit("Wrong operand value!", 57)
 
-        sys.exit(value)
+        raise error.ProgramExit(value)
 
 
 class DPrint(Instruction):
@@ -722,37 +729,495 @@ class DPrint(Instruction):
         super().__init__(order)
         self.arg1 = arg1
 
-    def do(self):
-        value = get_symbol_value(self.arg1.value)
+    def do(self, vm):
+        value = get_symbol_value(vm, self.arg1)
+        vm.output.flush()  # everything written before has to be printed before this
 
         # print the value of the given symbol into stderr
         if type(value) == bool:
             if value:
-                print("true", end='', file=sys.stderr)
+                print("true", end='', file=vm.stderr)
             else:
-                print("false", end='', file=sys.stderr)
+                print("false", end='', file=vm.stderr)
         elif value is None:
-            print("", end='', file=sys.stderr)
+            print("", end='', file=vm.stderr)
         else:
-            print(value, end='', file=sys.stderr)
+            print(value, end='', file=vm.stderr)
 
 
 class Break(Instruction):
     def __init__(self, order):
         super().__init__(order)
 
-    def do(self):
+    def do(self, vm):
+        vm.output.flush()  # everything written before has to be printed before this
+
         # print information about the program to stderr
-        print("Current instruction order: " + str(g.CURRENT_ORDER), file=sys.stderr)
-        print("Temporary frame: ", file=sys.stderr)
-        if g.TEMPORARY_F is not None:
-            print(g.TEMPORARY_F.dictionary, file=sys.stderr)
-        print("Local frame variables: ", file=sys.stderr)
-        if g.LOCAL_F is not None:
-            print(g.LOCAL_F.dictionary, file=sys.stderr)
-        print("Global frame variables: ", file=sys.stderr)
-        print(g.GLOBAL_F.dictionary, file=sys.stderr)
-        print("Number of elements in stack: " + str(len(g.STACK.list)), file=sys.stderr)
-        # -1, since there is the first helper None element
-        print("Number of elements in frame stack: " + str(len(g.FRAME_STACK.list) - 1), file=sys.stderr)
-        print("Number of elements in orders stack: " + str(len(g.ORDER_STACK.list)), file=sys.stderr)
+        print("Current instruction order: " + str(vm.program.instructions[vm.pc].order), file=vm.stderr)
+        print("Temporary frame: ", file=vm.stderr)
+        if vm.temporary_f is not None:
+            print(vm.temporary_f.initialized(), file=vm.stderr)
+        print("Local frame variables: ", file=vm.stderr)
+        if vm.local_f is not None:
+            print(vm.local_f.initialized(), file=vm.stderr)
+        print("Global frame variables: ", file=vm.stderr)
+        print(vm.global_f.initialized(), file=vm.stderr)
+        print_stack_sizes(vm)
+
+
+# STACK INSTRUCTIONS (the STACK extension, the symbols are popped from the data stack and the result is pushed
+# into it, the checks and errors are the same as of the instructions working with variables):
+
+class ClearS(Instruction):
+    def __init__(self, order):
+        super().__init__(order)
+
+    def do(self, vm):
+        vm.stack.list.clear()
+
+
+class AddS(Instruction):
+    def __init__(self, order):
+        super().__init__(order)
+
+    def do(self, vm):
+        value1, value2 = pop_operands(vm)
+        if type(value1) != int or type(value2) != int:
+            error.error_exit("Wrong operand type!", 53)
+        vm.stack.push(value1 + value2)
+
+
+class SubS(Instruction):
+    def __init__(self, order):
+        super().__init__(order)
+
+    def do(self, vm):
+        value1, value2 = pop_operands(vm)
+        if type(value1) != int or type(value2) != int:
+            error.error_exit("Wrong operand type!", 53)
+        vm.stack.push(value1 - value2)
+
+
+class MulS(Instruction):
+    def __init__(self, order):
+        super().__init__(order)
+
+    def do(self, vm):
+        value1, value2 = pop_operands(vm)
+        if type(value1) != int or type(value2) != int:
+            error.error_exit("Wrong operand type!", 53)
+        vm.stack.push(value1 * value2)
+
+
+class IDivS(Instruction):
+    def __init__(self, order):
+        super().__init__(order)
+
+    def do(self, vm):
+        value1, value2 = pop_operands(vm)
+        if type(value1) != int or type(value2) != int:
+            error.error_exit("Wrong operand type!", 53)
+        elif value2 == 0:
+            error.error_exit("Division by zero!", 57)
+        vm.stack.push(value1 // value2)
+
+
+class LtS(Instruction):
+    def __init__(self, order):
+        super().__init__(order)
+
+    def do(self, vm):
+        value1, value2 = pop_operands(vm)
+        if value1 is None or value2 is None:
+            error.error_exit("Cannot compare with nil@nil", 53)
+        elif not type(value1) == type(value2):
+            error.error_exit("Cannot compare operands with different types!", 53)
+        vm.stack.push(value1 < value2)
+
+
+class GtS(Instruction):
+    def __init__(self, order):
+        super().__init__(order)
+
+    def do(self, vm):
+        value1, value2 = pop_operands(vm)
+        if value1 is None or value2 is None:
+            error.error_exit("Cannot compare with nil@nil", 53)
+        elif not type(value1) == type(value2):
+            error.error_exit("Cannot compare operands with different types!", 53)
+        vm.stack.push(value1 > value2)
+
+
+class EqS(Instruction):
+    def __init__(self, order):
+        super().__init__(order)
+
+    def do(self, vm):
+        value1, value2 = pop_operands(vm)
+        if not type(value1) == type(value2) and value1 is not None and value2 is not None:
+            error.error_exit("Cannot compare operands with different types!", 53)
+        vm.stack.push(value1 == value2)
+
+
+class AndS(Instruction):
+    def __init__(self, order):
+        super().__init__(order)
+
+    def do(self, vm):
+        value1, value2 = pop_operands(vm)
+        if type(value1) != bool or type(value2) != bool:
+            error.error_exit("Wrong operand type!", 53)
+        vm.stack.push(value1 and value2)
+
+
+class OrS(Instruction):
+    def __init__(self, order):
+        super().__init__(order)
+
+    def do(self, vm):
+        value1, value2 = pop_operands(vm)
+        if type(value1) != bool or type(value2) != bool:
+            error.error_exit("Wrong operand type!", 53)
+        vm.stack.push(value1 or value2)
+
+
+class NotS(Instruction):
+    def __init__(self, order):
+        super().__init__(order)
+
+    def do(self, vm):
+        value = vm.stack.pop()
+        if type(value) != bool:
+            error.error_exit("Wrong operand type!", 53)
+        vm.stack.push(not value)
+
+
+class Int2CharS(Instruction):
+    def __init__(self, order):
+        super().__init__(order)
+
+    def do(self, vm):
+        value = vm.stack.pop()
+        if type(value) != int:
+            error.error_exit("Wrong operand type!", 53)
+        try:
+            vm.stack.push(chr(value))
+        except ValueError:
+            error.error_exit("Non valid value!", 58)
+
+
+class Stri2IntS(Instruction):
+    def __init__(self, order):
+        super().__init__(order)
+
+    def do(self, vm):
+        value1, value2 = pop_operands(vm)
+        if type(value1) != str or type(value2) != int:
+            error.error_exit("Wrong operand type!", 53)
+        if value2 >= len(value1):
+            error.error_exit("Index out of range!", 58)
+        try:
+            vm.stack.push(ord(value1[value2]))
+        except ValueError:
+            error.error_exit("Non valid value!", 58)
+
+
+class JumpIfEqS(Instruction):
+    def __init__(self, order, arg1):
+        super().__init__(order)
+        self.arg1 = arg1
+
+    def do(self, vm):
+        value1, value2 = pop_operands(vm)
+        if not type(value1) == type(value2) and value1 is not None and value2 is not None:
+            error.error_exit("Wrong operand type!", 53)
+        if value1 == value2:
+            vm.pc = vm.labels.get(self.arg1.value)
+
+
+class JumpIfNEqS(Instruction):
+    def __init__(self, order, arg1):
+        super().__init__(order)
+        self.arg1 = arg1
+
+    def do(self, vm):
+        value1, value2 = pop_operands(vm)
+        if not type(value1) == type(value2) and value1 is not None and value2 is not None:
+            error.error_exit("Wrong operand type!", 53)
+        if value1 != value2:
+            vm.pc = vm.labels.get(self.arg1.value)
+
+
+# FUSED INSTRUCTIONS (the optimizer replaces sequences of instructions by them, the original instructions
+# are kept in "parts", the checks and errors are the same as of the parts run one after another):
+
+class Fused(Instruction):
+    def __init__(self, parts):
+        super().__init__(parts[0].order)
+        self.parts = parts
+
+
+# a helper function for checking if the symbol of a jump is the variable written by the instruction before it
+# (a string constant like "string@GF@x" has the same value as the variable)
+def is_same_variable(symbol, variable):
+    return symbol.arg_type == "var" and symbol.value == variable.value
+
+
+# LT or GT into a variable followed by a conditional jump comparing the variable with a bool constant
+class RelationalJump(Fused):
+    def __init__(self, parts, operation):
+        super().__init__(parts)
+        compare, jump = parts
+        self.arg1 = compare.arg1
+        self.arg2 = compare.arg2
+        self.arg3 = compare.arg3
+        self.operation = operation  # operator.lt or operator.gt
+        self.label = jump.arg1.value
+        constant = jump.arg3 if is_same_variable(jump.arg2, compare.arg1) else jump.arg2
+        self.expected = constant.value if isinstance(jump, JumpIfEq) else not constant.value  # result to jump on
+
+    def do(self, vm):
+        frame = get_var_frame(vm, self.arg1)
+        value1 = get_symbol_value(vm, self.arg2)
+        value2 = get_symbol_value(vm, self.arg3)
+
+        # checks for nil
+        if value1 is None or value2 is None:
+            error.error_exit("Cannot compare with nil@nil", 53)
+        # checks if the types are the same
+        elif not type(value1) == type(value2):
+            error.error_exit("Cannot compare operands with different types!", 53)
+
+        result = self.operation(value1, value2)
+        frame.update(self.arg1.name, result)
+        if result == self.expected:
+            vm.pc = vm.labels.get(self.label)
+
+
+# EQ into a variable followed by a conditional jump comparing the variable with a bool constant
+class EqualJump(RelationalJump):
+    def do(self, vm):
+        frame = get_var_frame(vm, self.arg1)
+        value1 = get_symbol_value(vm, self.arg2)
+        value2 = get_symbol_value(vm, self.arg3)
+
+        # checks if the types are the same or if at least one type is nil
+        if not type(value1) == type(value2) and value1 is not None and value2 is not None:
+            error.error_exit("Cannot compare operands with different types!", 53)
+
+        result = value1 == value2
+        frame.update(self.arg1.name, result)
+        if result == self.expected:
+            vm.pc = vm.labels.get(self.label)
+
+
+# ADD or SUB into a variable followed by a conditional jump comparing the variable with a symbol
+class ArithmeticJump(Fused):
+    def __init__(self, parts, operation):
+        super().__init__(parts)
+        arithmetic, jump = parts
+        self.arg1 = arithmetic.arg1
+        self.arg2 = arithmetic.arg2
+        self.arg3 = arithmetic.arg3
+        self.operation = operation  # operator.add or operator.sub
+        self.label = jump.arg1.value
+        self.other = jump.arg3 if is_same_variable(jump.arg2, arithmetic.arg1) else jump.arg2
+        self.equal = isinstance(jump, JumpIfEq)  # jump on equal (JUMPIFEQ) or not equal (JUMPIFNEQ) values
+
+    def do(self, vm):
+        frame = get_var_frame(vm, self.arg1)
+        value1 = get_symbol_value(vm, self.arg2)
+        value2 = get_symbol_value(vm, self.arg3)
+
+        # checks the value types and does the operation
+        if type(value1) != int or type(value2) != int:
+            error.error_exit("Wrong operand type!", 53)
+        value = self.operation(value1, value2)
+        frame.update(self.arg1.name, value)
+
+        # the other symbol of the jump is read after the variable is written (it can be the same variable)
+        other = get_symbol_value(vm, self.other)
+        if type(other) != int and other is not None:
+            error.error_exit("Wrong operand type!", 53)
+        if (value == other) == self.equal:
+            vm.pc = vm.labels.get(self.label)
+
+
+# DEFVAR followed by MOVE into the defined variable
+class DefVarMove(Fused):
+    def __init__(self, parts):
+        super().__init__(parts)
+        defvar, move = parts
+        self.arg1 = move.arg1
+        self.arg2 = move.arg2
+
+    def do(self, vm):
+        frame = get_var_frame(vm, self.arg1)
+        frame.create(self.arg1.name)
+        value = get_symbol_value(vm, self.arg2)
+        frame.dictionary[self.arg1.name] = value  # the variable exists now
+
+
+# CREATEFRAME, PUSHFRAME and CALL (a call of a function without parameters)
+class CallFrame(Fused):
+    def __init__(self, parts):
+        super().__init__(parts)
+        self.arg1 = parts[-1].arg1
+
+    def do(self, vm):
+        if vm.statistics is not None:
+            vm.statistics.create_frame(vm)
+
+        # the new frame goes right into the local frame and the temporary frame is empty after PUSHFRAME
+        vm.frame_stack.push(vm.local_f)
+        vm.local_f = mem.Frame()
+        vm.temporary_f = None
+
+        vm.order_stack.push(vm.pc)  # save current program counter into order stack
+        vm.pc = vm.labels.get(self.arg1.value)  # set the program counter to the label position
+
+
+# UNCHECKED INSTRUCTIONS (the optimizer uses them where the types of the symbols are proven by the type
+# inference, so they do not check the types, the other checks and errors stay):
+
+class UncheckedAdd(Add):
+    checked = False
+
+    def do(self, vm):
+        frame = get_var_frame(vm, self.arg1)
+        frame.update(self.arg1.name, get_symbol_value(vm, self.arg2) + get_symbol_value(vm, self.arg3))
+
+
+class UncheckedSub(Sub):
+    checked = False
+
+    def do(self, vm):
+        frame = get_var_frame(vm, self.arg1)
+        frame.update(self.arg1.name, get_symbol_value(vm, self.arg2) - get_symbol_value(vm, self.arg3))
+
+
+class UncheckedMul(Mul):
+    checked = False
+
+    def do(self, vm):
+        frame = get_var_frame(vm, self.arg1)
+        frame.update(self.arg1.name, get_symbol_value(vm, self.arg2) * get_symbol_value(vm, self.arg3))
+
+
+class UncheckedIDiv(IDiv):
+    checked = False
+
+    def do(self, vm):
+        frame = get_var_frame(vm, self.arg1)
+        value1 = get_symbol_value(vm, self.arg2)
+        value2 = get_symbol_value(vm, self.arg3)
+
+        # checks for division by zero
+        if value2 == 0:
+            error.error_exit("Division by zero!", 57)
+        frame.update(self.arg1.name, value1 // value2)
+
+
+class UncheckedLt(Lt):
+    checked = False
+
+    def do(self, vm):
+        frame = get_var_frame(vm, self.arg1)
+        frame.update(self.arg1.name, get_symbol_value(vm, self.arg2) < get_symbol_value(vm, self.arg3))
+
+
+class UncheckedGt(Gt):
+    checked = False
+
+    def do(self, vm):
+        frame = get_var_frame(vm, self.arg1)
+        frame.update(self.arg1.name, get_symbol_value(vm, self.arg2) > get_symbol_value(vm, self.arg3))
+
+
+class UncheckedEq(Eq):
+    checked = False
+
+    def do(self, vm):
+        frame = get_var_frame(vm, self.arg1)
+        frame.update(self.arg1.name, get_symbol_value(vm, self.arg2) == get_symbol_value(vm, self.arg3))
+
+
+class UncheckedAnd(And):
+    checked = False
+
+    def do(self, vm):
+        frame = get_var_frame(vm, self.arg1)
+        value1 = get_symbol_value(vm, self.arg2)
+        value2 = get_symbol_value(vm, self.arg3)
+        frame.update(self.arg1.name, value1 and value2)
+
+
+class UncheckedOr(Or):
+    checked = False
+
+    def do(self, vm):
+        frame = get_var_frame(vm, self.arg1)
+        value1 = get_symbol_value(vm, self.arg2)
+        value2 = get_symbol_value(vm, self.arg3)
+        frame.update(self.arg1.name, value1 or value2)
+
+
+class UncheckedNot(Not):
+    checked = False
+
+    def do(self, vm):
+        frame = get_var_frame(vm, self.arg1)
+        frame.update(self.arg1.name, not get_symbol_value(vm, self.arg2))
+
+
+class UncheckedConcat(Concat):
+    checked = False
+
+    def do(self, vm):
+        frame = get_var_frame(vm, self.arg1)
+        value1 = get_symbol_value(vm, self.arg2)
+        value2 = get_symbol_value(vm, self.arg3)
+        if self.appends():
+            frame.dictionary[self.arg1.name] = None
+            value1 += value2
+            frame.dictionary[self.arg1.name] = value1
+        else:
+            frame.update(self.arg1.name, value1 + value2)
+
+
+class UncheckedStrLen(StrLen):
+    checked = False
+
+    def do(self, vm):
+        frame = get_var_frame(vm, self.arg1)
+        frame.update(self.arg1.name, len(get_buffered_symbol_value(vm, self.arg2)))
+
+
+class UncheckedGetChar(GetChar):
+    checked = False
+
+    def do(self, vm):
+        frame = get_var_frame(vm, self.arg1)
+        value1 = get_buffered_symbol_value(vm, self.arg2)
+        value2 = get_symbol_value(vm, self.arg3)
+
+        # the index still has to be in the range
+        if value2 >= len(value1):
+            error.error_exit("Index out of range!", 58)
+        frame.update(self.arg1.name, value1[value2])
+
+
+class UncheckedJumpIfEq(JumpIfEq):
+    checked = False
+
+    def do(self, vm):
+        if get_symbol_value(vm, self.arg2) == get_symbol_value(vm, self.arg3):
+            vm.pc = vm.labels.get(self.arg1.value)
+
+
+class UncheckedJumpIfNEq(JumpIfNEq):
+    checked = False
+
+    def do(self, vm):
+        if get_symbol_value(vm, self.arg2) != get_symbol_value(vm, self.arg3):
+            vm.pc = vm.labels.get(self.arg1.value)
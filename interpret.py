@@ -1,9 +1,15 @@
 import argparse
 import sys
-import xml.etree.ElementTree as ET
+import time
 
-import globals as g
-from parsing import ParseXml
+import interpreter
+import optimizer
+import profiler
+import tracer
+import watchdog
+import stats
+import streams
+import cache
 import error
 
 
@@ -12,41 +18,138 @@ def main():
     parser = argparse.ArgumentParser(description="Interpret for the IPPcode23 programming language.")
     parser.add_argument("--source", dest="source", help="a path to the XML file to interpret")
     parser.add_argument("--input", dest="input", help="a path to the file with user inputs")
+    parser.add_argument("--engine", dest="engine", choices=["reference", "closure", "aot"],
+                        default="reference", help="run the \"do\" methods of the instructions (reference), "
+                                                  "the instructions compiled into closures (closure) "
+                                                  "or the program translated into a Python function (aot, a large "
+                                                  "program is run by the closure engine)")
+    parser.add_argument("--flush", dest="flush", choices=["always", "line", "exit"], default="line",
+                        help="write the output after every WRITE (always), after a new line (line) "
+                             "or at the end of the program (exit)")
+    parser.add_argument("--cache-dir", dest="cache_dir",
+                        help="a path to the directory for caching the loaded programs")
+    parser.add_argument("--cache-size", dest="cache_size", type=int, default=256 * 1024 * 1024,
+                        help="the maximum size of the cache directory in bytes")
+    parser.add_argument("--optimize", dest="optimize", action="store_true",
+                        help="run the peephole optimizer over the loaded program")
+    parser.add_argument("--dump-optimized", dest="dump_optimized", nargs="?", const="",
+                        help="print the optimized program to stderr (or write it to the given file), "
+                             "implies --optimize")
+    instrumentation = parser.add_mutually_exclusive_group()
+    instrumentation.add_argument("--profile", dest="profile", nargs="?", const="",
+                                 help="profile the program and print the tables to stderr "
+                                      "(or write them as JSON to the given file)")
+    instrumentation.add_argument("--trace", dest="trace", type=int,
+                                 help="keep the given number of the last executed instructions with their operands "
+                                      "and print them on an error or at BREAK")
+    parser.add_argument("--trace-every", dest="trace_every", type=int, default=1,
+                        help="record only every k-th executed instruction in the trace")
+    parser.add_argument("--max-instructions", dest="max_instructions", type=int,
+                        help="end the program with the exit code 59 before it executes more instructions")
+    parser.add_argument("--max-time", dest="max_time", type=float,
+                        help="end the program with the exit code 59 after it runs for more seconds")
+    parser.add_argument("--max-stack-depth", dest="max_stack_depth", type=int,
+                        help="end the program with the exit code 59 when the data stack has more values")
+    parser.add_argument("--max-call-depth", dest="max_call_depth", type=int,
+                        help="end the program with the exit code 59 when more calls (or frames in the frame "
+                             "stack) are nested")
+    parser.add_argument("--stats", dest="stats",
+                        help="write the statistics of the run (executed instructions, times, peaks of the stacks "
+                             "and frames, read and written bytes) as JSON to the given file")
 
     arguments = parser.parse_args()
 
-    if arguments.source is None and arguments.input is None:
-        error.error_exit("No argument was specified!", 10)
+    input_file = None
+    program_profiler = None if arguments.profile is None else profiler.Profiler()
+    program_tracer = None
+    program_watchdog = None
+    program_statistics = None if arguments.stats is None else stats.Statistics()
+    try:
+        if arguments.source is None and arguments.input is None:
+            error.error_exit("No argument was specified!", 10)
 
-    # if source or input were not specified, it will be set to sys.stdin
-    if arguments.source is None:
-        input_xml = ET.parse(sys.stdin)
-    else:
-        input_xml = ET.parse(arguments.source)
+        if arguments.trace is not None:
+            if arguments.trace < 1 or arguments.trace_every < 1:
+                error.error_exit("The trace size and the sampling have to be positive!", 10)
+            program_tracer = tracer.Tracer(arguments.trace, arguments.trace_every)
 
-    if arguments.input is None:
-        g.READ_INPUT = sys.stdin
-    else:
-        g.READ_INPUT = open(arguments.input, "r")
+        limits = (arguments.max_instructions, arguments.max_time, arguments.max_stack_depth, arguments.max_call_depth)
+        if any(limit is not None for limit in limits):
+            if any(limit is not None and limit < 0 for limit in limits):
+                error.error_exit("The limits cannot be negative!", 10)
+            program_watchdog = watchdog.Watchdog(*limits)
+        elif program_statistics is not None:
+            program_watchdog = watchdog.Watchdog()  # only counts the instructions
 
-    ParseXml.get_labels(input_xml)  # parse the XML file the first time to get labels and its orders
+        # if source or input were not specified, it will be set to sys.stdin
+        if arguments.source is None:
+            source = sys.stdin.buffer
+        else:
+            source = arguments.source
+
+        if arguments.input is None:
+            read_input = sys.stdin.buffer
+        else:
+            try:
+                input_file = open(arguments.input, "rb", buffering=streams.Input.buffer_size)
+            except OSError:
+                error.error_exit("Cannot open the input file!", 11)
+            read_input = input_file
 
-    instructions = ParseXml.parse(input_xml)  # parse the rest of instructions
+        load_start = time.perf_counter()
+        if arguments.cache_dir is None:
+            program = interpreter.load(source)
+        else:
+            # the program is loaded from the cache if the same source was already loaded before
+            program_cache = cache.ProgramCache(arguments.cache_dir, arguments.cache_size)
+            key, source = program_cache.key(source)
+            program = program_cache.load(key)
+            if program is None:
+                program = program_cache.load_source(source, interpreter.load)
+
+        if arguments.optimize or arguments.dump_optimized is not None:
+            program, statistics = optimizer.optimize(program)
+            if arguments.dump_optimized:
+                try:
+                    with open(arguments.dump_optimized, "w", encoding="utf-8") as dump_file:
+                        optimizer.dump(program, statistics, dump_file)
+                except OSError:
+                    error.error_exit("Cannot write the optimized program!", 12)
+            elif arguments.dump_optimized is not None:
+                optimizer.dump(program, statistics, sys.stderr)
+        if program_statistics is not None:
+            program_statistics.load_time = time.perf_counter() - load_start
 
-    first_order = min(instructions.keys())  # the minimum (first) order
-    last_order = max(instructions.keys())  # the maximum (last) order
+        vm = interpreter.Interpreter(arguments.engine, arguments.flush, program_profiler, program_tracer,
+                                     program_watchdog, program_statistics)
+        exit_code = vm.run(program, read_input, sys.stdout.buffer)
+    except error.InterpretError as interpret_error:
+        # the output of the program is already written, so the message is printed after it
+        sys.stderr.write(interpret_error.message + "\n")
+        exit_code = interpret_error.exit_code
+    finally:
+        if input_file is not None:
+            input_file.close()
 
-    g.CURRENT_ORDER = first_order
-    while g.CURRENT_ORDER <= last_order:
-        # check if the current order is in the instructions dictionary
-        if g.CURRENT_ORDER in instructions:
-            instructions[g.CURRENT_ORDER].do()  # "do" the instruction
-            g.CURRENT_ORDER += 1
+    # the profile is written even when the program ends by an error
+    if program_profiler is not None and program_profiler.program is not None:
+        if arguments.profile:
+            try:
+                program_profiler.write_json(arguments.profile)
+            except OSError:
+                sys.stderr.write("Cannot write the profile file!\n")
         else:
-            # otherwise, add to the current order
-            g.CURRENT_ORDER += 1
+            program_profiler.write_table(sys.stderr)
+
+    # the statistics are written however the run ends (even by an error while loading)
+    if program_statistics is not None:
+        program_statistics.exit_code = exit_code
+        try:
+            program_statistics.write_json(arguments.stats)
+        except OSError:
+            sys.stderr.write("Cannot write the statistics file!\n")
 
-    g.READ_INPUT.close()
+    sys.exit(exit_code)
 
 
 if __name__ == '__main__':
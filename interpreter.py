@@ -0,0 +1,128 @@
+import functools
+import sys
+import time
+
+import memory as mem
+import streams
+import closures
+import translator
+import error
+from parsing import ParseXml
+
+
+# loads the program from the XML source (a path or a binary file)
+def load(source):
+    instructions, labels = ParseXml.parse(source)  # parse the instructions and labels in one pass
+    return ParseXml.load(instructions, labels)  # sort the instructions into a dense list
+
+
+# a class for the interpreter, it owns the whole state of a running program, so more programs can be run
+# one after another (or by more interpreters) in one process
+class Interpreter:
+    def __init__(self, engine="reference", flush="line", profiler=None, tracer=None, watchdog=None,
+                 statistics=None):
+        self.engine = engine  # "reference", "closure" or "aot"
+        self.flush = flush  # flush policy of the output ("always", "line" or "exit")
+        self.profiler = profiler  # profiler.Profiler running the program in its own loop or None
+        self.tracer = tracer  # tracer.Tracer running the program in its own loop or None
+        self.watchdog = watchdog  # watchdog.Watchdog with the limits checked by the loops or None
+        self.statistics = statistics  # stats.Statistics measuring the run or None
+        self.reset(mem.Program([], mem.Labels()), None, None, sys.stderr)
+
+    # sets a new state for running the program
+    def reset(self, program, read_input, output, stderr):
+        self.program = program
+        self.labels = program.labels  # structure for storing labels
+
+        self.frame_stack = mem.Stack()  # stack of frames (LF)
+        self.frame_stack.push(None)  # pushing None to have some item in it
+
+        self.local_f = None  # local frame
+        self.temporary_f = None  # temporary frame
+        self.global_f = mem.Frame()  # global frame
+
+        self.stack = mem.Stack()  # stack for values
+
+        self.pc = 0  # program counter (index of the current instruction in the program)
+        self.order_stack = mem.Stack()  # stack of program counters (with CALL and RETURN)
+
+        self.read_input = read_input  # input to read the lines from (streams.Input)
+        self.output = output  # buffered output of the program (streams.Output)
+        self.stderr = stderr  # text file for DPRINT and BREAK
+
+    # runs the program with the input and output binary files and returns the exit code,
+    # errors of the program are raised as error.InterpretError (after all the output is written)
+    def run(self, program, stdin, stdout, stderr=sys.stderr):
+        self.reset(program, streams.Input(stdin), streams.Output(stdout, self.flush), stderr)
+        if self.statistics is not None:
+            self.statistics.start(self)
+        start = time.perf_counter()
+        try:
+            if self.profiler is not None:
+                self.profiler.run(self, self.instruction_code(program))
+            elif self.tracer is not None:
+                self.tracer.run(self, self.instruction_code(program))
+            elif self.engine == "aot" and translator.is_translated(program):
+                # the program is translated only on its first run (with the checks of the limits separately)
+                if self.watchdog is not None:
+                    if program.watched is None:
+                        program.watched = translator.translate(program, True)
+                    program.watched(self)
+                else:
+                    if program.translated is None:
+                        program.translated = translator.translate(program)
+                    program.translated(self)
+            elif self.watchdog is not None:
+                self.run_watched(self.instruction_code(program))
+            elif self.engine != "reference":
+                self.run_code(closures.compile_program(program, self))
+            else:
+                self.run_reference()
+        except error.ProgramExit as program_exit:
+            return program_exit.exit_code
+        finally:
+            # the buffered output is written however the program ends (even by EXIT or an error)
+            self.output.flush()
+            if self.statistics is not None:
+                self.statistics.finish(self, time.perf_counter() - start)
+            self.read_input.detach()
+        return 0
+
+    # gets a function for each instruction for the loops of the profiler and the tracer
+    # (the aot engine has no separate instructions, so it is replaced by the closure engine)
+    def instruction_code(self, program):
+        if self.engine == "reference":
+            return [functools.partial(instruction.do, self) for instruction in program.instructions]
+        return closures.compile_program(program, self)
+
+    # runs the "do" methods of the instructions,
+    # the program counter is an index into the list, so gaps in the orders cost nothing
+    def run_reference(self):
+        instructions = self.program.instructions
+        instructions_length = len(instructions)
+        while self.pc < instructions_length:
+            instructions[self.pc].do(self)  # "do" the instruction
+            self.pc += 1
+
+    # runs the functions compiled for each instruction
+    def run_code(self, code):
+        code_length = len(code)
+        while self.pc < code_length:
+            code[self.pc]()
+            self.pc += 1
+
+    # runs the functions for each instruction with the checks of the limits (a separate loop, so the other
+    # loops do not pay for the counting)
+    def run_watched(self, code):
+        code_length = len(code)
+        watchdog = self.watchdog
+        steps = watchdog.start()
+        try:
+            while self.pc < code_length:
+                if not steps:
+                    steps = watchdog.check(self)
+                steps -= 1
+                code[self.pc]()
+                self.pc += 1
+        finally:
+            watchdog.stop(steps)
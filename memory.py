@@ -1,35 +1,74 @@
 import error
 
 
+# a value of variables that were defined, but nothing was assigned to them yet
+UNINITIALIZED = object()
+
+
+# a mutable buffer with the characters of a string, a variable changed by SETCHAR holds its string in it,
+# so SETCHAR changes the characters in place instead of copying the whole string
+# (GETCHAR, STRLEN and STRI2INT use the buffer too, any other reading of the variable makes it a string again,
+# so the buffer is never shared with another variable or the stack)
+class CharBuffer(list):
+    def string(self):
+        return "".join(self)
+
+    # replaces the character at the index by the string like string[:index] + string + string[index + 1:] does
+    def set_char(self, index, string):
+        if index == -1:
+            self[:] = self[:-1] + list(string) + self
+        else:
+            self[index:index + 1] = string
+
+    # printed as the string (BREAK)
+    def __repr__(self):
+        return repr(self.string())
+
+
 # a class used for storing the variable frames
 class Frame:
     def __init__(self):
-        self.dictionary = {}  # name : value
-        self.defined_vars = []  # name
+        self.dictionary = {}  # name : value (UNINITIALIZED for defined variables without a value)
 
     # creates a uninitialized variable
     def create(self, name):
-        if name in self.dictionary or name in self.defined_vars:
+        if name in self.dictionary:
             error.error_exit("Redefinition of a variable!", 52)
         else:
-            self.defined_vars.append(name)
+            self.dictionary[name] = UNINITIALIZED
 
-    # updates a value of a variable (and if it was uninitialized, it moves it into the main dictionary)
+    # updates a value of a variable (uninitialized variables become initialized)
     def update(self, name, value):
         if name in self.dictionary:
             self.dictionary[name] = value
-        elif name in self.defined_vars:
-            self.dictionary[name] = value
-            self.defined_vars.remove(name)
         else:
             error.error_exit("The variable does not exist!", 54)
 
-    # gets the value of a variable with given name
+    # gets the value of a variable with given name (uninitialized variables do not exist for reading)
     def get(self, name):
-        if name in self.dictionary:
-            return self.dictionary[name]
-        else:
+        value = self.dictionary.get(name, UNINITIALIZED)
+        if value is UNINITIALIZED:
             error.error_exit("The variable does not exist!", 54)
+        if type(value) is CharBuffer:
+            # the whole string is needed, so the variable gets it back
+            value = self.dictionary[name] = value.string()
+        return value
+
+    # gets the value of a variable like get(), but a string in a character buffer stays in it
+    # (for GETCHAR, STRLEN, STRI2INT and SETCHAR)
+    def get_buffered(self, name):
+        value = self.dictionary.get(name, UNINITIALIZED)
+        if value is UNINITIALIZED:
+            error.error_exit("The variable does not exist!", 54)
+        return value
+
+    # checks if the variable is defined, but has no value yet
+    def is_uninitialized(self, name):
+        return self.dictionary.get(name) is UNINITIALIZED
+
+    # gets a dictionary of all variables that have a value
+    def initialized(self):
+        return {name: value for name, value in self.dictionary.items() if value is not UNINITIALIZED}
 
 
 class Stack:
@@ -48,6 +87,19 @@ class Stack:
             return self.list.pop()
 
 
+# a class for the list of a stack that keeps its largest length (for stats.Statistics, the appends are slower,
+# so only the stacks of measured runs use it)
+class PeakList(list):
+    def __init__(self, items=()):
+        super().__init__(items)
+        self.peak = len(self)
+
+    def append(self, value):
+        list.append(self, value)
+        if len(self) > self.peak:
+            self.peak = len(self)
+
+
 # a class for storing the information about labels
 class Labels:
     def __init__(self):
@@ -65,4 +117,27 @@ class Labels:
         if name in self.dictionary:
             return self.dictionary[name]
         else:
-            error.error_exit("Undefined label!", 52)
\ No newline at end of file
+            error.error_exit("Undefined label!", 52)
+
+    # replaces the orders of all labels with positions in the sorted instruction list
+    def relocate(self, positions):
+        for name in self.dictionary:
+            self.dictionary[name] = positions[self.dictionary[name]]
+
+
+# a class for storing the loaded program, the instructions sorted by their order and the labels
+# (it does not change while running, so one program can be run by many interpreters)
+class Program:
+    def __init__(self, instructions, labels):
+        self.instructions = instructions  # list of instructions
+        self.labels = labels  # Labels with positions in the instruction list
+        self.translated = None  # function translated by the "aot" engine (made on the first run)
+        self.watched = None  # function translated by the "aot" engine with the checks of the limits
+        self.buffered = None  # names of the variables that can hold a CharBuffer (found on the first run)
+
+    # the translated functions are not saved with the program (they are made again after loading)
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["translated"] = None
+        state["watched"] = None
+        return state
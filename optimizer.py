@@ -0,0 +1,366 @@
+import collections
+import copy
+import operator
+
+import instructions as ins
+import memory as mem
+import inference
+from parsing import ParseXml
+
+
+# class of the instruction : its opcode and the kinds of its operands (from the table of the parser)
+opcodes = {instruction_class: (opcode, kinds) for opcode, (instruction_class, kinds) in ParseXml.opcodes.items()}
+
+# instructions computing a value only from their symbols (they are evaluated while optimizing if the symbols
+# are constants)
+pure = (ins.Add, ins.Sub, ins.Mul, ins.IDiv, ins.Lt, ins.Gt, ins.Eq, ins.And, ins.Or, ins.Not, ins.Int2Char,
+        ins.Stri2Int, ins.Concat, ins.StrLen, ins.GetChar, ins.Type)
+
+jumps = (ins.Jump, ins.JumpIfEq, ins.JumpIfNEq, ins.JumpIfEqS, ins.JumpIfNEqS, ins.Call)  # with a label operand
+conditional_jumps = (ins.JumpIfEq, ins.JumpIfNEq)
+ends = (ins.Jump, ins.Return, ins.Exit)  # instructions never continuing with the next one
+
+
+# a class for the interpreter state needed to evaluate one instruction with constant symbols,
+# the result is stored into the variable "GF@result" and a jump only marks the program counter
+class Evaluation:
+    result = ins.Argument("var", "GF@result")
+
+    def __init__(self):
+        self.global_f = mem.Frame()
+        self.global_f.create("result")
+        self.local_f = None
+        self.temporary_f = None
+        self.labels = self
+        self.pc = None
+
+    # the label of a jump is replaced by a marker
+    def get(self, name):
+        return True
+
+
+# gets the argument of a constant with the given value
+def constant(value):
+    if value is None:
+        return ins.Argument("nil", None)
+    if type(value) == bool:
+        return ins.Argument("bool", value)
+    if type(value) == int:
+        return ins.Argument("int", value)
+    return ins.Argument("string", value)
+
+
+def is_constant(argument):
+    return argument.arg_type not in ("var", "label", "type")
+
+
+# gets the opcode and the kinds of the operands of the instruction (the unchecked variants have the opcode
+# of the instruction they are made from)
+def opcode(instruction):
+    for instruction_class in type(instruction).__mro__:
+        if instruction_class in opcodes:
+            return opcodes[instruction_class]
+
+
+# gets the arguments of the instruction with their kinds as (attribute, kind) pairs
+def operands(instruction):
+    name, kinds = opcode(instruction)
+    return [("arg" + str(position), kind) for position, kind in enumerate(kinds, 1)]
+
+
+# a class for the peephole optimizer, it rewrites the list of instructions by simple passes repeated while
+# they change something, the behaviour of the program stays the same (output, errors with their codes and
+# the output of BREAK and DPRINT, so no write to a variable is removed and the orders are kept)
+class Optimizer:
+    max_passes = 16
+
+    def __init__(self, program):
+        self.instructions = list(program.instructions)
+        self.statistics = collections.Counter()  # name of the transformation : number of its uses
+
+    def optimize(self):
+        for _ in range(Optimizer.max_passes):
+            changed = self.fold_constants()
+            changed = self.combine_stack_pairs() or changed
+            changed = self.thread_jumps() or changed
+            changed = self.remove_dead_code() or changed
+            changed = self.remove_labels() or changed
+            if not changed:
+                break
+        self.fuse()
+        self.instructions, unchecked = inference.specialize(self.instructions, self.label_positions())
+        if unchecked:
+            self.statistics["unchecked instructions"] += unchecked
+        return mem.Program(self.instructions, self.make_labels())
+
+    # gets the position of every label in the current list
+    def label_positions(self):
+        return {instruction.arg1.value: index for index, instruction in enumerate(self.instructions)
+                if isinstance(instruction, ins.Label)}
+
+    def make_labels(self):
+        labels = mem.Labels()
+        for name, index in self.label_positions().items():
+            labels.add(name, index)
+        return labels
+
+    # replaces variables having a known constant value by the constant and evaluates instructions with only
+    # constant symbols, the values are known only inside of a block of code without labels, calls
+    # and frame changes (a LF or TF variable means another variable after a frame change)
+    def fold_constants(self):
+        changed = False
+        known = {}  # source of the variable (e.g. "GF@x") : its constant argument
+        for index, instruction in enumerate(self.instructions):
+            if isinstance(instruction, (ins.Label, ins.Call, ins.Return)):
+                known.clear()
+                continue
+            if isinstance(instruction, (ins.CreateFrame, ins.PushFrame, ins.PopFrame)):
+                known = {name: value for name, value in known.items() if name.startswith("GF@")}
+                continue
+
+            # a variable known to hold a constant was written successfully before, so reading it cannot fail
+            arguments = operands(instruction)
+            for attribute, kind in arguments:
+                argument = getattr(instruction, attribute)
+                if kind == "symb" and argument.arg_type == "var" and argument.value in known:
+                    instruction = copy.copy(instruction)
+                    setattr(instruction, attribute, known[argument.value])
+                    self.instructions[index] = instruction
+                    self.statistics["propagated constants"] += 1
+                    changed = True
+
+            if isinstance(instruction, pure) and all(is_constant(getattr(instruction, attribute))
+                                                     for attribute, kind in arguments if kind == "symb"):
+                value = self.evaluate(instruction)
+                if value is not Evaluation:
+                    # the destination is checked by MOVE the same way (the frame first, then the variable)
+                    instruction = ins.Move(instruction.order, instruction.arg1, constant(value))
+                    self.instructions[index] = instruction
+                    self.statistics["folded constants"] += 1
+                    changed = True
+
+            elif isinstance(instruction, conditional_jumps) and is_constant(instruction.arg2) \
+                    and is_constant(instruction.arg3):
+                taken = self.evaluate(instruction)
+                if taken is True:
+                    self.instructions[index] = ins.Jump(instruction.order, instruction.arg1)
+                    self.statistics["folded jumps"] += 1
+                    changed = True
+                elif taken is False:
+                    self.instructions[index] = None  # removed below
+                    self.statistics["folded jumps"] += 1
+                    changed = True
+
+            # the written variable has a new value
+            if arguments and arguments[0][1] == "var":
+                destination = instruction.arg1.value
+                if isinstance(instruction, ins.Move) and is_constant(instruction.arg2):
+                    known[destination] = instruction.arg2
+                else:
+                    known.pop(destination, None)
+
+        self.instructions = [instruction for instruction in self.instructions if instruction is not None]
+        return changed
+
+    # runs the instruction with constant symbols and gets the result (or whether a jump is taken),
+    # Evaluation is returned when the instruction fails in any way (also by a Python exception like IndexError
+    # of STRI2INT with a negative index), so it is kept to fail while running (if it ever runs)
+    def evaluate(self, instruction):
+        evaluation = Evaluation()
+        instruction = copy.copy(instruction)
+        if not isinstance(instruction, conditional_jumps):
+            instruction.arg1 = Evaluation.result
+        try:
+            instruction.do(evaluation)
+        except Exception:
+            return Evaluation
+        if isinstance(instruction, conditional_jumps):
+            return evaluation.pc is True
+        return evaluation.global_f.dictionary["result"]
+
+    # replaces PUSHS followed by POPS by MOVE, only when the errors come in the same order
+    # (MOVE checks the frame of the destination before reading the symbol)
+    def combine_stack_pairs(self):
+        changed = False
+        for index in range(len(self.instructions) - 1):
+            push, pop = self.instructions[index], self.instructions[index + 1]
+            if not isinstance(push, ins.PushS) or not isinstance(pop, ins.PopS):
+                continue
+            symbol, destination = push.arg1, pop.arg1
+            if destination.frame == "global_f" or symbol.arg_type != "var" or symbol.frame == destination.frame:
+                self.instructions[index] = ins.Move(push.order, destination, symbol)
+                self.instructions[index + 1] = None
+                self.statistics["stack pairs"] += 1
+                changed = True
+        self.instructions = [instruction for instruction in self.instructions if instruction is not None]
+        return changed
+
+    # retargets jumps to a label followed by JUMP to the label of that JUMP
+    # and removes JUMP to the label right after it
+    def thread_jumps(self):
+        changed = False
+        positions = self.label_positions()
+
+        # gets the label a jump to the given label finally gets to
+        def final_label(name):
+            seen = {name}
+            while True:
+                index = positions[name]
+                while isinstance(self.instructions[index], ins.Label) and index + 1 < len(self.instructions):
+                    index += 1
+                following = self.instructions[index]
+                if not isinstance(following, ins.Jump) or following.arg1.value not in positions \
+                        or following.arg1.value in seen:
+                    return name
+                name = following.arg1.value
+                seen.add(name)
+
+        for index, instruction in enumerate(self.instructions):
+            if not isinstance(instruction, (ins.Jump, ins.JumpIfEq, ins.JumpIfNEq, ins.JumpIfEqS, ins.JumpIfNEqS)) \
+                    or instruction.arg1.value not in positions:
+                continue
+
+            target = final_label(instruction.arg1.value)
+            if target != instruction.arg1.value:
+                instruction = copy.copy(instruction)
+                instruction.arg1 = ins.Argument("label", target)
+                self.instructions[index] = instruction
+                self.statistics["threaded jumps"] += 1
+                changed = True
+
+            # only labels are between the jump and its label
+            skipped = self.instructions[index + 1:positions[target]]
+            if isinstance(instruction, ins.Jump) and positions[target] > index \
+                    and all(isinstance(label, ins.Label) for label in skipped):
+                self.instructions[index] = ins.Label(instruction.order, None)  # removed below
+                self.statistics["removed jumps"] += 1
+                changed = True
+
+        self.instructions = [instruction for instruction in self.instructions
+                             if not isinstance(instruction, ins.Label) or instruction.arg1 is not None]
+        return changed
+
+    # removes the instructions no path from the start gets to
+    def remove_dead_code(self):
+        positions = self.label_positions()
+        reachable = [False] * len(self.instructions)
+        pending = [0] if self.instructions else []
+        while pending:
+            index = pending.pop()
+            if index >= len(self.instructions) or reachable[index]:
+                continue
+            reachable[index] = True
+            instruction = self.instructions[index]
+            # a jump to an undefined label fails, so it has no successor
+            if isinstance(instruction, jumps) and instruction.arg1.value in positions:
+                pending.append(positions[instruction.arg1.value])
+            # CALL continues with the next instruction after RETURN
+            if not isinstance(instruction, ends):
+                pending.append(index + 1)
+
+        removed = reachable.count(False)
+        if removed:
+            self.instructions = [instruction for instruction, used in zip(self.instructions, reachable) if used]
+            self.statistics["removed dead instructions"] += removed
+        return removed > 0
+
+    # removes the labels no jump or call uses
+    def remove_labels(self):
+        used = {instruction.arg1.value for instruction in self.instructions if isinstance(instruction, jumps)}
+        length = len(self.instructions)
+        self.instructions = [instruction for instruction in self.instructions
+                             if not isinstance(instruction, ins.Label) or instruction.arg1.value in used]
+        if length != len(self.instructions):
+            self.statistics["removed labels"] += length - len(self.instructions)
+            return True
+        return False
+
+    # replaces common sequences of instructions by fused instructions, so the sequence runs in one dispatch
+    # (a label is an instruction, so no jump can get into the middle of the sequence)
+    def fuse(self):
+        fused = []
+        index = 0
+        while index < len(self.instructions):
+            instruction = self.instructions[index]
+            following = self.instructions[index + 1:index + 3]
+            sequence = None
+
+            if len(following) == 2 and isinstance(instruction, ins.CreateFrame) \
+                    and isinstance(following[0], ins.PushFrame) and type(following[1]) == ins.Call:
+                sequence = ins.CallFrame([instruction] + following)
+            elif following:
+                second = following[0]
+                if type(instruction) == ins.DefVar and type(second) == ins.Move \
+                        and second.arg1.value == instruction.arg1.value:
+                    sequence = ins.DefVarMove([instruction, second])
+                elif type(instruction) in (ins.Lt, ins.Gt, ins.Eq) and self.tests_variable(second, instruction, "bool"):
+                    if type(instruction) == ins.Eq:
+                        sequence = ins.EqualJump([instruction, second], operator.eq)
+                    else:
+                        operation = operator.lt if type(instruction) == ins.Lt else operator.gt
+                        sequence = ins.RelationalJump([instruction, second], operation)
+                elif type(instruction) in (ins.Add, ins.Sub) and self.tests_variable(second, instruction):
+                    operation = operator.add if type(instruction) == ins.Add else operator.sub
+                    sequence = ins.ArithmeticJump([instruction, second], operation)
+
+            if sequence is None:
+                fused.append(instruction)
+                index += 1
+            else:
+                fused.append(sequence)
+                index += len(sequence.parts)
+                self.statistics["fused " + " + ".join(opcodes[type(part)][0] for part in sequence.parts)] += 1
+        self.instructions = fused
+
+    # checks if the instruction is a conditional jump comparing the destination of the previous instruction
+    # with another symbol (a constant of the given type if there is one)
+    @staticmethod
+    def tests_variable(jump, previous, constant_type=None):
+        if type(jump) not in conditional_jumps:
+            return False
+        variable = previous.arg1.value
+        if jump.arg2.arg_type == "var" and jump.arg2.value == variable:
+            other = jump.arg3
+        elif jump.arg3.arg_type == "var" and jump.arg3.value == variable:
+            other = jump.arg2
+        else:
+            return False
+        return constant_type is None or other.arg_type == constant_type
+
+
+# formats the argument as it is written in the IPPcode23 source
+def format_argument(argument):
+    if argument.arg_type in ("var", "label", "type"):
+        return argument.value
+    if argument.arg_type == "nil":
+        return "nil@nil"
+    if argument.arg_type == "bool":
+        return "bool@" + ("true" if argument.value else "false")
+    if argument.arg_type == "int":
+        return "int@" + str(argument.value)
+    return "string@" + "".join("\\{:03d}".format(ord(char)) if ord(char) <= 32 or char in "#\\" else char
+                               for char in argument.value)
+
+
+# writes the program as IPPcode23 source with the original orders and what the optimizer did
+def dump(program, statistics, stream):
+    stream.write(".IPPcode23\n")
+    for name, count in sorted(statistics.items()):
+        stream.write("# {}: {}\n".format(name, count))
+    for instruction in program.instructions:
+        # the parts of a fused instruction are written as they were, a mark shows they run as one
+        parts = getattr(instruction, "parts", [instruction])
+        for number, part in enumerate(parts):
+            name, kinds = opcode(part)
+            line = " ".join([name] + [format_argument(getattr(part, attribute))
+                                        for attribute, kind in operands(part)])
+            mark = "" if len(parts) == 1 else " (fused {}/{})".format(number + 1, len(parts))
+            if not part.checked:
+                mark += " (unchecked)"
+            stream.write("{:<48} # order {}{}\n".format(line, part.order, mark))
+
+
+# optimizes the program and gets the optimized program with the statistics of the optimizer
+def optimize(program):
+    optimizer = Optimizer(program)
+    return optimizer.optimize(), optimizer.statistics
@@ -1,266 +1,201 @@
+import re
+import xml.etree.ElementTree as ET
+
 import instructions as ins
+import memory as mem
 import error
 
 
 # a class for parsing the XML file
 class ParseXml:
-    # checks if the arguments are correct and there is a correct number of them
+    label_pattern = r"[a-zA-Z_\-$&%*!?][a-zA-Z0-9_\-$&%*!?]*"
+    variable_pattern = r"(GF|LF|TF)@" + label_pattern
+
+    # opcode : (class of the instruction, kinds of its operands)
+    # the kinds are "var" (variable), "symb" (variable or constant), "label" and "type"
+    opcodes = {
+        "MOVE": (ins.Move, ("var", "symb")),
+        "CREATEFRAME": (ins.CreateFrame, ()),
+        "PUSHFRAME": (ins.PushFrame, ()),
+        "POPFRAME": (ins.PopFrame, ()),
+        "DEFVAR": (ins.DefVar, ("var",)),
+        "CALL": (ins.Call, ("label",)),
+        "RETURN": (ins.Return, ()),
+        "PUSHS": (ins.PushS, ("symb",)),
+        "POPS": (ins.PopS, ("var",)),
+        "ADD": (ins.Add, ("var", "symb", "symb")),
+        "SUB": (ins.Sub, ("var", "symb", "symb")),
+        "MUL": (ins.Mul, ("var", "symb", "symb")),
+        "IDIV": (ins.IDiv, ("var", "symb", "symb")),
+        "LT": (ins.Lt, ("var", "symb", "symb")),
+        "GT": (ins.Gt, ("var", "symb", "symb")),
+        "EQ": (ins.Eq, ("var", "symb", "symb")),
+        "AND": (ins.And, ("var", "symb", "symb")),
+        "OR": (ins.Or, ("var", "symb", "symb")),
+        "NOT": (ins.Not, ("var", "symb")),
+        "INT2CHAR": (ins.Int2Char, ("var", "symb")),
+        "STRI2INT": (ins.Stri2Int, ("var", "symb", "symb")),
+        "READ": (ins.Read, ("var", "type")),
+        "WRITE": (ins.Write, ("symb",)),
+        "CONCAT": (ins.Concat, ("var", "symb", "symb")),
+        "STRLEN": (ins.StrLen, ("var", "symb")),
+        "GETCHAR": (ins.GetChar, ("var", "symb", "symb")),
+        "SETCHAR": (ins.SetChar, ("var", "symb", "symb")),
+        "TYPE": (ins.Type, ("var", "symb")),
+        "LABEL": (ins.Label, ("label",)),
+        "JUMP": (ins.Jump, ("label",)),
+        "JUMPIFEQ": (ins.JumpIfEq, ("label", "symb", "symb")),
+        "JUMPIFNEQ": (ins.JumpIfNEq, ("label", "symb", "symb")),
+        "EXIT": (ins.Exit, ("symb",)),
+        "DPRINT": (ins.DPrint, ("symb",)),
+        "BREAK": (ins.Break, ()),
+        "CLEARS": (ins.ClearS, ()),
+        "ADDS": (ins.AddS, ()),
+        "SUBS": (ins.SubS, ()),
+        "MULS": (ins.MulS, ()),
+        "IDIVS": (ins.IDivS, ()),
+        "LTS": (ins.LtS, ()),
+        "GTS": (ins.GtS, ()),
+        "EQS": (ins.EqS, ()),
+        "ANDS": (ins.AndS, ()),
+        "ORS": (ins.OrS, ()),
+        "NOTS": (ins.NotS, ()),
+        "INT2CHARS": (ins.Int2CharS, ()),
+        "STRI2INTS": (ins.Stri2IntS, ()),
+        "JUMPIFEQS": (ins.JumpIfEqS, ("label",)),
+        "JUMPIFNEQS": (ins.JumpIfNEqS, ("label",)),
+    }
+
+    # operand kind : argument types allowed for it
+    operand_types = {
+        "var": ("var",),
+        "symb": ("var", "int", "bool", "string", "nil"),
+        "label": ("label",),
+        "type": ("type",),
+    }
+
+    # argument element tag : position of the argument
+    argument_positions = {"arg1": 0, "arg2": 1, "arg3": 2}
+
+    # decodes the text of a constant into its Python value (escape sequences in strings are expanded)
     @staticmethod
-    def check_arguments(instruction_element, expected_count):
-        for i in range(1, expected_count + 1):
-            # find the element "argX"
-            arg = instruction_element.find(".//arg" + str(i))
-            if arg is None:
-                error.error_exit("Wrong XML structure!", 32)
+    def decode_constant(arg_type, text):
+        if arg_type == "int":
             try:
-                # check if it has a type
-                if arg.attrib["type"] is None:
-                    error.error_exit("Wrong XML structure!", 32)
-                # check if it has some value (strings can have empty string)
-                elif arg.text is None and arg.attrib["type"] != "string":
-                    error.error_exit("Wrong XML structure!", 32)
-            except KeyError:
-                error.error_exit("Wrong XML structure!", 32)
-
-    # looks up all the labels in the XML file and saves their orders into the Labels structure
+                return int(text)
+            except ValueError:
+                error.error_exit("Wrong int literal!", 32)
+        elif arg_type == "bool":
+            if text.strip().lower() == "true":
+                return True
+            elif text.strip().lower() == "false":
+                return False
+            else:
+                error.error_exit("Bool must be TRUE or FALSE!", 32)
+        elif arg_type == "nil":
+            if text.strip() != "nil":
+                error.error_exit("Nil must be nil!", 32)
+            return None
+        elif arg_type == "string":
+            # an empty element has no text at all
+            if text is None:
+                return ""
+            return re.sub(r"\\[0-9]{3}", lambda escape: chr(int(escape.group()[1:])), text)
+        elif arg_type == "var":
+            # the frame and the name get split by the Argument, so check the syntax here
+            if re.fullmatch(ParseXml.variable_pattern, text.strip()) is None:
+                error.error_exit("Wrong variable syntax!", 32)
+        elif arg_type == "label":
+            if re.fullmatch(ParseXml.label_pattern, text.strip()) is None:
+                error.error_exit("Wrong label syntax!", 32)
+        elif arg_type == "type":
+            if text.strip() not in ("int", "string", "bool"):
+                error.error_exit("Wrong specified type!", 32)
+        # variables, labels and types are kept as they are
+        return text.strip()
+
+    # creates the argument from its element and checks that it is of the expected operand kind
     @staticmethod
-    def get_labels(input_xml):
-        label_elements = input_xml.findall(".//instruction[@opcode='LABEL']")
-        for label in label_elements:
-            order = int(label.attrib["order"])
-            arg1 = ins.Argument("label", label.find(".//arg1").text)
-            label_ins = ins.Label(order, arg1)
-            label_ins.do()
-
-    # method for parsing all instructions from XML and initializing their respective classes
+    def get_argument(arg, kind):
+        arg_type = arg.attrib.get("type")
+        if arg_type not in ParseXml.operand_types[kind]:
+            error.error_exit("Wrong operand type!", 32)
+        # every argument has some value (strings can have empty string)
+        if arg.text is None and arg_type != "string":
+            error.error_exit("Wrong XML structure!", 32)
+        return ins.Argument(arg_type, ParseXml.decode_constant(arg_type, arg.text))
+
+    # method for parsing all instructions from the XML source (a path or a binary file) in a single pass,
+    # every instruction element is discarded as soon as its class is initialized
+    # (returns the instructions by their orders and the labels with the orders)
     @staticmethod
-    def parse(input_xml):
+    def parse(source):
         instructions_dictionary = {}
+        labels = mem.Labels()
+        root = None
+        depth = 0
+
+        try:
+            for event, element in ET.iterparse(source, events=("start", "end")):
+                if event == "start":
+                    if depth == 0:
+                        root = element
+                    depth += 1
+                else:
+                    depth -= 1
+                    # a child of the root element was read completely
+                    if depth == 1:
+                        ParseXml.parse_instruction(element, instructions_dictionary, labels)
+                        root.clear()
+        except ET.ParseError:
+            error.error_exit("Wrong XML format!", 31)
+        except OSError:
+            error.error_exit("Cannot open the source file!", 11)
+
+        return instructions_dictionary, labels
+
+    # method for parsing one instruction element and initializing its respective class
+    @staticmethod
+    def parse_instruction(i, instructions_dictionary, labels):
+        # all elements of the root element must be "instruction"s, otherwise error
+        if i.tag != "instruction":
+            error.error_exit("Wrong XML structure!", 32)
 
-        for i in input_xml.findall("./*"):
-            # all elements of the root element must be "instruction"s, otherwise error
-            if i.tag != "instruction":
-                error.error_exit("Wrong XML structure!", 32)
-
-            # get the order of the instruction and check if it is not repeated and that it is positive
+        # get the order of the instruction and check if it is not repeated and that it is positive
+        try:
             order = int(i.attrib["order"])
-            if order in instructions_dictionary:
-                error.error_exit("Multiple instructions have the same order!", 32)
-            elif order < 0:
-                error.error_exit("Instruction has negative order!", 32)
-
-            # get the instruction opcode
             opcode = i.attrib["opcode"].upper()
-            
-            # check the opcode with all instruction, get the instructions arguments
-            # and initialize the class of the instruction
-            if opcode == "MOVE":
-                ParseXml.check_arguments(i, 2)
-                arg1 = ins.Argument(i.find(".//arg1").attrib["type"], i.find(".//arg1").text.strip().strip())
-                arg2 = ins.Argument(i.find(".//arg2").attrib["type"], i.find(".//arg2").text)
-                instructions_dictionary[order] = ins.Move(order, arg1, arg2)
-
-            elif opcode == "CREATEFRAME":
-                ParseXml.check_arguments(i, 0)
-                instructions_dictionary[order] = ins.CreateFrame(order)
-
-            elif opcode == "PUSHFRAME":
-                ParseXml.check_arguments(i, 0)
-                instructions_dictionary[order] = ins.PushFrame(order)
-
-            elif opcode == "POPFRAME":
-                ParseXml.check_arguments(i, 0)
-                instructions_dictionary[order] = ins.PopFrame(order)
-
-            elif opcode == "DEFVAR":
-                ParseXml.check_arguments(i, 1)
-                arg1 = ins.Argument(i.find(".//arg1").attrib["type"], i.find(".//arg1").text.strip())
-                instructions_dictionary[order] = ins.DefVar(order, arg1)
-
-            elif opcode == "CALL":
-                ParseXml.check_arguments(i, 1)
-                arg1 = ins.Argument(i.find(".//arg1").attrib["type"], i.find(".//arg1").text.strip())
-                instructions_dictionary[order] = ins.Call(order, arg1)
-
-            elif opcode == "RETURN":
-                ParseXml.check_arguments(i, 0)
-                instructions_dictionary[order] = ins.Return(order)
-
-            elif opcode == "PUSHS":
-                ParseXml.check_arguments(i, 1)
-                arg1 = ins.Argument(i.find(".//arg1").attrib["type"], i.find(".//arg1").text.strip())
-                instructions_dictionary[order] = ins.PushS(order, arg1)
-
-            elif opcode == "POPS":
-                ParseXml.check_arguments(i, 1)
-                arg1 = ins.Argument(i.find(".//arg1").attrib["type"], i.find(".//arg1").text.strip())
-                instructions_dictionary[order] = ins.PopS(order, arg1)
-
-            elif opcode == "ADD":
-                ParseXml.check_arguments(i, 3)
-                arg1 = ins.Argument(i.find(".//arg1").attrib["type"], i.find(".//arg1").text.strip())
-                arg2 = ins.Argument(i.find(".//arg2").attrib["type"], i.find(".//arg2").text)
-                arg3 = ins.Argument(i.find(".//arg3").attrib["type"], i.find(".//arg3").text)
-                instructions_dictionary[order] = ins.Add(order, arg1, arg2, arg3)
-
-            elif opcode == "SUB":
-                ParseXml.check_arguments(i, 3)
-                arg1 = ins.Argument(i.find(".//arg1").attrib["type"], i.find(".//arg1").text.strip())
-                arg2 = ins.Argument(i.find(".//arg2").attrib["type"], i.find(".//arg2").text)
-                arg3 = ins.Argument(i.find(".//arg3").attrib["type"], i.find(".//arg3").text)
-                instructions_dictionary[order] = ins.Sub(order, arg1, arg2, arg3)
-
-            elif opcode == "MUL":
-                ParseXml.check_arguments(i, 3)
-                arg1 = ins.Argument(i.find(".//arg1").attrib["type"], i.find(".//arg1").text.strip())
-                arg2 = ins.Argument(i.find(".//arg2").attrib["type"], i.find(".//arg2").text)
-                arg3 = ins.Argument(i.find(".//arg3").attrib["type"], i.find(".//arg3").text)
-                instructions_dictionary[order] = ins.Mul(order, arg1, arg2, arg3)
-
-            elif opcode == "IDIV":
-                ParseXml.check_arguments(i, 3)
-                arg1 = ins.Argument(i.find(".//arg1").attrib["type"], i.find(".//arg1").text.strip())
-                arg2 = ins.Argument(i.find(".//arg2").attrib["type"], i.find(".//arg2").text)
-                arg3 = ins.Argument(i.find(".//arg3").attrib["type"], i.find(".//arg3").text)
-                instructions_dictionary[order] = ins.IDiv(order, arg1, arg2, arg3)
-
-            elif opcode == "LT":
-                ParseXml.check_arguments(i, 3)
-                arg1 = ins.Argument(i.find(".//arg1").attrib["type"], i.find(".//arg1").text.strip())
-                arg2 = ins.Argument(i.find(".//arg2").attrib["type"], i.find(".//arg2").text)
-                arg3 = ins.Argument(i.find(".//arg3").attrib["type"], i.find(".//arg3").text)
-                instructions_dictionary[order] = ins.Lt(order, arg1, arg2, arg3)
-
-            elif opcode == "GT":
-                ParseXml.check_arguments(i, 3)
-                arg1 = ins.Argument(i.find(".//arg1").attrib["type"], i.find(".//arg1").text.strip())
-                arg2 = ins.Argument(i.find(".//arg2").attrib["type"], i.find(".//arg2").text)
-                arg3 = ins.Argument(i.find(".//arg3").attrib["type"], i.find(".//arg3").text)
-                instructions_dictionary[order] = ins.Gt(order, arg1, arg2, arg3)
-
-            elif opcode == "EQ":
-                ParseXml.check_arguments(i, 3)
-                arg1 = ins.Argument(i.find(".//arg1").attrib["type"], i.find(".//arg1").text.strip())
-                arg2 = ins.Argument(i.find(".//arg2").attrib["type"], i.find(".//arg2").text)
-                arg3 = ins.Argument(i.find(".//arg3").attrib["type"], i.find(".//arg3").text)
-                instructions_dictionary[order] = ins.Eq(order, arg1, arg2, arg3)
-
-            elif opcode == "AND":
-                ParseXml.check_arguments(i, 3)
-                arg1 = ins.Argument(i.find(".//arg1").attrib["type"], i.find(".//arg1").text.strip())
-                arg2 = ins.Argument(i.find(".//arg2").attrib["type"], i.find(".//arg2").text)
-                arg3 = ins.Argument(i.find(".//arg3").attrib["type"], i.find(".//arg3").text)
-                instructions_dictionary[order] = ins.And(order, arg1, arg2, arg3)
-
-            elif opcode == "OR":
-                ParseXml.check_arguments(i, 3)
-                arg1 = ins.Argument(i.find(".//arg1").attrib["type"], i.find(".//arg1").text.strip())
-                arg2 = ins.Argument(i.find(".//arg2").attrib["type"], i.find(".//arg2").text)
-                arg3 = ins.Argument(i.find(".//arg3").attrib["type"], i.find(".//arg3").text)
-                instructions_dictionary[order] = ins.Or(order, arg1, arg2, arg3)
-
-            elif opcode == "NOT":
-                ParseXml.check_arguments(i, 2)
-                arg1 = ins.Argument(i.find(".//arg1").attrib["type"], i.find(".//arg1").text.strip())
-                arg2 = ins.Argument(i.find(".//arg2").attrib["type"], i.find(".//arg2").text)
-                instructions_dictionary[order] = ins.Not(order, arg1, arg2)
-
-            elif opcode == "INT2CHAR":
-                ParseXml.check_arguments(i, 2)
-                arg1 = ins.Argument(i.find(".//arg1").attrib["type"], i.find(".//arg1").text.strip())
-                arg2 = ins.Argument(i.find(".//arg2").attrib["type"], i.find(".//arg2").text)
-                instructions_dictionary[order] = ins.Int2Char(order, arg1, arg2)
-
-            elif opcode == "STRI2INT":
-                ParseXml.check_arguments(i, 3)
-                arg1 = ins.Argument(i.find(".//arg1").attrib["type"], i.find(".//arg1").text.strip())
-                arg2 = ins.Argument(i.find(".//arg2").attrib["type"], i.find(".//arg2").text)
-                arg3 = ins.Argument(i.find(".//arg3").attrib["type"], i.find(".//arg3").text)
-                instructions_dictionary[order] = ins.Stri2Int(order, arg1, arg2, arg3)
-
-            elif opcode == "READ":
-                ParseXml.check_arguments(i, 2)
-                arg1 = ins.Argument(i.find(".//arg1").attrib["type"], i.find(".//arg1").text.strip())
-                arg2 = ins.Argument(i.find(".//arg2").attrib["type"], i.find(".//arg2").text)
-                instructions_dictionary[order] = ins.Read(order, arg1, arg2)
-
-            elif opcode == "WRITE":
-                ParseXml.check_arguments(i, 1)
-                arg1 = ins.Argument(i.find(".//arg1").attrib["type"], i.find(".//arg1").text.strip())
-                instructions_dictionary[order] = ins.Write(order, arg1)
-
-            elif opcode == "CONCAT":
-                ParseXml.check_arguments(i, 3)
-                arg1 = ins.Argument(i.find(".//arg1").attrib["type"], i.find(".//arg1").text.strip())
-                arg2 = ins.Argument(i.find(".//arg2").attrib["type"], i.find(".//arg2").text)
-                arg3 = ins.Argument(i.find(".//arg3").attrib["type"], i.find(".//arg3").text)
-                instructions_dictionary[order] = ins.Concat(order, arg1, arg2, arg3)
-
-            elif opcode == "STRLEN":
-                ParseXml.check_arguments(i, 2)
-                arg1 = ins.Argument(i.find(".//arg1").attrib["type"], i.find(".//arg1").text.strip())
-                arg2 = ins.Argument(i.find(".//arg2").attrib["type"], i.find(".//arg2").text)
-                instructions_dictionary[order] = ins.StrLen(order, arg1, arg2)
-
-            elif opcode == "GETCHAR":
-                ParseXml.check_arguments(i, 3)
-                arg1 = ins.Argument(i.find(".//arg1").attrib["type"], i.find(".//arg1").text.strip())
-                arg2 = ins.Argument(i.find(".//arg2").attrib["type"], i.find(".//arg2").text)
-                arg3 = ins.Argument(i.find(".//arg3").attrib["type"], i.find(".//arg3").text)
-                instructions_dictionary[order] = ins.GetChar(order, arg1, arg2, arg3)
-
-            elif opcode == "SETCHAR":
-                ParseXml.check_arguments(i, 3)
-                arg1 = ins.Argument(i.find(".//arg1").attrib["type"], i.find(".//arg1").text.strip())
-                arg2 = ins.Argument(i.find(".//arg2").attrib["type"], i.find(".//arg2").text)
-                arg3 = ins.Argument(i.find(".//arg3").attrib["type"], i.find(".//arg3").text)
-                instructions_dictionary[order] = ins.SetChar(order, arg1, arg2, arg3)
-
-            elif opcode == "TYPE":
-                ParseXml.check_arguments(i, 2)
-                arg1 = ins.Argument(i.find(".//arg1").attrib["type"], i.find(".//arg1").text.strip())
-                arg2 = ins.Argument(i.find(".//arg2").attrib["type"], i.find(".//arg2").text)
-                instructions_dictionary[order] = ins.Type(order, arg1, arg2)
-
-            elif opcode == "LABEL":
-                ParseXml.check_arguments(i, 0)
-                # we already went through the labels, so we will use the PassLabel instruction
-                instructions_dictionary[order] = ins.PassLabel(order)
-
-            elif opcode == "JUMP":
-                ParseXml.check_arguments(i, 1)
-                arg1 = ins.Argument(i.find(".//arg1").attrib["type"], i.find(".//arg1").text.strip())
-                instructions_dictionary[order] = ins.Jump(order, arg1)
-
-            elif opcode == "JUMPIFEQ":
-                ParseXml.check_arguments(i, 3)
-                arg1 = ins.Argument(i.find(".//arg1").attrib["type"], i.find(".//arg1").text.strip())
-                arg2 = ins.Argument(i.find(".//arg2").attrib["type"], i.find(".//arg2").text)
-                arg3 = ins.Argument(i.find(".//arg3").attrib["type"], i.find(".//arg3").text)
-                instructions_dictionary[order] = ins.JumpIfEq(order, arg1, arg2, arg3)
-
-            elif opcode == "JUMPIFNEQ":
-                ParseXml.check_arguments(i, 3)
-                arg1 = ins.Argument(i.find(".//arg1").attrib["type"], i.find(".//arg1").text.strip())
-                arg2 = ins.Argument(i.find(".//arg2").attrib["type"], i.find(".//arg2").text)
-                arg3 = ins.Argument(i.find(".//arg3").attrib["type"], i.find(".//arg3").text)
-                instructions_dictionary[order] = ins.JumpIfNEq(order, arg1, arg2, arg3)
-
-            elif opcode == "EXIT":
-                ParseXml.check_arguments(i, 1)
-                arg1 = ins.Argument(i.find(".//arg1").attrib["type"], i.find(".//arg1").text.strip())
-                instructions_dictionary[order] = ins.Exit(order, arg1)
-
-            elif opcode == "DPRINT":
-                ParseXml.check_arguments(i, 1)
-                arg1 = ins.Argument(i.find(".//arg1").attrib["type"], i.find(".//arg1").text.strip())
-                instructions_dictionary[order] = ins.DPrint(order, arg1)
+        except (KeyError, ValueError):
+            error.error_exit("Wrong XML structure!", 32)
+        if order in instructions_dictionary:
+            error.error_exit("Multiple instructions have the same order!", 32)
+        elif order < 0:
+            error.error_exit("Instruction has negative order!", 32)
+
+        # look up the class of the instruction and the kinds of its operands
+        if opcode not in ParseXml.opcodes:
+            error.error_exit("Unknown instruction!", 32)
+        instruction_class, kinds = ParseXml.opcodes[opcode]
+
+        # go through the argument elements once, each of them must be expected and present only once
+        arguments = [None] * len(kinds)
+        for arg in i:
+            position = ParseXml.argument_positions.get(arg.tag)
+            if position is None or position >= len(kinds) or arguments[position] is not None:
+                error.error_exit("Wrong XML structure!", 32)
+            arguments[position] = ParseXml.get_argument(arg, kinds[position])
+        if None in arguments:
+            error.error_exit("Wrong XML structure!", 32)
 
-            elif opcode == "BREAK":
-                ParseXml.check_arguments(i, 0)
-                instructions_dictionary[order] = ins.Break(order)
+        instruction = instruction_class(order, *arguments)
+        if instruction_class is ins.Label:
+            labels.add(instruction.arg1.value, order)  # labels are saved right away, so no other pass is needed
+        instructions_dictionary[order] = instruction
 
-            else:
-                error.error_exit("Unknown instruction!", 32)
-
-        return instructions_dictionary
+    # sorts the parsed instructions by their order into a list and relocates the labels to list positions
+    @staticmethod
+    def load(instructions_dictionary, labels):
+        instructions = [instructions_dictionary[order] for order in sorted(instructions_dictionary)]
+        positions = {instruction.order: index for index, instruction in enumerate(instructions)}
+        labels.relocate(positions)
+        return mem.Program(instructions, labels)
@@ -0,0 +1,153 @@
+import json
+import time
+
+import instructions as ins
+
+
+# a class for profiling the program, it runs its own loop (the normal loops do not check for it at all)
+# and counts the executions and the time of every instruction and of the called functions
+class Profiler:
+    main = "<main>"  # name of the code not called by CALL
+
+    def __init__(self):
+        self.program = None
+        self.counts = []  # index of the instruction : number of executions
+        self.times = []  # index of the instruction : time in seconds
+        self.functions = {}  # label of the function : [calls, self time, inclusive time]
+        self.elapsed = 0.0
+
+    # runs the code (a function for each instruction) like Interpreter.run_code does
+    def run(self, vm, code):
+        self.program = vm.program
+        instructions = vm.program.instructions
+        code_length = len(code)
+        counts = self.counts = [0] * code_length
+        times = self.times = [0.0] * code_length
+        functions = self.functions = {Profiler.main: [1, 0.0, 0.0]}
+
+        # a function starts by CALL and ends by RETURN, anything else stays in the current function
+        calls = [isinstance(instruction, (ins.Call, ins.CallFrame)) for instruction in instructions]
+        returns = [isinstance(instruction, ins.Return) for instruction in instructions]
+        call_stack = [(Profiler.main, 0.0)]  # (function, start) for each call in progress
+        active = {Profiler.main: 1}  # function : number of its calls in progress (for recursion)
+        current = functions[Profiler.main]
+
+        # the limits are checked like in Interpreter.run_watched (-1 never counts down to a check)
+        watchdog = vm.watchdog
+        steps = -1 if watchdog is None else watchdog.start()
+
+        clock = time.perf_counter
+        start_all = clock()
+        try:
+            while vm.pc < code_length:
+                if not steps:
+                    steps = watchdog.check(vm)
+                steps -= 1
+                pc = vm.pc
+                start = clock()
+                try:
+                    code[pc]()
+                finally:
+                    # the instruction ending the program (by EXIT or an error) is counted too
+                    elapsed = clock() - start
+                    counts[pc] += 1
+                    times[pc] += elapsed
+                    current[1] += elapsed
+
+                if calls[pc]:
+                    name = instructions[pc].arg1.value
+                    current = functions.setdefault(name, [0, 0.0, 0.0])
+                    current[0] += 1
+                    call_stack.append((name, clock()))
+                    active[name] = active.get(name, 0) + 1
+                elif returns[pc] and len(call_stack) > 1:
+                    self.end_call(call_stack, active, clock())
+                    current = functions[call_stack[-1][0]]
+                vm.pc += 1
+        finally:
+            # the program may end by EXIT or an error inside a function
+            end = clock()
+            if watchdog is not None:
+                watchdog.stop(steps)
+            while len(call_stack) > 1:
+                self.end_call(call_stack, active, end)
+            self.elapsed = end - start_all
+            functions[Profiler.main][2] = self.elapsed
+
+    # adds the time of the finished call to its function (a recursive call is counted by the outermost one)
+    def end_call(self, call_stack, active, end):
+        name, start = call_stack.pop()
+        active[name] -= 1
+        if not active[name]:
+            self.functions[name][2] += end - start
+
+    # gets the statistics grouped by the key of each instruction as a list of (key, count, time) sorted by time
+    def group(self, key):
+        groups = {}
+        for index, instruction in enumerate(self.program.instructions):
+            group = groups.setdefault(key(index, instruction), [0, 0.0])
+            group[0] += self.counts[index]
+            group[1] += self.times[index]
+        return sorted(((name, count, seconds) for name, (count, seconds) in groups.items() if count),
+                      key=lambda item: -item[2])
+
+    # gets the label each instruction is under in the source (the code before the first label is main)
+    def enclosing_labels(self):
+        labels = []
+        label = Profiler.main
+        for instruction in self.program.instructions:
+            if isinstance(instruction, ins.Label):
+                label = instruction.arg1.value
+            labels.append(label)
+        return labels
+
+    def report(self):
+        labels = self.enclosing_labels()
+        return {
+            "elapsed": self.elapsed,
+            "opcodes": self.group(lambda index, instruction: type(instruction).__name__),
+            "orders": self.group(lambda index, instruction: instruction.order),
+            "labels": self.group(lambda index, instruction: labels[index]),
+            "functions": sorted(((name, calls, self_time, inclusive)
+                                 for name, (calls, self_time, inclusive) in self.functions.items() if calls),
+                                key=lambda item: -item[2]),
+        }
+
+    # writes the report as JSON into the file
+    def write_json(self, path):
+        report = self.report()
+        document = {
+            "elapsed": report["elapsed"],
+            "opcodes": [{"opcode": name, "count": count, "time": seconds}
+                        for name, count, seconds in report["opcodes"]],
+            "orders": [{"order": order, "count": count, "time": seconds}
+                       for order, count, seconds in report["orders"]],
+            "labels": [{"label": name, "count": count, "time": seconds}
+                       for name, count, seconds in report["labels"]],
+            "functions": [{"function": name, "calls": calls, "self_time": self_time, "time": inclusive}
+                          for name, calls, self_time, inclusive in report["functions"]],
+        }
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump(document, file, indent=2)
+
+    # prints the report as tables sorted by the time (only the slowest orders are printed)
+    def write_table(self, stream, max_orders=20):
+        report = self.report()
+        total = report["elapsed"] or 1.0
+
+        def table(title, rows):
+            stream.write("\n{:<24} {:>12} {:>12} {:>7} {:>10}\n".format(title, "count", "time [ms]", "%", "avg [us]"))
+            for name, count, seconds in rows:
+                stream.write("{:<24} {:>12} {:>12.3f} {:>7.2f} {:>10.3f}\n".format(
+                    str(name), count, seconds * 1e3, seconds / total * 100, seconds / count * 1e6))
+
+        stream.write("Profile of {:.3f} ms\n".format(report["elapsed"] * 1e3))
+        table("opcode", report["opcodes"])
+        table("function", [(name, calls, self_time) for name, calls, self_time, inclusive in report["functions"]])
+        table("label", report["labels"])
+        table("order", report["orders"][:max_orders])
+
+        stream.write("\n{:<24} {:>12} {:>12} {:>7}\n".format("function (inclusive)", "calls", "time [ms]", "%"))
+        for name, calls, self_time, inclusive in sorted(report["functions"], key=lambda item: -item[3]):
+            stream.write("{:<24} {:>12} {:>12.3f} {:>7.2f}\n".format(
+                name, calls, inclusive * 1e3, inclusive / total * 100))
@@ -0,0 +1,56 @@
+import json
+import os
+import struct
+
+
+# the protocol between server.py and client.py (kept small, so the client imports almost nothing):
+#   request - a JSON header on one line, then the bytes of the program (if the header has no path) and the input
+#       {"source": absolute path or null, "program_size": bytes, "input_size": bytes,
+#        "engine": "reference"/"closure"/"aot", "flush": "always"/"line"/"exit"}
+#       (a path has to be inside the root of the server, client.py always sends the program)
+#   response - frames of a kind byte, a length and the data:
+#       b"o" - bytes of the standard output, b"e" - bytes of the standard error,
+#       b"x" - the exit code as text (the last frame)
+frame_header = struct.Struct("!cI")
+
+OUTPUT = b"o"
+ERROR = b"e"
+EXIT = b"x"
+
+# the values a request can choose
+engines = ("reference", "closure", "aot")
+flush_policies = ("always", "line", "exit")
+
+
+# gets the path of the socket, it can be set by the environment
+def default_socket():
+    return os.environ.get("IPP_SOCKET", os.path.join("/tmp", "ipp-interpret-" + str(os.getuid()) + ".sock"))
+
+
+def send_frame(connection, kind, data):
+    connection.sendall(frame_header.pack(kind, len(data)) + data)
+
+
+# reads exactly the size of bytes from the socket file (the request is incomplete if there are fewer)
+def read_exactly(file, size):
+    data = file.read(size)
+    if len(data) != size:
+        raise EOFError()
+    return data
+
+
+def read_header(file):
+    line = file.readline()
+    if not line:
+        raise EOFError()
+    return json.loads(line)
+
+
+def write_header(file, header):
+    file.write(json.dumps(header).encode() + b"\n")
+
+
+# reads the next response frame as (kind, data)
+def read_frame(file):
+    kind, size = frame_header.unpack(read_exactly(file, frame_header.size))
+    return kind, read_exactly(file, size)
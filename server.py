@@ -0,0 +1,200 @@
+import argparse
+import collections
+import hashlib
+import io
+import os
+import signal
+import socket
+import socketserver
+import sys
+import threading
+
+import interpreter
+import protocol
+import watchdog
+import error
+
+
+# a class for the loaded programs kept by the server, a program given by a path is loaded again
+# when the file changes, a program given by its bytes is found by their hash
+class ProgramStore:
+    def __init__(self, max_programs, root=None):
+        self.max_programs = max_programs
+        self.root = None if root is None else os.path.realpath(root)  # the only directory with source files
+        self.programs = collections.OrderedDict()  # key : program, the least recently used first
+        self.lock = threading.Lock()
+
+    # gets the real path of a source file, it has to be inside the root (any client can send a path, but
+    # the server must not open the files of its user for them)
+    def source_path(self, source):
+        if self.root is None:
+            error.error_exit("The server does not open source files, the program has to be sent!", 11)
+        path = os.path.realpath(source) if isinstance(source, str) else None
+        if path is None or os.path.commonpath([self.root, path]) != self.root:
+            error.error_exit("The source file is outside the root of the server!", 11)
+        return path
+
+    # gets the loaded program for the request, the source is a path or the bytes of the program
+    def get(self, source, data):
+        if source is not None:
+            source = self.source_path(source)
+            try:
+                status = os.stat(source)
+            except OSError:
+                error.error_exit("Cannot open the source file!", 11)
+            key = ("path", source, status.st_mtime_ns, status.st_size)
+        else:
+            key = ("data", hashlib.sha256(data).digest())
+
+        with self.lock:
+            program = self.programs.get(key)
+            if program is not None:
+                self.programs.move_to_end(key)
+                return program
+
+        # more requests can load programs at the same time (a program loaded twice is simply stored twice)
+        program = interpreter.load(source if source is not None else io.BytesIO(data))
+        with self.lock:
+            self.programs[key] = program
+            while len(self.programs) > self.max_programs:
+                self.programs.popitem(last=False)
+        return program
+
+
+# a class for the binary output sent to the client in frames (streams.Output writes into it)
+class OutputStream:
+    def __init__(self, connection, kind):
+        self.connection = connection
+        self.kind = kind
+
+    def write(self, data):
+        if data:
+            protocol.send_frame(self.connection, self.kind, bytes(data))
+
+    def flush(self):
+        pass
+
+
+# a class for the text error output (DPRINT and BREAK print into it)
+class ErrorStream(OutputStream):
+    def write(self, text):
+        super().write(text.encode())
+
+
+# a class for handling one request, every request gets a new interpreter, so the frames, stacks and labels
+# of one program are never seen by another one
+class RequestHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        try:
+            header = protocol.read_header(self.rfile)
+            source = header.get("source")
+            data = protocol.read_exactly(self.rfile, header.get("program_size", 0)) if source is None else None
+            read_input = io.BytesIO(protocol.read_exactly(self.rfile, header.get("input_size", 0)))
+        except (EOFError, ValueError, AttributeError, TypeError):
+            return  # an incomplete request, the client is gone
+
+        stderr = ErrorStream(self.connection, protocol.ERROR)
+        try:
+            # an unknown value is an error of the request (it would silently run the reference engine)
+            engine = header.get("engine", self.server.engine)
+            flush = header.get("flush", "line")
+            if engine not in protocol.engines:
+                error.error_exit("Unknown engine: " + str(engine) + "!", 10)
+            if flush not in protocol.flush_policies:
+                error.error_exit("Unknown flush policy: " + str(flush) + "!", 10)
+
+            program = self.server.store.get(source, data)
+            # every request gets its own watchdog, so no program can keep a thread of the server forever
+            vm = interpreter.Interpreter(engine, flush, watchdog=watchdog.Watchdog(*self.server.limits))
+            exit_code = vm.run(program, read_input, OutputStream(self.connection, protocol.OUTPUT), stderr)
+        except error.InterpretError as interpret_error:
+            stderr.write(interpret_error.message + "\n")
+            exit_code = interpret_error.exit_code
+        except OSError:
+            return  # the client closed the connection
+        except Exception as exception:
+            # a bug of the interpreter ends only the request, not the server
+            stderr.write("Internal error: " + type(exception).__name__ + ": " + str(exception) + "\n")
+            exit_code = 99
+
+        try:
+            protocol.send_frame(self.connection, protocol.EXIT, str(exit_code).encode())
+        except OSError:
+            pass
+
+
+class Server(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, path, engine, max_programs, root=None, limits=(None, None, None, None)):
+        self.engine = engine  # engine used when the request does not choose one
+        self.store = ProgramStore(max_programs, root)
+        self.limits = limits  # the limits of every program (see watchdog.Watchdog)
+        super().__init__(path, RequestHandler)
+
+
+# removes a socket left by a server that did not end properly, a socket of a running server is kept
+def remove_stale_socket(path):
+    if not os.path.exists(path):
+        return
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(path)
+    except OSError:
+        os.unlink(path)
+        return
+    finally:
+        probe.close()
+    error.error_exit("A server is already listening on " + path + "!", 10)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Server keeping IPPcode23 programs loaded for client.py.")
+    parser.add_argument("--socket", dest="socket", default=protocol.default_socket(),
+                        help="a path to the Unix socket to listen on")
+    parser.add_argument("--engine", dest="engine", choices=["reference", "closure", "aot"], default="reference",
+                        help="the engine used when the client does not choose one (see interpret.py)")
+    parser.add_argument("--max-programs", dest="max_programs", type=int, default=256,
+                        help="the number of loaded programs kept in the memory")
+    parser.add_argument("--root", dest="root",
+                        help="a directory the clients can give the source files from (without it the clients "
+                             "have to send the programs)")
+    parser.add_argument("--max-instructions", dest="max_instructions", type=int,
+                        help="end a program with the exit code 59 before it executes more instructions")
+    parser.add_argument("--max-time", dest="max_time", type=float, default=10.0,
+                        help="end a program with the exit code 59 after it runs for more seconds")
+    parser.add_argument("--max-stack-depth", dest="max_stack_depth", type=int, default=1000000,
+                        help="end a program with the exit code 59 when the data stack has more values")
+    parser.add_argument("--max-call-depth", dest="max_call_depth", type=int, default=100000,
+                        help="end a program with the exit code 59 when more calls (or frames in the frame "
+                             "stack) are nested")
+    arguments = parser.parse_args()
+
+    try:
+        limits = (arguments.max_instructions, arguments.max_time, arguments.max_stack_depth, arguments.max_call_depth)
+        if any(limit is not None and limit < 0 for limit in limits):
+            error.error_exit("The limits cannot be negative!", 10)
+        if arguments.root is not None and not os.path.isdir(arguments.root):
+            error.error_exit("The root is not a directory!", 10)
+        remove_stale_socket(arguments.socket)
+        server = Server(arguments.socket, arguments.engine, arguments.max_programs, arguments.root, limits)
+    except error.InterpretError as interpret_error:
+        sys.stderr.write(interpret_error.message + "\n")
+        sys.exit(interpret_error.exit_code)
+    except OSError:
+        sys.stderr.write("Cannot listen on " + arguments.socket + "!\n")
+        sys.exit(11)
+
+    # SIGTERM ends the server the same way as Ctrl+C
+    signal.signal(signal.SIGTERM, lambda signal_number, frame: sys.exit(0))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        os.unlink(arguments.socket)
+
+
+if __name__ == '__main__':
+    main()
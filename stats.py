@@ -0,0 +1,66 @@
+import json
+
+import memory as mem
+
+
+# a class for the statistics of a run, the interpreter starts and finishes it around the run however the run ends,
+# the instructions are counted by the watchdog.Watchdog of the interpreter (the aot engine counts whole blocks),
+# the stacks keep their peaks in memory.PeakList and the frames are measured when CREATEFRAME, PUSHFRAME
+# or POPFRAME moves them (the variables of a frame are never removed, so its last size is its peak)
+class Statistics:
+    def __init__(self):
+        self.exit_code = 0
+        self.instructions = 0
+        self.load_time = 0.0
+        self.execute_time = 0.0
+        self.stack_peaks = {"data": 0, "frame": 0, "order": 0}
+        self.variable_peaks = {"GF": 0, "LF": 0, "TF": 0}
+        self.created_frames = 0  # number of frames made by CREATEFRAME
+        self.bytes_read = 0
+        self.bytes_written = 0
+
+    # prepares the state of the interpreter for measuring (before the code of the program is made)
+    def start(self, vm):
+        vm.stack.list = mem.PeakList(vm.stack.list)
+        vm.frame_stack.list = mem.PeakList(vm.frame_stack.list)
+        vm.order_stack.list = mem.PeakList(vm.order_stack.list)
+        vm.read_input.count()
+
+    # records the sizes of the temporary and the local frame before an instruction moves them
+    def record_frames(self, vm):
+        if vm.temporary_f is not None and len(vm.temporary_f.dictionary) > self.variable_peaks["TF"]:
+            self.variable_peaks["TF"] = len(vm.temporary_f.dictionary)
+        if vm.local_f is not None and len(vm.local_f.dictionary) > self.variable_peaks["LF"]:
+            self.variable_peaks["LF"] = len(vm.local_f.dictionary)
+
+    # records the frames before CREATEFRAME replaces the temporary frame
+    def create_frame(self, vm):
+        self.record_frames(vm)
+        self.created_frames += 1
+
+    # takes the rest of the figures from the interpreter after the run (the output is already flushed)
+    def finish(self, vm, execute_time):
+        self.execute_time = execute_time
+        self.record_frames(vm)
+        self.variable_peaks["GF"] = len(vm.global_f.dictionary)
+        if vm.watchdog is not None:
+            self.instructions = vm.watchdog.executed
+        self.stack_peaks["data"] = vm.stack.list.peak
+        self.stack_peaks["frame"] = vm.frame_stack.list.peak - 1  # -1 for the first helper None element
+        self.stack_peaks["order"] = vm.order_stack.list.peak
+        self.bytes_read = vm.read_input.read
+        self.bytes_written = vm.output.written
+
+    def write_json(self, path):
+        document = {
+            "exit_code": self.exit_code,
+            "instructions": self.instructions,
+            "time": {"load": self.load_time, "execute": self.execute_time},
+            "stack_peaks": self.stack_peaks,
+            "variable_peaks": self.variable_peaks,
+            "created_frames": self.created_frames,
+            "bytes_read": self.bytes_read,
+            "bytes_written": self.bytes_written,
+        }
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump(document, file, indent=2)
@@ -0,0 +1,124 @@
+import functools
+import io
+import mmap
+import os
+import stat
+
+
+# a class for the output of the program, it collects the encoded text in a buffer and writes it to
+# a binary stream according to the flush policy:
+#   "always" - after every write
+#   "line" - after a write containing a new line
+#   "exit" - only at the end of the program (or when the buffer is full)
+class Output:
+    buffer_size = 1 << 16  # number of bytes after which the buffer is always flushed
+
+    def __init__(self, stream, policy="line"):
+        self.stream = stream
+        self.buffer = bytearray()
+        self.written = 0  # number of bytes written so far
+
+        # the policy is chosen once, so a write does not have to check it
+        if policy == "always":
+            self.write = self.write_always
+        elif policy == "line":
+            self.write = self.write_line
+        else:
+            self.write = self.write_buffered
+
+    def write_always(self, text):
+        self.buffer += text.encode()
+        self.flush()
+
+    def write_line(self, text):
+        self.buffer += text.encode()
+        if "\n" in text or len(self.buffer) >= Output.buffer_size:
+            self.flush()
+
+    def write_buffered(self, text):
+        self.buffer += text.encode()
+        if len(self.buffer) >= Output.buffer_size:
+            self.flush()
+
+    # writes everything from the buffer into the stream
+    def flush(self):
+        if self.buffer:
+            self.stream.write(self.buffer)
+            self.written += len(self.buffer)
+            self.buffer.clear()
+        self.stream.flush()
+
+
+# a class for the input of the program, the lines are the same as readline() of a text file gives (the new line
+# translated to "\n" and kept, an empty string at the end), a READ calls only built-in functions: a mapped file
+# is split by its readline and the lines are decoded by map(), any other file is read by a text layer
+class Input:
+    buffer_size = 1 << 20  # number of bytes of the buffer of an opened input file
+    mapped_line = 256  # the shortest average line of a mapped file (the text layer is faster for shorter lines)
+    sample_size = 1 << 16  # number of bytes the average line is measured on
+
+    def __init__(self, file):
+        self.file = file
+        self.mapping = Input.map_file(file)
+        self.text = None  # the text layer of a file that is not mapped
+        if self.mapping is not None:
+            self.lines = iter(self.mapping.readline, b"")  # the lines as bytes
+            self.readline = functools.partial(next, map(bytes.decode, self.lines), "")
+        else:
+            self.text = io.TextIOWrapper(file, encoding="utf-8", newline=None)
+            self.readline = self.text.readline
+        self.read = 0  # number of bytes of the read lines in the file (only if they are counted)
+
+    # maps the rest of a regular file with long lines and without "\r" into the memory (its lines are split
+    # by "\n" only, so they need no translation), returns None for any other file
+    @staticmethod
+    def map_file(file):
+        try:
+            position = file.tell()
+            if not stat.S_ISREG(os.fstat(file.fileno()).st_mode):
+                return None
+            mapping = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return None  # a pipe, a terminal, a file in the memory or an empty file
+        sample = mapping[position:position + Input.sample_size]
+        if (not sample or sample.count(b"\n") * Input.mapped_line > len(sample)
+                or mapping.find(b"\r", position) != -1):
+            mapping.close()
+            return None
+        mapping.seek(position)
+        return mapping
+
+    # counts the bytes of the read lines (for stats.Statistics, a READ then calls this Python code), it has to
+    # be called before the first READ
+    def count(self):
+        if self.mapping is not None:
+            lines = self.lines
+
+            def counted_readline():
+                line = next(lines, b"")
+                self.read += len(line)
+                return line.decode()
+        else:
+            # the text layer keeps the new lines as they are in the file (so they are counted) and they are
+            # translated here
+            self.text.detach()
+            self.text = io.TextIOWrapper(self.file, encoding="utf-8", newline="")
+            readline = self.text.readline
+
+            def counted_readline():
+                line = readline()
+                self.read += len(line.encode())
+                if line.endswith("\r\n"):
+                    return line[:-2] + "\n"
+                if line.endswith("\r"):
+                    return line[:-1] + "\n"
+                return line
+
+        self.readline = counted_readline
+
+    # releases the file without closing it (the file belongs to the caller)
+    def detach(self):
+        if self.mapping is not None:
+            self.mapping.close()
+        else:
+            self.text.detach()
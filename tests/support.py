@@ -0,0 +1,81 @@
+import html
+import io
+import os
+import subprocess
+import sys
+
+# the modules of the interpreter are in the parent directory
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import interpreter
+import optimizer
+import error
+from parsing import ParseXml
+
+engines = ("reference", "closure", "aot")
+interpret = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "interpret.py")
+
+
+# builds the XML of a program from its source, one instruction on a line like "ADD GF@x GF@x int@1"
+# (labels and types are written without a prefix like "JUMP loop" and "READ GF@x int")
+def build(source):
+    lines = ['<?xml version="1.0" encoding="UTF-8"?>', '<program language="IPPcode23">']
+    order = 0
+    for line in source.strip().splitlines():
+        words = line.split()
+        if not words:
+            continue
+        order += 1
+        lines.append('  <instruction order="{}" opcode="{}">'.format(order, words[0]))
+        instruction_class, kinds = ParseXml.opcodes[words[0]]
+        for position, (word, kind) in enumerate(zip(words[1:], kinds), 1):
+            if kind in ("label", "type"):
+                arg_type, value = kind, word
+            elif word.split("@", 1)[0] in ("GF", "LF", "TF"):
+                arg_type, value = "var", word
+            else:
+                arg_type, value = word.split("@", 1)
+            lines.append('    <arg{0} type="{1}">{2}</arg{0}>'.format(position, arg_type, html.escape(value, False)))
+        lines.append("  </instruction>")
+    lines.append("</program>")
+    return "\n".join(lines).encode("utf-8")
+
+
+# loads and runs the program (optionally optimized) by the engine, gets its output, exit code and stderr
+def run(source, engine="reference", optimize=False, stdin=b"", watchdog=None):
+    output = io.BytesIO()
+    stderr = io.StringIO()
+    try:
+        program = interpreter.load(io.BytesIO(build(source)))
+        if optimize:
+            program, statistics = optimizer.optimize(program)
+        exit_code = interpreter.Interpreter(engine, watchdog=watchdog).run(program, io.BytesIO(stdin), output,
+                                                                           stderr)
+    except error.InterpretError as interpret_error:
+        exit_code = interpret_error.exit_code
+    return output.getvalue().decode("utf-8"), exit_code, stderr.getvalue()
+
+
+# runs the program by every engine with and without the optimizer, checks that all the runs give the same
+# output and exit code as the unoptimized reference run (and the expected ones if they are given)
+def check_same(source, stdin=b"", output=None, exit_code=None):
+    expected = run(source, stdin=stdin)[:2]
+    for engine in engines:
+        for optimize in (False, True):
+            assert run(source, engine, optimize, stdin)[:2] == expected, (engine, optimize)
+    if output is not None:
+        assert expected[0] == output
+    if exit_code is not None:
+        assert expected[1] == exit_code
+    return expected
+
+
+# runs interpret.py with the arguments on the program written into the directory, gets its output, exit code
+# and stderr like "run"
+def run_command(source, arguments, directory, stdin=b""):
+    path = os.path.join(str(directory), "program.xml")
+    with open(path, "wb") as file:
+        file.write(build(source))
+    process = subprocess.run([sys.executable, interpret, "--source", path] + arguments, input=stdin,
+                             capture_output=True)
+    return process.stdout.decode("utf-8"), process.returncode, process.stderr.decode("utf-8")
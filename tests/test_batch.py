@@ -0,0 +1,107 @@
+import json
+import os
+import random
+import signal
+import subprocess
+import sys
+
+import pytest
+
+from support import build
+import batch
+
+
+# writes the programs, inputs and expected outputs of the cases into the directory and gets the manifest path
+# (a case is (name, source bytes, input bytes or None, expected output or None, expected exit code))
+def write_manifest(directory, cases):
+    lines = []
+    for name, source, read_input, output, exit_code in cases:
+        entry = {"source": name + ".xml", "exit_code": exit_code, "name": name}
+        (directory / entry["source"]).write_bytes(source)
+        if read_input is not None:
+            entry["input"] = name + ".in"
+            (directory / entry["input"]).write_bytes(read_input)
+        if output is not None:
+            entry["output"] = name + ".out"
+            (directory / entry["output"]).write_bytes(output)
+        lines.append(json.dumps(entry))
+    path = directory / "manifest.jsonl"
+    path.write_text("\n".join(lines) + "\n")
+    return str(path)
+
+
+cases = [
+    ("passed", build("DEFVAR GF@x\nREAD GF@x int\nWRITE GF@x"), b"42\n", b"42", 0),
+    ("exit", build("EXIT int@7"), None, b"", 7),
+    ("wrong_output", build("WRITE string@a"), None, b"b", 0),
+    ("wrong_exit_code", build("WRITE GF@undefined"), None, None, 0),
+    ("timeout", build("LABEL a\nJUMP a"), None, None, 0),
+    ("bad_xml", b"<program language=\"IPPcode23\"><instruction", None, None, 0),
+    ("bad_xml_expected", b"<program language=\"IPPcode23\"><instruction", None, None, 31),
+]
+
+
+@pytest.fixture
+def manifest(tmp_path):
+    path = write_manifest(tmp_path, cases)
+    # a case with an input file that does not exist crashes (the batch goes on)
+    with open(path, "a") as file:
+        file.write(json.dumps({"source": "exit.xml", "input": "missing.in", "exit_code": 7, "name": "crashed"})
+                   + "\n")
+    return path
+
+
+@pytest.mark.parametrize("engine", ["reference", "aot"])
+def test_run_batch(manifest, engine):
+    results = batch.run_batch(batch.read_manifest(manifest), 2, engine, 0.5)
+    assert [(result["name"], result["status"], result["exit_code"]) for result in results] == [
+        ("passed", "passed", 0),
+        ("exit", "passed", 7),
+        ("wrong_output", "failed", 0),
+        ("wrong_exit_code", "failed", 54),
+        ("timeout", "timeout", None),
+        ("bad_xml", "failed", 31),
+        ("bad_xml_expected", "passed", 31),
+        ("crashed", "crashed", None),
+    ]
+    assert results[2]["message"] == "different output"
+    assert results[7]["message"].startswith("FileNotFoundError")
+
+
+def test_report(manifest, tmp_path):
+    report = tmp_path / "report.json"
+    completed = subprocess.run([sys.executable, os.path.join(os.path.dirname(batch.__file__), "batch.py"), manifest,
+                                "--jobs", "2", "--timeout", "0.5", "--report", str(report)],
+                               stdout=subprocess.PIPE, text=True)
+    assert completed.returncode == 1
+    assert completed.stdout.splitlines()[-1].startswith("8 cases: 3 passed, 3 failed, 1 timeout, 1 crashed")
+    assert json.loads(report.read_text())["counts"] == {"passed": 3, "failed": 3, "timeout": 1, "crashed": 1}
+
+
+@pytest.mark.parametrize("line", ["{", "{\"input\": \"a.in\"}", "[]"])
+def test_invalid_manifest(tmp_path, line):
+    path = tmp_path / "manifest.jsonl"
+    path.write_text(json.dumps({"source": "a.xml"}) + "\n" + line + "\n")
+    with pytest.raises(batch.error.InterpretError) as raised:
+        batch.read_manifest(str(path))
+    assert raised.value.exit_code == 10
+    assert "line 2" in raised.value.message
+
+
+# an alarm coming at any moment of a case (even while the timer is being cancelled) ends only the case
+# as a timeout, it never gets out of run_case and no timer is left running
+def test_alarm_at_any_moment(tmp_path, monkeypatch):
+    case = batch.read_manifest(write_manifest(tmp_path, cases[:1]))[0]
+    batch.load_program(case.source)  # the worker has the program loaded already
+    handler = signal.signal(signal.SIGALRM, batch.raise_timeout)
+    generator = random.Random(0)
+    try:
+        statuses = set()
+        for _ in range(2000):
+            monkeypatch.setattr(batch, "worker_timeout", generator.uniform(1e-6, 2e-4))
+            statuses.add(batch.run_case(case)["status"])
+            assert signal.getitimer(signal.ITIMER_REAL) == (0.0, 0.0)
+        assert statuses <= {"passed", "timeout"}
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, handler)
@@ -0,0 +1,68 @@
+import io
+import os
+import time
+
+import pytest
+
+import support
+import cache
+import interpreter
+
+
+# a file changed after it was hashed is saved with the hash of the parsed bytes (never with the old one)
+def test_entry_has_key_of_parsed_bytes(tmp_path):
+    path = tmp_path / "program.xml"
+    path.write_bytes(support.build("WRITE int@1"))
+    program_cache = cache.ProgramCache(str(tmp_path / "cache"), 1 << 20)
+    key, source = program_cache.key(str(path))
+    path.write_bytes(support.build("WRITE int@2\nWRITE int@3"))
+    assert len(program_cache.load_source(source, interpreter.load).instructions) == 2
+    assert program_cache.load(key) is None
+    new_key, source = program_cache.key(str(path))
+    assert new_key != key
+    assert len(program_cache.load(new_key).instructions) == 2
+
+
+# the source is hashed in chunks, a source read only once (the standard input) is spooled to be parsed
+@pytest.mark.parametrize("size", [1, 10, 1000])
+def test_spooled_source(tmp_path, monkeypatch, size):
+    monkeypatch.setattr(cache.ProgramCache, "chunk_size", 7)
+    monkeypatch.setattr(cache.ProgramCache, "spool_size", 100)
+    data = support.build("\n".join(["WRITE int@1"] * size))
+    path = tmp_path / "program.xml"
+    path.write_bytes(data)
+    program_cache = cache.ProgramCache(str(tmp_path / "cache"), 1 << 20)
+    key, source = program_cache.key(io.BytesIO(data))
+    assert key == program_cache.key(str(path))[0]
+    assert len(program_cache.load_source(source, interpreter.load).instructions) == size
+    assert len(program_cache.load(key).instructions) == size
+
+
+# the hash covers the whole file even if the parser stops reading before its end
+def test_hash_of_whole_file():
+    hashed = cache.HashingFile(io.BytesIO(b"abcdef"))
+    hashed.read(2)
+    other = cache.HashingFile(io.BytesIO(b"abcdef"))
+    assert hashed.key() == other.key()
+    assert hashed.key() != cache.HashingFile(io.BytesIO(b"abcdeg")).key()
+
+
+def test_stale_temporary_files_evicted(tmp_path):
+    directory = tmp_path / "cache"
+    directory.mkdir()
+    stale = directory / "stale.tmp"
+    fresh = directory / "fresh.tmp"
+    stale.write_bytes(b"x")
+    fresh.write_bytes(b"x")
+    old = time.time() - cache.ProgramCache.stale_age - 10
+    os.utime(stale, (old, old))
+
+    path = tmp_path / "program.xml"
+    path.write_bytes(support.build("WRITE int@1"))
+    program_cache = cache.ProgramCache(str(directory), 1 << 20)
+    key, source = program_cache.key(str(path))
+    program_cache.load_source(source, interpreter.load)
+    assert not stale.exists()
+    assert fresh.exists()
+    assert program_cache.load(key) is not None
+
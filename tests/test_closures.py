@@ -0,0 +1,23 @@
+import gc
+import io
+
+import pytest
+
+from support import build
+import closures
+import interpreter
+
+
+# the garbage collector is paused only while the program is compiled (and stays off if it was off)
+@pytest.mark.parametrize("collecting", [True, False])
+def test_collector_state(collecting):
+    program = interpreter.load(io.BytesIO(build("DEFVAR GF@x\nMOVE GF@x int@1\nWRITE GF@x")))
+    vm = interpreter.Interpreter("closure")
+    vm.reset(program, None, None, None)
+    if not collecting:
+        gc.disable()
+    try:
+        assert len(closures.compile_program(program, vm)) == 3
+        assert gc.isenabled() == collecting
+    finally:
+        gc.enable()
@@ -0,0 +1,87 @@
+import pytest
+
+from support import check_same
+
+# the variables used by the cases: GF@u is defined but not initialized, GF@s is a string and GF@undefined does not exist
+prologue = """
+    DEFVAR GF@u
+    DEFVAR GF@s
+    MOVE GF@s string@abc
+"""
+
+# an instruction with an operand error, its target variable is looked up only after the operands are evaluated
+# (its frame has to exist though)
+failing = [
+    ("ADD {} int@1 string@a", 53),
+    ("ADD {} GF@u int@1", 54),
+    ("IDIV {} int@1 int@0", 57),
+    ("LT {} nil@nil nil@nil", 53),
+    ("EQ {} int@1 string@a", 53),
+    ("AND {} int@1 bool@true", 53),
+    ("NOT {} int@1", 53),
+    ("INT2CHAR {} int@-1", 58),
+    ("INT2CHAR {} string@a", 53),
+    ("STRI2INT {} string@abc int@3", 58),
+    ("STRI2INT {} GF@s int@3", 58),
+    ("STRI2INT {} int@1 int@0", 53),
+    ("GETCHAR {} string@abc int@3", 58),
+    ("GETCHAR {} GF@s string@a", 53),
+    ("CONCAT {} string@a int@1", 53),
+    ("STRLEN {} int@1", 53),
+    ("TYPE {} GF@undefined", 54),
+]
+
+
+@pytest.mark.parametrize("target", ["GF@undefined", "TF@x", "LF@x"])
+@pytest.mark.parametrize("instruction, exit_code", failing)
+def test_operand_error_before_target(instruction, exit_code, target):
+    frames = {"GF@undefined": "", "TF@x": "CREATEFRAME\n", "LF@x": "CREATEFRAME\nPUSHFRAME\n"}
+    check_same(prologue + frames[target] + instruction.format(target) + "\nWRITE string@x", output="",
+               exit_code=exit_code)
+
+
+# a missing frame of the target is found before the operands
+@pytest.mark.parametrize("instruction", [instruction for instruction, exit_code in failing])
+@pytest.mark.parametrize("target", ["LF@x", "TF@x"])
+def test_missing_frame_before_operands(instruction, target):
+    check_same(prologue + instruction.format(target), output="", exit_code=55)
+
+
+# the operands are valid, so the missing target is the error
+@pytest.mark.parametrize("instruction", [
+    "ADD {} int@1 int@1",
+    "INT2CHAR {} int@65",
+    "STRI2INT {} string@abc int@-1",
+    "GETCHAR {} string@abc int@-1",
+    "TYPE {} GF@u",
+    "READ {} int",
+])
+@pytest.mark.parametrize("target", ["GF@undefined", "TF@x"])
+def test_missing_target(instruction, target):
+    check_same(prologue + "CREATEFRAME\n" + instruction.format(target) + "\nWRITE string@x", output="", exit_code=54)
+
+
+# the values are popped before the target is checked, so an empty stack or wrong operands come first
+@pytest.mark.parametrize("instructions, exit_code", [
+    ("POPS {}", 56),
+    ("PUSHS int@1\nPUSHS int@0\nIDIVS\nPOPS {}", 57),
+    ("PUSHS string@abc\nPUSHS int@3\nSTRI2INTS\nPOPS {}", 58),
+    ("PUSHS int@-1\nINT2CHARS\nPOPS {}", 58),
+    ("PUSHS int@1\nPUSHS string@a\nADDS\nPOPS {}", 53),
+    ("PUSHS int@1\nPOPS {}", 54),
+])
+def test_stack_error_before_target(instructions, exit_code):
+    check_same(prologue + instructions.format("GF@undefined"), output="", exit_code=exit_code)
+
+
+# the errors inside the loops the optimizer rewrites are the same too
+@pytest.mark.parametrize("source, output, exit_code", [
+    ("DEFVAR GF@i\nMOVE GF@i int@0\nLABEL l\nADD GF@undefined GF@i string@a\nJUMPIFNEQ l GF@i int@3", "", 53),
+    ("DEFVAR GF@i\nLABEL l\nADD GF@undefined GF@i int@1\nJUMPIFNEQ l GF@i int@3", "", 54),
+    ("DEFVAR GF@i\nMOVE GF@i int@0\nLABEL l\nADD GF@i GF@i int@1\nWRITE GF@i\nJUMPIFNEQ l GF@i string@a", "1", 53),
+    ("DEFVAR GF@i\nMOVE GF@i int@0\nLABEL l\nGETCHAR GF@undefined GF@s GF@i\nADD GF@i GF@i int@1\nJUMP l", "", 54),
+    ("DEFVAR GF@i\nMOVE GF@i int@0\nLABEL l\nGETCHAR GF@u GF@s GF@i\nWRITE GF@u\nADD GF@i GF@i int@1\nJUMP l",
+     "abc", 58),
+])
+def test_loop_errors(source, output, exit_code):
+    check_same(prologue + source, output=output, exit_code=exit_code)
@@ -0,0 +1,107 @@
+import pytest
+
+import support
+
+
+# the jump compares a string constant looking like the variable, so it fails like without fusing
+@pytest.mark.parametrize("jump", [
+    "JUMPIFNEQ loop string@GF@x GF@x",
+    "JUMPIFNEQ loop GF@x string@GF@x",
+])
+def test_arithmetic_jump_with_constant_like_variable(jump):
+    support.check_same("""
+        DEFVAR GF@x
+        MOVE GF@x int@0
+        LABEL loop
+        ADD GF@x GF@x int@1
+        {}
+        WRITE GF@x
+    """.format(jump), output="", exit_code=53)
+
+
+@pytest.mark.parametrize("jump, exit_code", [
+    ("JUMPIFEQ end string@GF@c bool@true", 53),
+    ("JUMPIFEQ end bool@true string@GF@c", 53),
+    ("JUMPIFEQ end GF@c bool@true", 0),
+    ("JUMPIFNEQ end bool@false GF@c", 0),
+])
+def test_relational_jump_with_constant_like_variable(jump, exit_code):
+    support.check_same("""
+        DEFVAR GF@a
+        DEFVAR GF@c
+        MOVE GF@a int@1
+        LT GF@c GF@a int@2
+        {}
+        WRITE string@not\\032jumped
+        LABEL end
+    """.format(jump), exit_code=exit_code)
+
+
+# loops with every fused instruction, the results are the same as of the unfused instructions
+@pytest.mark.parametrize("compare, jump", [
+    ("LT", "JUMPIFEQ"), ("LT", "JUMPIFNEQ"), ("GT", "JUMPIFEQ"), ("GT", "JUMPIFNEQ"),
+    ("EQ", "JUMPIFEQ"), ("EQ", "JUMPIFNEQ"),
+])
+def test_relational_jumps(compare, jump):
+    support.check_same("""
+        DEFVAR GF@i
+        DEFVAR GF@c
+        MOVE GF@i int@0
+        LABEL loop
+        ADD GF@i GF@i int@1
+        WRITE GF@i
+        JUMPIFEQ end GF@i int@10
+        {} GF@c GF@i int@5
+        {} loop GF@c bool@true
+        WRITE string@|
+        JUMP loop
+        LABEL end
+    """.format(compare, jump), exit_code=0)
+
+
+@pytest.mark.parametrize("operation", ["ADD", "SUB"])
+@pytest.mark.parametrize("other", ["int@7", "int@-7", "GF@limit", "GF@i", "nil@nil"])
+def test_arithmetic_jumps(operation, other):
+    support.check_same("""
+        DEFVAR GF@i
+        DEFVAR GF@limit
+        MOVE GF@i int@0
+        MOVE GF@limit int@7
+        LABEL loop
+        WRITE GF@i
+        {} GF@i GF@i int@1
+        JUMPIFEQ end GF@i int@20
+        JUMPIFEQ end GF@i int@-20
+        JUMPIFNEQ loop GF@i {}
+        LABEL end
+    """.format(operation, other), exit_code=0)
+
+
+@pytest.mark.parametrize("source, exit_code", [
+    ("DEFVAR GF@i\nMOVE GF@i string@a\nLABEL l\nADD GF@i GF@i int@1\nJUMPIFEQ l GF@i int@1", 53),
+    ("DEFVAR GF@i\nMOVE GF@i int@1\nLABEL l\nADD GF@i GF@i int@1\nJUMPIFEQ l GF@i string@a", 53),
+    ("DEFVAR GF@c\nLT GF@c nil@nil int@1\nJUMPIFEQ l GF@c bool@true\nLABEL l", 53),
+    ("DEFVAR GF@c\nEQ GF@c nil@nil int@1\nJUMPIFEQ l GF@c bool@true\nLABEL l\nWRITE GF@c", 0),
+    ("DEFVAR GF@c\nLT GF@c int@1 int@2\nJUMPIFEQ l GF@c bool@true\nLABEL l\nWRITE GF@missing", 54),
+])
+def test_fused_errors(source, exit_code):
+    support.check_same(source, exit_code=exit_code)
+
+
+def test_defvar_move_and_call_frame():
+    support.check_same("""
+        DEFVAR GF@x
+        MOVE GF@x int@1
+        CREATEFRAME
+        PUSHFRAME
+        CALL f
+        WRITE GF@x
+        EXIT int@0
+        LABEL f
+        DEFVAR LF@y
+        MOVE LF@y GF@x
+        ADD GF@x LF@y int@1
+        DEFVAR LF@z
+        MOVE LF@z LF@z
+        RETURN
+    """, exit_code=54)
@@ -0,0 +1,102 @@
+import io
+
+import pytest
+
+import support
+import interpreter
+import optimizer
+
+
+# gets the opcodes of the unchecked instructions in the optimized program
+def unchecked(source):
+    program, statistics = optimizer.optimize(interpreter.load(io.BytesIO(support.build(source))))
+    return [type(part).__name__ for instruction in program.instructions
+            for part in getattr(instruction, "parts", (instruction,)) if not part.checked]
+
+
+def test_proven_types_are_unchecked():
+    source = """
+        DEFVAR GF@i
+        DEFVAR GF@s
+        DEFVAR GF@n
+        MOVE GF@i int@0
+        MOVE GF@s string@
+        LABEL loop
+        CONCAT GF@s GF@s string@a
+        MUL GF@n GF@i int@2
+        ADD GF@i GF@i int@1
+        JUMPIFNEQ loop GF@i int@5
+        STRLEN GF@n GF@s
+        WRITE GF@n
+        WRITE GF@s
+    """
+    assert {"UncheckedConcat", "UncheckedMul", "UncheckedStrLen"} <= set(unchecked(source))
+    support.check_same(source, output="5aaaaa", exit_code=0)
+
+
+# the variable can have more types on some path, so the instruction keeps its checks and fails
+def test_types_merged_from_paths():
+    source = """
+        DEFVAR GF@x
+        DEFVAR GF@y
+        MOVE GF@x int@1
+        JUMPIFEQ skip int@{} int@1
+        MOVE GF@x string@a
+        LABEL skip
+        ADD GF@y GF@x int@1
+        WRITE GF@y
+    """
+    assert "UncheckedAdd" not in unchecked(source.format(0))
+    support.check_same(source.format(0), exit_code=53)
+    support.check_same(source.format(1), output="2", exit_code=0)
+
+
+# a variable of LF or TF gets the types written into any variable of its name
+def test_frame_variables():
+    source = """
+        DEFVAR GF@r
+        CREATEFRAME
+        DEFVAR TF@x
+        MOVE TF@x int@1
+        CALL f
+        CREATEFRAME
+        DEFVAR TF@x
+        MOVE TF@x string@a
+        CALL f
+        LABEL f
+        PUSHFRAME
+        ADD GF@r LF@x int@1
+        WRITE GF@r
+        POPFRAME
+        RETURN
+    """
+    assert "UncheckedAdd" not in unchecked(source)
+    support.check_same(source, output="2", exit_code=53)
+
+
+# the types of a global variable written in a function reach the instructions after every call
+def test_types_after_calls():
+    support.check_same("""
+        DEFVAR GF@x
+        MOVE GF@x int@1
+        CALL set
+        LT GF@x GF@x int@2
+        WRITE GF@x
+        EXIT int@0
+        LABEL set
+        MOVE GF@x bool@true
+        RETURN
+    """, exit_code=53)
+
+
+@pytest.mark.parametrize("source, output, exit_code", [
+    ("DEFVAR GF@x\nMOVE GF@x int@1\nIDIV GF@x GF@x int@0", "", 57),
+    ("DEFVAR GF@x\nDEFVAR GF@y\nADD GF@y GF@x int@1", "", 54),
+    ("DEFVAR GF@x\nMOVE GF@x string@ab\nGETCHAR GF@x GF@x int@2", "", 58),
+    ("DEFVAR GF@x\nMOVE GF@x nil@nil\nEQ GF@x GF@x int@1\nWRITE GF@x", "false", 0),
+    ("DEFVAR GF@x\nMOVE GF@x bool@true\nNOT GF@x GF@x\nAND GF@x GF@x bool@true\nOR GF@x GF@x GF@x\nWRITE GF@x",
+     "false", 0),
+    ("DEFVAR GF@x\nREAD GF@x int\nADD GF@x GF@x int@1\nWRITE GF@x", "", 53),
+])
+def test_unchecked_keep_other_errors(source, output, exit_code):
+    support.check_same(source, output=output, exit_code=exit_code)
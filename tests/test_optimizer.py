@@ -0,0 +1,146 @@
+import pytest
+
+import support
+
+
+# folded instructions give the same results as running them
+def test_folded_constants():
+    support.check_same("""
+        DEFVAR GF@x
+        DEFVAR GF@y
+        MOVE GF@x int@2
+        ADD GF@y GF@x int@3
+        MUL GF@y GF@y GF@x
+        WRITE GF@y
+        CONCAT GF@x string@ab string@cd
+        STRLEN GF@y GF@x
+        WRITE GF@x
+        WRITE GF@y
+        GETCHAR GF@x GF@x int@-1
+        WRITE GF@x
+        LT GF@y int@1 int@2
+        WRITE GF@y
+        TYPE GF@y nil@nil
+        WRITE GF@y
+    """, output="10abcd4dtruenil", exit_code=0)
+
+
+# an instruction failing with constant symbols is kept, so it fails only if it runs
+@pytest.mark.parametrize("instruction", [
+    "STRI2INT GF@x string@abc int@-10",
+    "GETCHAR GF@x string@abc int@-10",
+    "INT2CHAR GF@x int@99999999999999999999",
+    "INT2CHAR GF@x int@-1",
+    "GETCHAR GF@x string@abc int@5",
+    "IDIV GF@x int@1 int@0",
+    "ADD GF@x int@1 string@a",
+    "STRLEN GF@x int@1",
+])
+def test_failing_constants_not_run(instruction):
+    support.check_same("""
+        DEFVAR GF@x
+        WRITE string@ok
+        JUMP end
+        {}
+        LABEL end
+    """.format(instruction), output="ok", exit_code=0)
+
+
+@pytest.mark.parametrize("instruction, exit_code", [
+    ("GETCHAR GF@x string@abc int@5", 58),
+    ("STRI2INT GF@x string@abc int@3", 58),
+    ("INT2CHAR GF@x int@-1", 58),
+    ("IDIV GF@x int@1 int@0", 57),
+    ("ADD GF@x int@1 string@a", 53),
+    ("EQ GF@x int@1 bool@true", 53),
+    # the operands fail before the undefined variable is found
+    ("INT2CHAR GF@undefined int@-1", 58),
+    ("STRI2INT GF@undefined string@abc int@3", 58),
+    ("GETCHAR GF@undefined string@abc int@5", 58),
+    ("IDIV GF@undefined int@1 int@0", 57),
+    ("INT2CHAR GF@undefined int@65", 54),
+    ("STRI2INT GF@undefined string@abc int@-1", 54),
+])
+def test_failing_constants_run(instruction, exit_code):
+    support.check_same("""
+        DEFVAR GF@x
+        WRITE string@ok
+        {}
+        WRITE string@unreachable
+    """.format(instruction), output="ok", exit_code=exit_code)
+
+
+def test_folded_jumps():
+    support.check_same("""
+        JUMPIFEQ first int@1 int@1
+        WRITE string@not\\032taken
+        LABEL first
+        JUMPIFNEQ second string@a string@a
+        WRITE string@b
+        LABEL second
+        JUMPIFEQ third nil@nil int@1
+        WRITE string@c
+        LABEL third
+    """, output="bc", exit_code=0)
+
+
+# a constant of a LF variable is not known after the frame changes
+def test_constants_of_frames():
+    support.check_same("""
+        CREATEFRAME
+        DEFVAR TF@x
+        MOVE TF@x int@1
+        PUSHFRAME
+        CREATEFRAME
+        DEFVAR TF@x
+        MOVE TF@x int@2
+        PUSHFRAME
+        WRITE LF@x
+        POPFRAME
+        WRITE LF@x
+    """, output="21", exit_code=0)
+
+
+@pytest.mark.parametrize("pop, output, exit_code", [
+    ("POPS GF@y", "5", 0),
+    ("POPS TF@y", "", 55),
+    ("POPS GF@undefined", "", 54),
+])
+def test_stack_pairs(pop, output, exit_code):
+    support.check_same("""
+        DEFVAR GF@x
+        DEFVAR GF@y
+        MOVE GF@x int@5
+        PUSHS GF@x
+        {}
+        WRITE GF@y
+    """.format(pop), output=output, exit_code=exit_code)
+
+
+# jumps to jumps, jumps to the next instruction, dead code and unused labels
+def test_control_flow():
+    support.check_same("""
+        DEFVAR GF@i
+        MOVE GF@i int@0
+        JUMP start
+        WRITE string@dead
+        LABEL unused
+        LABEL start
+        JUMP loop
+        LABEL loop
+        ADD GF@i GF@i int@1
+        JUMPIFEQ done GF@i int@3
+        JUMP again
+        WRITE string@dead
+        LABEL again
+        JUMP loop
+        LABEL done
+        WRITE GF@i
+    """, output="3", exit_code=0)
+
+
+def test_undefined_label():
+    support.check_same("""
+        WRITE string@a
+        JUMP missing
+    """, exit_code=52)
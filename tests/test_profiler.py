@@ -0,0 +1,67 @@
+import io
+import json
+
+import pytest
+
+from support import build, engines, run_command
+import interpreter
+import profiler
+
+source = """
+    DEFVAR GF@i
+    MOVE GF@i int@0
+    LABEL loop
+    CALL f
+    JUMPIFNEQ loop GF@i int@3
+    WRITE GF@i
+    EXIT int@0
+    LABEL f
+    ADD GF@i GF@i int@1
+    RETURN
+"""
+
+
+def run_profiled(source, engine):
+    program_profiler = profiler.Profiler()
+    interpreter.Interpreter(engine, profiler=program_profiler).run(interpreter.load(io.BytesIO(build(source))),
+                                                                   io.BytesIO(), io.BytesIO(), io.StringIO())
+    return program_profiler.report()
+
+
+# the counts are the same in all the engines (LABEL f is never executed, the calls jump over it)
+@pytest.mark.parametrize("engine", engines)
+def test_counts(engine):
+    report = run_profiled(source, engine)
+    assert {order: count for order, count, seconds in report["orders"]} == {
+        1: 1, 2: 1, 3: 1, 4: 3, 5: 3, 6: 1, 7: 1, 9: 3, 10: 3}
+    assert {name: count for name, count, seconds in report["opcodes"]} == {
+        "DefVar": 1, "Move": 1, "Label": 1, "Call": 3, "JumpIfNEq": 3, "Write": 1, "Exit": 1, "Add": 3, "Return": 3}
+    assert {name: count for name, count, seconds in report["labels"]} == {profiler.Profiler.main: 2, "loop": 9, "f": 6}
+    assert {name: calls for name, calls, self_time, inclusive in report["functions"]} == {
+        profiler.Profiler.main: 1, "f": 3}
+    assert all(self_time <= inclusive <= report["elapsed"] for name, calls, self_time, inclusive in report["functions"])
+
+
+def test_table(tmp_path):
+    output, exit_code, stderr = run_command(source, ["--profile"], tmp_path)
+    assert (output, exit_code) == ("3", 0)
+    lines = stderr.splitlines()
+    assert lines[0].startswith("Profile of ")
+    headers = [line.split()[0] for line in lines if line.endswith("avg [us]")]
+    assert headers == ["opcode", "function", "label", "order"]
+    assert any(line.split()[:2] == ["Call", "3"] for line in lines)
+    assert any(line.split()[:2] == ["f", "3"] for line in lines)
+    assert "function (inclusive)" in stderr
+
+
+# the profile is written even when the program ends by an error
+def test_json(tmp_path):
+    path = tmp_path / "profile.json"
+    output, exit_code, stderr = run_command(source.replace("EXIT int@0", "EXIT int@50"), ["--profile", str(path)],
+                                            tmp_path)
+    assert (output, exit_code) == ("3", 57)
+    document = json.loads(path.read_text())
+    assert set(document) == {"elapsed", "opcodes", "orders", "labels", "functions"}
+    assert {item["opcode"]: item["count"] for item in document["opcodes"]}["Call"] == 3
+    assert {item["order"]: item["count"] for item in document["orders"]}[9] == 3
+    assert [item["calls"] for item in document["functions"] if item["function"] == "f"] == [3]
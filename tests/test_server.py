@@ -0,0 +1,111 @@
+import os
+import socket
+import tempfile
+import threading
+
+import pytest
+
+from support import build
+import protocol
+import server
+
+
+# gets a function starting a server (with the root and the limits) and returning the path of its socket
+@pytest.fixture
+def start_server():
+    servers = []
+
+    def start_server(root=None, limits=(None, None, None, None)):
+        path = os.path.join(tempfile.mkdtemp(), "server.sock")
+        servers.append(server.Server(path, "reference", 4, root, limits))
+        threading.Thread(target=servers[-1].serve_forever, daemon=True).start()
+        return path
+
+    yield start_server
+    for running in servers:
+        running.shutdown()
+        running.server_close()
+        os.unlink(running.server_address)
+        os.rmdir(os.path.dirname(running.server_address))
+
+
+@pytest.fixture
+def socket_path(start_server):
+    return start_server()
+
+
+# sends a request with the header values and the program, gets the output, the error output and the exit code
+def request(path, values, program):
+    header = {"source": None, "program_size": len(program), "input_size": 0}
+    header.update(values)
+    frames = {protocol.OUTPUT: b"", protocol.ERROR: b""}
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+        connection.connect(path)
+        with connection.makefile("rwb") as file:
+            protocol.write_header(file, header)
+            file.write(program)
+            file.flush()
+            while True:
+                kind, data = protocol.read_frame(file)
+                if kind == protocol.EXIT:
+                    return frames[protocol.OUTPUT], frames[protocol.ERROR], int(data)
+                frames[kind] += data
+
+
+program = build("WRITE string@ok")
+
+
+@pytest.mark.parametrize("engine", protocol.engines)
+@pytest.mark.parametrize("flush", protocol.flush_policies)
+def test_known_values(socket_path, engine, flush):
+    assert request(socket_path, {"engine": engine, "flush": flush}, program) == (b"ok", b"", 0)
+
+
+def test_default_values(socket_path):
+    assert request(socket_path, {}, program) == (b"ok", b"", 0)
+
+
+@pytest.mark.parametrize("values, message", [
+    ({"engine": "fast"}, b"Unknown engine: fast!\n"),
+    ({"engine": None}, b"Unknown engine: None!\n"),
+    ({"flush": "never"}, b"Unknown flush policy: never!\n"),
+    ({"engine": "closure", "flush": 1}, b"Unknown flush policy: 1!\n"),
+])
+def test_unknown_values(socket_path, values, message):
+    assert request(socket_path, values, program) == (b"", message, 10)
+
+
+# a program running forever is ended by the limits of the server and the server still answers
+@pytest.mark.parametrize("limits", [(1000, None, None, None), (None, 0.2, None, None)])
+def test_limits(start_server, limits):
+    path = start_server(limits=limits)
+    output, message, exit_code = request(path, {}, build("WRITE string@a\nLABEL a\nJUMP a"))
+    assert (output, exit_code) == (b"a", 59)
+    assert b"exceeded" in message
+    assert request(path, {"engine": "aot"}, build("LABEL a\nJUMP a"))[2] == 59
+    assert request(path, {}, program) == (b"ok", b"", 0)
+
+
+def test_stack_limit(start_server):
+    path = start_server(limits=(None, None, 10, None))
+    assert request(path, {}, build("LABEL a\nPUSHS int@1\nJUMP a"))[2] == 59
+
+
+# a source file is opened only inside the root (links are followed before the check)
+def test_source_paths(start_server, tmp_path):
+    root = tmp_path / "root"
+    root.mkdir()
+    (root / "inside.xml").write_bytes(program)
+    (tmp_path / "outside.xml").write_bytes(program)
+    (root / "link.xml").symlink_to(tmp_path / "outside.xml")
+
+    path = start_server(root=str(root))
+    assert request(path, {"source": str(root / "inside.xml")}, b"") == (b"ok", b"", 0)
+    for source in (tmp_path / "outside.xml", root / "link.xml", root / ".." / "outside.xml"):
+        assert request(path, {"source": str(source)}, b"") == (
+            b"", b"The source file is outside the root of the server!\n", 11)
+    assert request(path, {"source": ["a"]}, b"")[2] == 11
+
+    path = start_server()
+    assert request(path, {"source": str(root / "inside.xml")}, b"") == (
+        b"", b"The server does not open source files, the program has to be sent!\n", 11)
@@ -0,0 +1,104 @@
+import pytest
+
+import support
+
+
+# the results of the instructions (the second symbol is pushed last)
+@pytest.mark.parametrize("pushes, instruction, output", [
+    ("int@7 int@2", "ADDS", "9"),
+    ("int@7 int@2", "SUBS", "5"),
+    ("int@7 int@2", "MULS", "14"),
+    ("int@7 int@2", "IDIVS", "3"),
+    ("int@-7 int@2", "IDIVS", "-4"),
+    ("int@1 int@2", "LTS", "true"),
+    ("string@b string@a", "GTS", "true"),
+    ("nil@nil int@1", "EQS", "false"),
+    ("nil@nil nil@nil", "EQS", "true"),
+    ("bool@true bool@false", "ANDS", "false"),
+    ("bool@true bool@false", "ORS", "true"),
+    ("bool@false", "NOTS", "true"),
+    ("int@97", "INT2CHARS", "a"),
+    ("string@abc int@1", "STRI2INTS", "98"),
+])
+def test_results(pushes, instruction, output):
+    support.check_same("\n".join(["DEFVAR GF@x"] + ["PUSHS " + push for push in pushes.split()]
+                                 + [instruction, "POPS GF@x", "WRITE GF@x"]), output=output, exit_code=0)
+
+
+@pytest.mark.parametrize("pushes, instruction, exit_code", [
+    ("", "ADDS", 56),
+    ("int@1", "SUBS", 56),
+    ("int@1 string@a", "MULS", 53),
+    ("int@1 int@0", "IDIVS", 57),
+    ("nil@nil int@1", "LTS", 53),
+    ("int@1 string@a", "EQS", 53),
+    ("int@1 bool@true", "ANDS", 53),
+    ("int@1", "NOTS", 53),
+    ("int@-1", "INT2CHARS", 58),
+    ("string@abc int@3", "STRI2INTS", 58),
+    ("int@1 int@3", "STRI2INTS", 53),
+    ("", "JUMPIFEQS end", 56),
+    ("int@1 string@a", "JUMPIFNEQS end", 53),
+])
+def test_errors(pushes, instruction, exit_code):
+    support.check_same("\n".join(["PUSHS " + push for push in pushes.split()]
+                                 + [instruction, "LABEL end"]), exit_code=exit_code)
+
+
+def test_clears():
+    support.check_same("""
+        DEFVAR GF@x
+        PUSHS int@1
+        PUSHS int@2
+        CLEARS
+        PUSHS int@3
+        POPS GF@x
+        WRITE GF@x
+        POPS GF@x
+    """, output="3", exit_code=56)
+
+
+# a loop counting on the stack and jumping by the stack comparisons
+def test_stack_loop():
+    support.check_same("""
+        DEFVAR GF@i
+        MOVE GF@i int@0
+        LABEL loop
+        PUSHS GF@i
+        PUSHS int@1
+        ADDS
+        POPS GF@i
+        WRITE GF@i
+        PUSHS GF@i
+        PUSHS int@3
+        IDIVS
+        PUSHS int@2
+        JUMPIFEQS end
+        PUSHS GF@i
+        PUSHS nil@nil
+        JUMPIFNEQS loop
+        LABEL end
+    """, output="123456", exit_code=0)
+
+
+# the stack instructions read strings changed by SETCHAR
+def test_changed_strings():
+    support.check_same("""
+        DEFVAR GF@s
+        DEFVAR GF@x
+        MOVE GF@s string@abc
+        SETCHAR GF@s int@0 string@z
+        PUSHS GF@s
+        PUSHS int@0
+        STRI2INTS
+        INT2CHARS
+        PUSHS GF@s
+        EQS
+        POPS GF@x
+        WRITE GF@x
+        PUSHS GF@s
+        PUSHS string@zbc
+        EQS
+        POPS GF@x
+        WRITE GF@x
+    """, output="falsetrue", exit_code=0)
@@ -0,0 +1,59 @@
+import json
+
+import pytest
+
+from support import engines, run_command
+
+source = """
+    DEFVAR GF@x
+    READ GF@x string
+    PUSHS GF@x
+    PUSHS int@1
+    CALL f
+    WRITE GF@x
+    EXIT int@3
+    LABEL f
+    CREATEFRAME
+    DEFVAR TF@a
+    DEFVAR TF@b
+    PUSHFRAME
+    CREATEFRAME
+    POPS GF@x
+    CLEARS
+    RETURN
+"""
+
+
+def read_statistics(source, engine, tmp_path, stdin=b""):
+    path = tmp_path / "stats.json"
+    output, exit_code, stderr = run_command(source, ["--engine", engine, "--stats", str(path)], tmp_path, stdin)
+    document = json.loads(path.read_text())
+    assert document["exit_code"] == exit_code
+    assert all(seconds >= 0.0 for seconds in document["time"].values())
+    del document["time"]
+    return output, document
+
+
+@pytest.mark.parametrize("engine", engines)
+def test_statistics(engine, tmp_path):
+    assert read_statistics(source, engine, tmp_path, "ž\r\nrest\n".encode()) == ("1", {
+        "exit_code": 3,
+        "instructions": 15,
+        "stack_peaks": {"data": 2, "frame": 1, "order": 1},
+        "variable_peaks": {"GF": 1, "LF": 2, "TF": 2},
+        "created_frames": 2,
+        "bytes_read": 4,
+        "bytes_written": 1,
+    })
+
+
+# the statistics are written however the run ends, even when the program cannot be loaded
+@pytest.mark.parametrize("source, exit_code, instructions", [
+    ("WRITE string@a\nWRITE GF@x", 54, 2),
+    ("WRITE string@a\nJUMP missing", 52, 2),
+    ("LABEL a\nLABEL a", 52, 0),
+])
+@pytest.mark.parametrize("engine", engines)
+def test_failed_run(engine, source, exit_code, instructions, tmp_path):
+    output, document = read_statistics(source, engine, tmp_path)
+    assert (document["exit_code"], document["instructions"]) == (exit_code, instructions)
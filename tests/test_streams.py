@@ -0,0 +1,118 @@
+import io
+
+import pytest
+
+from support import run
+import streams
+
+
+# gets a function opening the bytes as a file in the memory, as a regular file (both read by the text layer)
+# or as a regular file mapped whatever its lines are (if it has no "\r")
+@pytest.fixture(params=["memory", "file", "mapped"])
+def open_data(request, tmp_path, monkeypatch):
+    if request.param == "mapped":
+        monkeypatch.setattr(streams.Input, "mapped_line", 1)
+    files = []
+
+    def open_data(data):
+        if request.param == "memory":
+            return io.BytesIO(data)
+        path = tmp_path / "input"
+        path.write_bytes(data)
+        files.append(open(path, "rb"))
+        return files[-1]
+
+    yield open_data
+    for file in files:
+        file.close()
+
+
+# reads all the lines (with the empty string at the end) from the input
+def read_lines(read_input):
+    lines = [read_input.readline()]
+    while lines[-1]:
+        lines.append(read_input.readline())
+    return lines
+
+
+cases = [
+    b"",
+    b"a",
+    b"a\n",
+    b"\n\n",
+    b"a\nbc\n\nd",
+    b"a\r\nb\rc\n\r\n\r",
+    b"\r\r\rx\r\nx\r\n",
+    b"a\x0bb\x0cc\x1cd\n",
+    "žluťoučký\nkůň\n€".encode() * 20,
+    "žluťoučký\r\nkůň\n€".encode() * 20,
+    b"x" * 8191 + b"\r\n" + b"y" * 8190 + b"\r\r\n",
+]
+
+
+@pytest.mark.parametrize("data", cases)
+def test_lines_of_text_file(open_data, data):
+    expected = io.TextIOWrapper(io.BytesIO(data), encoding="utf-8", newline=None).readlines() + [""]
+    assert read_lines(streams.Input(open_data(data))) == expected
+
+
+# the counted lines are the same and all the bytes of the file are counted (before the new lines are translated)
+@pytest.mark.parametrize("data", cases)
+def test_counted_lines(open_data, data):
+    expected = io.TextIOWrapper(io.BytesIO(data), encoding="utf-8", newline=None).readlines() + [""]
+    read_input = streams.Input(open_data(data))
+    read_input.count()
+    assert read_lines(read_input) == expected
+    assert read_input.read == len(data)
+
+
+def test_counted_bytes(open_data):
+    read_input = streams.Input(open_data("a\r\nž\n".encode()))
+    read_input.count()
+    assert [read_input.readline() for _ in range(2)] == ["a\n", "ž\n"]
+    assert read_input.read == 6
+
+
+def test_end_of_input_repeats(open_data):
+    read_input = streams.Input(open_data(b"a"))
+    assert [read_input.readline() for _ in range(3)] == ["a", "", ""]
+
+
+# a file is read from its position (like the standard input after a part of it was read)
+def test_read_from_position(open_data):
+    file = open_data(b"skipped\na\nb\n")
+    file.readline()
+    assert read_lines(streams.Input(file)) == ["a\n", "b\n", ""]
+
+
+@pytest.mark.parametrize("data, mapped", [
+    (b"a" * 300 + b"\n" + b"b" * 300 + b"\n", True),
+    (b"a" * 300 + b"\r\n" + b"b" * 300 + b"\n", False),
+    (b"a\nb\n" * 100, False),
+    (b"", False),
+])
+def test_regular_file_is_mapped(tmp_path, data, mapped):
+    path = tmp_path / "input"
+    path.write_bytes(data)
+    with open(path, "rb") as file:
+        assert (streams.Input(file).mapping is not None) == mapped
+
+
+def test_detach_keeps_file(open_data):
+    file = open_data(b"a\nb\n")
+    read_input = streams.Input(file)
+    read_input.readline()
+    read_input.detach()
+    assert not file.closed
+
+
+def test_read_instruction():
+    source = """
+        READ GF@x int
+        READ GF@y string
+        READ GF@z bool
+        WRITE GF@x
+        WRITE GF@y
+        WRITE GF@z
+    """
+    assert run("DEFVAR GF@x\nDEFVAR GF@y\nDEFVAR GF@z" + source, stdin=b"42\r\nab\rtrue")[:2] == ("42ab\ntrue", 0)
@@ -0,0 +1,83 @@
+import io
+
+import pytest
+
+from support import build, engines, run_command
+import interpreter
+import tracer
+import error
+
+source = """
+    DEFVAR GF@i
+    DEFVAR GF@s
+    MOVE GF@i int@0
+    LABEL loop
+    ADD GF@i GF@i int@1
+    CONCAT GF@s GF@i string@x
+    JUMPIFNEQ loop GF@i int@3
+"""
+
+
+def run_traced(source, engine, size, every=1):
+    stderr = io.StringIO()
+    try:
+        exit_code = interpreter.Interpreter(engine, tracer=tracer.Tracer(size, every)).run(
+            interpreter.load(io.BytesIO(build(source))), io.BytesIO(), io.BytesIO(), stderr)
+    except error.InterpretError as interpret_error:
+        exit_code = interpret_error.exit_code
+    return exit_code, stderr.getvalue()
+
+
+# the failing instruction is the last one in the trace, its operands are recorded before it runs
+@pytest.mark.parametrize("engine", engines)
+def test_trace_on_error(engine):
+    assert run_traced(source, engine, 3) == (53, "Trace of the last 3 instructions:\n"
+                                                 "         4  LABEL        loop\n"
+                                                 "         5  ADD          GF@i=int@0, GF@i=int@0, int@1\n"
+                                                 "         6  CONCAT       GF@s=uninitialized, GF@i=int@1, string@x\n")
+
+
+@pytest.mark.parametrize("engine", engines)
+def test_trace_every(engine):
+    assert run_traced(source, engine, 4, 2) == (53, "Trace of the last 3 instructions (every 2. one):\n"
+                                                    "         1  DEFVAR       GF@i=undefined\n"
+                                                    "         3  MOVE         GF@i=uninitialized, int@0\n"
+                                                    "         5  ADD          GF@i=int@0, GF@i=int@0, int@1\n")
+
+
+# BREAK prints the trace after the state of the interpreter every time it runs
+@pytest.mark.parametrize("engine", engines)
+def test_trace_at_break(engine):
+    exit_code, stderr = run_traced(source.replace("GF@i string@x", "string@a string@x\nBREAK"), engine, 2)
+    assert exit_code == 0
+    traces = stderr.split("Trace of the last 2 instructions:\n")[1:]
+    assert [trace.splitlines()[0] for trace in traces] == [
+        "         6  CONCAT       GF@s=uninitialized, string@a, string@x",
+        "         6  CONCAT       GF@s=string@ax, string@a, string@x",
+        "         6  CONCAT       GF@s=string@ax, string@a, string@x",
+    ]
+
+
+def test_long_value():
+    value = tracer.format_argument(interpreter.load(io.BytesIO(build("WRITE GF@s"))).instructions[0].arg1, "a" * 50)
+    assert value == "GF@s=string@" + "a" * 40 + "..."
+
+
+def test_command_line(tmp_path):
+    output, exit_code, stderr = run_command("WRITE int@1\nWRITE int@2\nEXIT int@9", ["--trace", "2"], tmp_path)
+    assert (output, exit_code) == ("12", 9)
+    assert stderr == ""
+    output, exit_code, stderr = run_command("WRITE int@1\nWRITE int@2\nEXIT int@99", ["--trace", "2"], tmp_path)
+    assert (output, exit_code) == ("12", 57)
+    assert stderr.startswith("Trace of the last 2 instructions:\n"
+                             "         2  WRITE        int@2\n"
+                             "         3  EXIT         int@99\n")
+
+
+@pytest.mark.parametrize("arguments, exit_code", [
+    (["--trace", "0"], 10),
+    (["--trace", "2", "--trace-every", "0"], 10),
+    (["--trace", "2", "--profile"], 2),
+])
+def test_wrong_arguments(tmp_path, arguments, exit_code):
+    assert run_command("WRITE int@1", arguments, tmp_path)[:2] == ("", exit_code)
@@ -0,0 +1,46 @@
+import io
+
+import pytest
+
+from support import build, run
+import interpreter
+import translator
+import watchdog
+
+source = """
+    DEFVAR GF@i
+    MOVE GF@i int@0
+    LABEL loop
+    ADD GF@i GF@i int@1
+    JUMPIFNEQ loop GF@i int@10
+    WRITE GF@i
+"""
+
+
+def run_aot(program, watched=None):
+    output = io.BytesIO()
+    exit_code = interpreter.Interpreter("aot", watchdog=watched).run(program, io.BytesIO(), output, io.StringIO())
+    return output.getvalue(), exit_code
+
+
+def test_small_program_is_translated():
+    program = interpreter.load(io.BytesIO(build(source)))
+    assert run_aot(program) == (b"10", 0)
+    assert program.translated is not None
+
+
+# a program over the limit is run by the closure engine (with and without the checks of the limits)
+def test_large_program_is_not_translated(monkeypatch):
+    monkeypatch.setattr(translator, "max_instructions", 4)
+    program = interpreter.load(io.BytesIO(build(source)))
+    assert not translator.is_translated(program)
+    assert run_aot(program) == (b"10", 0)
+    assert run_aot(program, watchdog.Watchdog(max_instructions=1000)) == (b"10", 0)
+    assert program.translated is None and program.watched is None
+
+
+@pytest.mark.parametrize("max_instructions", [4, translator.max_instructions])
+def test_large_program_errors(monkeypatch, max_instructions):
+    monkeypatch.setattr(translator, "max_instructions", max_instructions)
+    assert run(source + "INT2CHAR GF@undefined int@-1", "aot")[:2] == ("10", 58)
+    assert run(source + "JUMP loop", "aot", watchdog=watchdog.Watchdog(max_instructions=100))[1] == 59
@@ -0,0 +1,160 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+import support
+import watchdog
+
+interpret = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "interpret.py")
+
+loop = """
+    DEFVAR GF@i
+    MOVE GF@i int@0
+    LABEL loop
+    ADD GF@i GF@i int@1
+    WRITE GF@i
+    JUMP loop
+"""
+
+recursion = """
+    JUMP main
+    LABEL f
+    CREATEFRAME
+    PUSHFRAME
+    CALL f
+    LABEL main
+    CALL f
+"""
+
+
+def pushes(count):
+    return "\n".join(["PUSHS int@1"] * count)
+
+
+# a program of 3 instructions ends by itself with the limit of 3, but not with 2
+@pytest.mark.parametrize("engine", ["reference", "closure"])
+@pytest.mark.parametrize("limit, exit_code", [(3, 0), (2, 59)])
+def test_max_instructions_exact(engine, limit, exit_code):
+    source = "WRITE int@1\nWRITE int@2\nWRITE int@3"
+    output, code, stderr = support.run(source, engine, watchdog=watchdog.Watchdog(max_instructions=limit))
+    assert code == exit_code
+    assert output == "123"[:limit]
+
+
+@pytest.mark.parametrize("engine", ["reference", "closure"])
+@pytest.mark.parametrize("optimize", [False, True])
+def test_max_instructions_loop(engine, optimize):
+    output, exit_code, stderr = support.run(loop, engine, optimize, watchdog=watchdog.Watchdog(max_instructions=20))
+    assert exit_code == 59
+    assert "Executed instructions: 20" in stderr
+    assert "Number of elements in stack: 0" in stderr
+
+
+# the aot engine stops within one basic block of the limit
+@pytest.mark.parametrize("optimize", [False, True])
+def test_max_instructions_aot(optimize):
+    output, exit_code, stderr = support.run(loop, "aot", optimize, watchdog=watchdog.Watchdog(max_instructions=20))
+    assert exit_code == 59
+    assert len(output) < len("12345678")
+
+
+# the stack can get to the limit, but not over it
+@pytest.mark.parametrize("engine", ["reference", "closure"])
+@pytest.mark.parametrize("optimize", [False, True])
+def test_max_stack_depth(engine, optimize):
+    limits = watchdog.Watchdog(max_stack_depth=10)
+    assert support.run(pushes(10), engine, optimize, watchdog=limits)[1] == 0
+    output, exit_code, stderr = support.run(pushes(11), engine, optimize, watchdog=limits)
+    assert exit_code == 59
+    assert "Number of elements in stack: 10\n" in stderr
+
+
+@pytest.mark.parametrize("engine", ["reference", "closure"])
+@pytest.mark.parametrize("optimize", [False, True])
+def test_max_call_depth(engine, optimize):
+    output, exit_code, stderr = support.run(recursion, engine, optimize, watchdog=watchdog.Watchdog(max_call_depth=50))
+    assert exit_code == 59
+    assert "Number of elements in orders stack: 50\n" in stderr
+
+
+# the frame stack is limited by the call depth too
+@pytest.mark.parametrize("engine", ["reference", "closure"])
+def test_max_call_depth_frames(engine):
+    source = "LABEL loop\nCREATEFRAME\nPUSHFRAME\nJUMP loop"
+    output, exit_code, stderr = support.run(source, engine, watchdog=watchdog.Watchdog(max_call_depth=7))
+    assert exit_code == 59
+    assert "Number of elements in frame stack: 7\n" in stderr
+
+
+# the aot engine checks the stacks at the start of the blocks, so a loop is stopped one push over the limit
+@pytest.mark.parametrize("optimize", [False, True])
+def test_stack_limits_aot(optimize):
+    output, exit_code, stderr = support.run(recursion, "aot", optimize, watchdog=watchdog.Watchdog(max_call_depth=50))
+    assert exit_code == 59
+    assert "Number of elements in orders stack: 51\n" in stderr
+    source = "LABEL loop\nPUSHS int@1\nJUMP loop"
+    output, exit_code, stderr = support.run(source, "aot", optimize, watchdog=watchdog.Watchdog(max_stack_depth=10))
+    assert exit_code == 59
+    assert "Number of elements in stack: 11\n" in stderr
+    assert support.run(pushes(10), "aot", optimize, watchdog=watchdog.Watchdog(max_stack_depth=10))[1] == 0
+
+
+# a program ending by itself has the same number of executed instructions in all the engines (a label is counted
+# when the program gets to it without a jump)
+@pytest.mark.parametrize("source", [
+    "LABEL a\nLABEL b\nWRITE int@1\nJUMP c\nLABEL c\nLABEL d",
+    "CALL f\nLABEL after\nJUMP end\nLABEL f\nRETURN\nLABEL end",
+    "DEFVAR GF@i\nMOVE GF@i int@0\nLABEL l\nADD GF@i GF@i int@1\nJUMPIFEQ x GF@i int@2\nLABEL y\n"
+    "JUMPIFNEQ l GF@i int@4\nLABEL x",
+    "PUSHS int@1\nPUSHS int@1\nJUMPIFEQS a\nLABEL a\nPUSHS int@1\nPUSHS int@2\nJUMPIFEQS b\nLABEL b\nEXIT int@3",
+    loop.replace("JUMP loop", "JUMPIFNEQ loop GF@i int@3"),
+])
+@pytest.mark.parametrize("optimize", [False, True])
+def test_executed_instructions(source, optimize):
+    counts = []
+    for engine in support.engines:
+        limits = watchdog.Watchdog()
+        support.run(source, engine, optimize, watchdog=limits)
+        counts.append(limits.executed)
+    assert counts[0] > 0 and counts == [counts[0]] * len(counts)
+
+
+@pytest.mark.parametrize("engine", support.engines)
+def test_max_time(engine):
+    output, exit_code, stderr = support.run(loop, engine, watchdog=watchdog.Watchdog(max_time=0.05))
+    assert exit_code == 59
+    assert "Execution time: " in stderr
+
+
+# a program ending within the limits runs the same as without them
+@pytest.mark.parametrize("engine", support.engines)
+def test_within_limits(engine):
+    source = "DEFVAR GF@x\n" + pushes(5) + "\nADDS\nPOPS GF@x\nWRITE GF@x\nCALL f\nEXIT int@3\nLABEL f\nRETURN"
+    limits = watchdog.Watchdog(1000, 10.0, 5, 1)
+    assert support.run(source, engine, watchdog=limits)[:2] == ("2", 3)
+
+
+@pytest.mark.parametrize("flag, source, message", [
+    ("--max-instructions=5", loop, "The limit of executed instructions (5) was exceeded!"),
+    ("--max-time=0.05", loop, "The limit of the execution time (0.05 s) was exceeded!"),
+    ("--max-stack-depth=3", pushes(4), "The limit of the data stack depth (3) was exceeded!"),
+    ("--max-call-depth=4", recursion, "The limit of the call depth (4) was exceeded!"),
+])
+def test_command_line(flag, source, message, tmp_path):
+    path = tmp_path / "program.xml"
+    path.write_bytes(support.build(source))
+    process = subprocess.run([sys.executable, interpret, "--source", str(path), flag], stdin=subprocess.DEVNULL,
+                             capture_output=True, text=True)
+    assert process.returncode == 59
+    assert "Current instruction order: " in process.stderr
+    assert process.stderr.endswith(message + "\n")
+
+
+def test_negative_limit(tmp_path):
+    path = tmp_path / "program.xml"
+    path.write_bytes(support.build(loop))
+    process = subprocess.run([sys.executable, interpret, "--source", str(path), "--max-instructions=-1"],
+                             stdin=subprocess.DEVNULL, capture_output=True, text=True)
+    assert process.returncode == 10
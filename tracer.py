@@ -0,0 +1,148 @@
+import collections
+import functools
+import itertools
+
+import instructions as ins
+import memory as mem
+import error
+
+
+# a marker for a variable whose frame does not exist or which is not defined
+UNDEFINED = object()
+
+
+# gets a function reading the current value of the argument without any checks (a trace never fails)
+def make_value_getter(argument, vm):
+    if argument.arg_type != "var":
+        return itertools.repeat(argument.value).__next__
+
+    frame, name = argument.frame, argument.name
+    if name in ins.buffered_names(vm.program):
+        # the character buffer of the variable changes later, so its string is recorded
+        def get_string():
+            variables = getattr(vm, frame)
+            if variables is None:
+                return UNDEFINED
+            value = variables.dictionary.get(name, UNDEFINED)
+            if type(value) is mem.CharBuffer:
+                return value.string()
+            return value
+        return get_string
+
+    if frame == "global_f":
+        # the global frame is the same for the whole run
+        return functools.partial(vm.global_f.dictionary.get, name, UNDEFINED)
+
+    def get_value():
+        variables = getattr(vm, frame)
+        if variables is None:
+            return UNDEFINED
+        return variables.dictionary.get(name, UNDEFINED)
+    return get_value
+
+
+# gets a function returning the values of all the arguments of the instruction as a tuple
+def make_snapshot(getters):
+    if not getters:
+        return tuple
+    if len(getters) == 1:
+        first, = getters
+        return lambda: (first(),)
+    if len(getters) == 2:
+        first, second = getters
+        return lambda: (first(), second())
+    first, second, third = getters
+    return lambda: (first(), second(), third())
+
+
+# formats the argument and its recorded value like the source does (e.g. "GF@x=int@5")
+def format_argument(argument, value, max_length=40):
+    if argument.arg_type in ("label", "type"):
+        return argument.value
+
+    if value is UNDEFINED:
+        text = "undefined"
+    elif value is mem.UNINITIALIZED:
+        text = "uninitialized"
+    else:
+        if value is None:
+            value_type, text = "nil", "nil"
+        elif type(value) == bool:
+            value_type, text = "bool", "true" if value else "false"
+        elif type(value) == int:
+            value_type, text = "int", str(value)
+        else:
+            value_type, text = "string", repr(str(value))[1:-1]
+        if len(text) > max_length:
+            text = text[:max_length] + "..."
+        text = value_type + "@" + text
+
+    if argument.arg_type == "var":
+        return argument.value + "=" + text
+    return text
+
+
+# a class for tracing the program, it runs its own loop (like profiler.Profiler) and keeps the last
+# executed instructions with the values of their operands in a ring buffer of a fixed size,
+# the buffer is printed when the program ends by an error or at BREAK
+class Tracer:
+    def __init__(self, size, every=1):
+        self.size = size  # number of the kept instructions
+        self.every = every  # only every k-th executed instruction is recorded
+        self.records = collections.deque(maxlen=size)  # (index of the instruction, values of the operands)
+        self.arguments = []  # index of the instruction : its arguments
+
+    def run(self, vm, code):
+        instructions = vm.program.instructions
+        code_length = len(code)
+        records = self.records
+        records.clear()
+
+        self.arguments = [[getattr(instruction, name) for name in ("arg1", "arg2", "arg3")
+                           if hasattr(instruction, name)] for instruction in instructions]
+        snapshots = [make_snapshot([make_value_getter(argument, vm) for argument in arguments])
+                     for arguments in self.arguments]
+        breaks = [isinstance(instruction, ins.Break) for instruction in instructions]
+
+        every = self.every
+        countdown = 1
+        # the limits are checked like in Interpreter.run_watched (-1 never counts down to a check)
+        watchdog = vm.watchdog
+        steps = -1 if watchdog is None else watchdog.start()
+        try:
+            while vm.pc < code_length:
+                if not steps:
+                    steps = watchdog.check(vm)
+                steps -= 1
+                pc = vm.pc
+                countdown -= 1
+                if not countdown:
+                    countdown = every
+                    # the values are recorded before the instruction runs, so a failing instruction is the last one
+                    records.append((pc, snapshots[pc]()))
+                code[pc]()
+                if breaks[pc]:
+                    self.dump(vm)
+                vm.pc += 1
+        except error.InterpretError:
+            self.dump(vm)
+            raise
+        finally:
+            if watchdog is not None:
+                watchdog.stop(steps)
+
+    # prints the recorded instructions from the oldest one
+    def dump(self, vm):
+        vm.output.flush()  # everything written before has to be printed before this
+        instructions = vm.program.instructions
+        if self.every == 1:
+            vm.stderr.write("Trace of the last {} instructions:\n".format(len(self.records)))
+        else:
+            vm.stderr.write("Trace of the last {} instructions (every {}. one):\n".format(
+                len(self.records), self.every))
+        for pc, values in self.records:
+            instruction = instructions[pc]
+            operands = ", ".join(format_argument(argument, value)
+                                 for argument, value in zip(self.arguments[pc], values))
+            vm.stderr.write("  {:>8}  {:<12} {}\n".format(instruction.order, type(instruction).__name__.upper(),
+                                                          operands))
@@ -0,0 +1,627 @@
+import instructions as ins
+import memory as mem
+import error
+
+
+# a value of promoted global variables that were not defined yet
+UNDEFINED = object()
+
+# instructions whose "do" method does not touch any variables
+frame_neutral = (ins.CreateFrame, ins.PushFrame, ins.PopFrame)
+
+# instructions that end a basic block
+block_ending = (ins.Jump, ins.JumpIfEq, ins.JumpIfNEq, ins.JumpIfEqS, ins.JumpIfNEqS, ins.Call, ins.Return)
+
+# the most instructions of a translated program, compiling the translation takes about 0.1 ms and 30 KiB
+# of memory for each instruction (a hundred times more than running it once), so a larger program is run
+# by the closure engine instead (see is_translated)
+max_instructions = 2000
+
+
+# a helper function for getting the instructions a fused instruction was made of (or the instruction itself),
+# the parts are translated one after another, so fusing makes no difference in the translated code
+def parts(instruction):
+    return getattr(instruction, "parts", (instruction,))
+
+
+# a helper function for getting the name of the type of a value (used by TYPE)
+def type_name(value):
+    if value is None:
+        return "nil"
+    elif type(value) == int:
+        return "int"
+    elif type(value) == bool:
+        return "bool"
+    elif type(value) == str:
+        return "string"
+
+
+# a class for translating the whole program into the source of one Python function,
+# basic blocks between labels and jumps become branches of a dispatch loop over the block number
+# and if every instruction is translated, global variables become locals of the function
+# (a watched function checks the limits of watchdog.Watchdog at the start of the blocks)
+class Translator:
+    def __init__(self, program, watched=False):
+        self.program = program.instructions
+        self.watched = watched
+        self.labels = program.labels
+        self.lines = []  # lines of the generated source
+        self.indentation = 0
+        self.temporaries = 0  # number of temporary variables used so far
+        self.locals = {}  # name of a global variable : name of its Python local
+        self.constants = {}  # source of a constant : name of its Python local
+        self.buffered = ins.buffered_names(program)  # names of the variables that can hold a CharBuffer
+
+        # all the methods translating instructions, other instructions run their "do" method
+        self.translations = {
+            ins.Move: self.translate_move,
+            ins.DefVar: self.translate_defvar,
+            ins.Call: self.translate_call,
+            ins.Return: self.translate_return,
+            ins.PushS: self.translate_pushs,
+            ins.PopS: self.translate_pops,
+            ins.Add: lambda instruction, index: self.translate_arithmetic(instruction, "+"),
+            ins.Sub: lambda instruction, index: self.translate_arithmetic(instruction, "-"),
+            ins.Mul: lambda instruction, index: self.translate_arithmetic(instruction, "*"),
+            ins.IDiv: self.translate_idiv,
+            ins.Lt: lambda instruction, index: self.translate_relational(instruction, "<"),
+            ins.Gt: lambda instruction, index: self.translate_relational(instruction, ">"),
+            ins.Eq: self.translate_eq,
+            ins.And: lambda instruction, index: self.translate_logical(instruction, "and"),
+            ins.Or: lambda instruction, index: self.translate_logical(instruction, "or"),
+            ins.Not: self.translate_not,
+            ins.Int2Char: self.translate_int2char,
+            ins.Stri2Int: self.translate_stri2int,
+            ins.Read: self.translate_read,
+            ins.Write: self.translate_write,
+            ins.Concat: self.translate_concat,
+            ins.StrLen: self.translate_strlen,
+            ins.GetChar: self.translate_getchar,
+            ins.SetChar: self.translate_setchar,
+            ins.Type: self.translate_type,
+            ins.Label: lambda instruction, index: None,
+            ins.Jump: self.translate_jump,
+            ins.JumpIfEq: lambda instruction, index: self.translate_conditional_jump(instruction, "=="),
+            ins.JumpIfNEq: lambda instruction, index: self.translate_conditional_jump(instruction, "!="),
+            ins.Exit: self.translate_exit,
+            ins.ClearS: lambda instruction, index: self.emit("S.clear()"),
+            ins.AddS: lambda instruction, index: self.translate_stack_arithmetic(instruction, "+"),
+            ins.SubS: lambda instruction, index: self.translate_stack_arithmetic(instruction, "-"),
+            ins.MulS: lambda instruction, index: self.translate_stack_arithmetic(instruction, "*"),
+            ins.IDivS: self.translate_idivs,
+            ins.LtS: lambda instruction, index: self.translate_stack_relational(instruction, "<"),
+            ins.GtS: lambda instruction, index: self.translate_stack_relational(instruction, ">"),
+            ins.EqS: self.translate_eqs,
+            ins.AndS: lambda instruction, index: self.translate_stack_logical(instruction, "and"),
+            ins.OrS: lambda instruction, index: self.translate_stack_logical(instruction, "or"),
+            ins.NotS: self.translate_nots,
+            ins.Int2CharS: self.translate_int2chars,
+            ins.Stri2IntS: self.translate_stri2ints,
+            ins.JumpIfEqS: lambda instruction, index: self.translate_stack_conditional_jump(instruction, "=="),
+            ins.JumpIfNEqS: lambda instruction, index: self.translate_stack_conditional_jump(instruction, "!="),
+        }
+
+        # global variables can live in Python locals only if no "do" method can look at the global frame
+        self.promote = all(self.translation(part) is not None or isinstance(part, frame_neutral)
+                           for instruction in self.program for part in parts(instruction))
+
+        # the first instructions of the basic blocks
+        leaders = {0}
+        for index, instruction in enumerate(self.program):
+            if isinstance(instruction, ins.Label):
+                leaders.add(index)
+            elif isinstance(parts(instruction)[-1], block_ending):
+                leaders.add(index + 1)
+        self.leaders = sorted(leader for leader in leaders if leader < len(self.program))
+
+        # position of the first instruction of a block : number of the block (the end is one more block)
+        self.block_of = {leader: number for number, leader in enumerate(self.leaders)}
+        self.block_of[len(self.program)] = len(self.leaders)
+
+    # gets the method translating the instruction or None (the unchecked variants use the method of the
+    # instruction they are made from)
+    def translation(self, instruction):
+        for instruction_class in type(instruction).__mro__:
+            if instruction_class in self.translations:
+                return self.translations[instruction_class]
+        return None
+
+    # adds a line of the generated source with the current indentation
+    def emit(self, line):
+        self.lines.append("    " * self.indentation + line)
+
+    # gets a name for a new temporary variable
+    def temporary(self):
+        self.temporaries += 1
+        return "t" + str(self.temporaries)
+
+    # gets the name of the Python local of a promoted global variable
+    def local(self, name):
+        if name not in self.locals:
+            self.locals[name] = "v" + str(len(self.locals))
+        return self.locals[name]
+
+    # checks if the variable lives in a Python local
+    def is_promoted(self, var):
+        return self.promote and var.frame == "global_f"
+
+    # emits the check of the frame of a variable and gets an expression with the Frame object
+    def frame(self, var):
+        if var.frame == "global_f":
+            return "GF"
+        frame = self.temporary()
+        self.emit(frame + " = vm." + var.frame)
+        self.emit("if " + frame + " is None:")
+        self.emit("    fail(\"The frame does not exists!\", 55)")
+        return frame
+
+    # emits the reading of a symbol and gets an expression with its value
+    # (with buffer, a string in a character buffer stays in it, see memory.CharBuffer)
+    def read(self, symbol, buffer=False):
+        # constants are assigned to Python locals once before the dispatch loop
+        if symbol.arg_type != "var":
+            constant = repr(symbol.value)
+            if constant not in self.constants:
+                self.constants[constant] = "c" + str(len(self.constants))
+            return self.constants[constant]
+
+        if self.is_promoted(symbol):
+            local = self.local(symbol.name)
+            self.emit("if " + local + " is UNINITIALIZED or " + local + " is UNDEFINED:")
+            self.emit("    fail(\"The variable does not exist!\", 54)")
+            if not buffer and symbol.name in self.buffered:
+                self.emit("if type(" + local + ") is CharBuffer:")
+                self.emit("    " + local + " = " + local + ".string()")
+            return local
+
+        frame = self.frame(symbol)
+        dictionary = "G" if frame == "GF" else frame + ".dictionary"
+        value = self.temporary()
+        self.emit(value + " = " + dictionary + ".get(" + repr(symbol.name) + ", UNINITIALIZED)")
+        self.emit("if " + value + " is UNINITIALIZED:")
+        self.emit("    fail(\"The variable does not exist!\", 54)")
+        if not buffer and symbol.name in self.buffered:
+            self.emit("if type(" + value + ") is CharBuffer:")
+            self.emit("    " + value + " = " + dictionary + "[" + repr(symbol.name) + "] = " + value + ".string()")
+        return value
+
+    # emits the check of the frame of a destination variable and gets a target for store()
+    def target(self, var):
+        if self.is_promoted(var):
+            return self.local(var.name), None
+        frame = self.frame(var)
+        return ("G" if frame == "GF" else frame + ".dictionary"), var.name
+
+    # emits the storing of an expression into a target variable
+    def store(self, target, expression):
+        dictionary, name = target
+        if name is None:
+            self.emit("if " + dictionary + " is UNDEFINED:")
+            self.emit("    fail(\"The variable does not exist!\", 54)")
+            self.emit(dictionary + " = " + expression)
+        else:
+            self.emit("if " + repr(name) + " in " + dictionary + ":")
+            self.emit("    " + dictionary + "[" + repr(name) + "] = " + expression)
+            self.emit("else:")
+            self.emit("    fail(\"The variable does not exist!\", 54)")
+
+    # emits the setting of the next block to the block of a label (undefined labels fail when used)
+    def jump_to(self, label):
+        if label.value in self.labels.dictionary:
+            if self.watched:
+                self.emit("steps += 1")  # the label starting the block is counted, but a jump skips it
+            self.emit("block = " + str(self.block_of[self.labels.dictionary[label.value]]))
+        else:
+            self.emit("vm.labels.get(" + repr(label.value) + ")")
+
+    # emits the popping of the symbols of a stack instruction and gets the names of their temporaries
+    # (the second symbol is on the top)
+    def pop(self, count):
+        values = [self.temporary() for _ in range(count)]
+        self.emit("if len(S) < " + str(count) + ":")
+        self.emit("    fail(\"The stack is empty!\", 56)")
+        for value in reversed(values):
+            self.emit(value + " = S.pop()")
+        return values
+
+    # emits a check of the types of two symbols, both must have the given type
+    # (not for the unchecked variants, their types were proven by the type inference)
+    # (STRINGS are the types with a string, a str or a character buffer)
+    def check_types(self, instruction, value1, value2, type1, type2):
+        if not instruction.checked:
+            return
+        self.emit("if type(" + value1 + (") not in " if type1 == "STRINGS" else ") != ") + type1
+                  + " or type(" + value2 + ") != " + type2 + ":")
+        self.emit("    fail(\"Wrong operand type!\", 53)")
+
+    # TRANSLATIONS OF THE INSTRUCTIONS (they return True if they set the next block):
+
+    def translate_move(self, instruction, index):
+        target = self.target(instruction.arg1)
+        self.store(target, self.read(instruction.arg2))
+
+    def translate_defvar(self, instruction, index):
+        if self.is_promoted(instruction.arg1):
+            local = self.local(instruction.arg1.name)
+            self.emit("if " + local + " is not UNDEFINED:")
+            self.emit("    fail(\"Redefinition of a variable!\", 52)")
+            self.emit(local + " = UNINITIALIZED")
+        else:
+            self.emit(self.frame(instruction.arg1) + ".create(" + repr(instruction.arg1.name) + ")")
+
+    def translate_call(self, instruction, index):
+        self.emit("O.append(" + str(index) + ")")
+        self.jump_to(instruction.arg1)
+        return True
+
+    def translate_return(self, instruction, index):
+        self.emit("if len(O) == 0:")
+        self.emit("    fail(\"The stack is empty!\", 56)")
+        self.emit("block = block_of[O.pop() + 1]")
+        return True
+
+    def translate_pushs(self, instruction, index):
+        self.emit("S.append(" + self.read(instruction.arg1) + ")")
+
+    def translate_pops(self, instruction, index):
+        target = self.target(instruction.arg1)
+        self.emit("if len(S) == 0:")
+        self.emit("    fail(\"The stack is empty!\", 56)")
+        self.store(target, "S.pop()")
+
+    def translate_arithmetic(self, instruction, operator):
+        target = self.target(instruction.arg1)
+        value1 = self.read(instruction.arg2)
+        value2 = self.read(instruction.arg3)
+        self.check_types(instruction, value1, value2, "int", "int")
+        self.store(target, value1 + " " + operator + " " + value2)
+
+    def translate_idiv(self, instruction, index):
+        target = self.target(instruction.arg1)
+        value1 = self.read(instruction.arg2)
+        value2 = self.read(instruction.arg3)
+        self.check_types(instruction, value1, value2, "int", "int")
+        self.emit("if " + value2 + " == 0:")
+        self.emit("    fail(\"Division by zero!\", 57)")
+        self.store(target, value1 + " // " + value2)
+
+    def translate_relational(self, instruction, operator):
+        target = self.target(instruction.arg1)
+        value1 = self.read(instruction.arg2)
+        value2 = self.read(instruction.arg3)
+        if instruction.checked:
+            self.emit("if " + value1 + " is None or " + value2 + " is None:")
+            self.emit("    fail(\"Cannot compare with nil@nil\", 53)")
+            self.emit("elif not type(" + value1 + ") == type(" + value2 + "):")
+            self.emit("    fail(\"Cannot compare operands with different types!\", 53)")
+        self.store(target, value1 + " " + operator + " " + value2)
+
+    def translate_eq(self, instruction, index):
+        target = self.target(instruction.arg1)
+        value1 = self.read(instruction.arg2)
+        value2 = self.read(instruction.arg3)
+        if instruction.checked:
+            self.emit("if not type(" + value1 + ") == type(" + value2 + ") and " + value1 + " is not None and "
+                      + value2 + " is not None:")
+            self.emit("    fail(\"Cannot compare operands with different types!\", 53)")
+        self.store(target, value1 + " == " + value2)
+
+    def translate_logical(self, instruction, operator):
+        target = self.target(instruction.arg1)
+        value1 = self.read(instruction.arg2)
+        value2 = self.read(instruction.arg3)
+        self.check_types(instruction, value1, value2, "bool", "bool")
+        self.store(target, "(" + value1 + " " + operator + " " + value2 + ")")
+
+    def translate_not(self, instruction, index):
+        target = self.target(instruction.arg1)
+        value = self.read(instruction.arg2)
+        if instruction.checked:
+            self.emit("if type(" + value + ") != bool:")
+            self.emit("    fail(\"Wrong operand type!\", 53)")
+        self.store(target, "not " + value)
+
+    def translate_int2char(self, instruction, index):
+        target = self.target(instruction.arg1)
+        value = self.read(instruction.arg2)
+        self.emit("if type(" + value + ") != int:")
+        self.emit("    fail(\"Wrong operand type!\", 53)")
+        # the character is made before the variable is checked (like in instructions.Int2Char)
+        character = self.temporary()
+        self.emit("try:")
+        self.emit("    " + character + " = chr(" + value + ")")
+        self.emit("except ValueError:")
+        self.emit("    fail(\"Non valid value!\", 58)")
+        self.store(target, character)
+
+    def translate_stri2int(self, instruction, index):
+        target = self.target(instruction.arg1)
+        value1 = self.read(instruction.arg2, buffer=True)
+        value2 = self.read(instruction.arg3)
+        self.check_types(instruction, value1, value2, "STRINGS", "int")
+        self.emit("if " + value2 + " >= len(" + value1 + "):")
+        self.emit("    fail(\"Index out of range!\", 58)")
+        # the character is taken before the variable is checked (like in instructions.Stri2Int)
+        code = self.temporary()
+        self.emit(code + " = ord(" + value1 + "[" + value2 + "])")
+        self.store(target, code)
+
+    def translate_read(self, instruction, index):
+        target = self.target(instruction.arg1)
+        self.store(target, "read_value(vm, " + repr(instruction.arg2.value) + ")")
+
+    def translate_write(self, instruction, index):
+        self.emit("write_value(vm, " + self.read(instruction.arg1) + ")")
+
+    def translate_concat(self, instruction, index):
+        target = self.target(instruction.arg1)
+        value1 = self.read(instruction.arg2)
+        value2 = self.read(instruction.arg3)
+        self.check_types(instruction, value1, value2, "str", "str")
+        dictionary, name = target
+        if instruction.appends() and name is not None:
+            # the variable drops its string first (see instructions.Concat), a promoted variable is a Python
+            # local, so it is appended to in place without this
+            self.emit(dictionary + "[" + repr(name) + "] = None")
+            self.emit(value1 + " += " + value2)
+            self.emit(dictionary + "[" + repr(name) + "] = " + value1)
+        else:
+            self.store(target, value1 + " + " + value2)
+
+    def translate_strlen(self, instruction, index):
+        target = self.target(instruction.arg1)
+        value = self.read(instruction.arg2, buffer=True)
+        if instruction.checked:
+            self.emit("if type(" + value + ") not in STRINGS:")
+            self.emit("    fail(\"Wrong operand type!\", 53)")
+        self.store(target, "len(" + value + ")")
+
+    def translate_getchar(self, instruction, index):
+        target = self.target(instruction.arg1)
+        value1 = self.read(instruction.arg2, buffer=True)
+        value2 = self.read(instruction.arg3)
+        self.check_types(instruction, value1, value2, "STRINGS", "int")
+        self.emit("if " + value2 + " >= len(" + value1 + "):")
+        self.emit("    fail(\"Index out of range!\", 58)")
+        # the character is taken before the variable is checked (like in instructions.GetChar)
+        character = self.temporary()
+        self.emit(character + " = " + value1 + "[" + value2 + "]")
+        self.store(target, character)
+
+    def translate_setchar(self, instruction, index):
+        target = self.target(instruction.arg1)
+        value1 = self.read(instruction.arg1, buffer=True)
+        value2 = self.read(instruction.arg2)
+        value3 = self.read(instruction.arg3)
+        self.emit("if type(" + value1 + ") not in STRINGS or type(" + value2 + ") != int or type(" + value3
+                  + ") != str:")
+        self.emit("    fail(\"Wrong operand type!\", 53)")
+        self.emit("elif " + value2 + " >= len(" + value1 + ") or " + value3 + " == \"\":")
+        self.emit("    fail(\"Wrong operation with strings!\", 58)")
+        # the string is changed in the character buffer of the variable (see instructions.SetChar)
+        self.emit("if type(" + value1 + ") is not CharBuffer:")
+        self.emit("    " + value1 + " = CharBuffer(" + value1 + ")")
+        self.emit(value1 + ".set_char(" + value2 + ", " + value3 + ")")
+        self.store(target, value1)
+
+    def translate_type(self, instruction, index):
+        target = self.target(instruction.arg1)
+        symbol = instruction.arg2
+        if symbol.arg_type != "var":
+            self.store(target, repr(type_name(symbol.value)))
+            return
+
+        # uninitialized variables have an empty string as their type
+        if self.is_promoted(symbol):
+            self.emit("if " + self.local(symbol.name) + " is UNINITIALIZED:")
+        else:
+            self.emit("if " + self.frame(symbol) + ".is_uninitialized(" + repr(symbol.name) + "):")
+        self.indentation += 1
+        self.store(target, "\"\"")
+        self.indentation -= 1
+        self.emit("else:")
+        self.indentation += 1
+        self.store(target, "type_name(" + self.read(symbol) + ")")
+        self.indentation -= 1
+
+    def translate_jump(self, instruction, index):
+        self.jump_to(instruction.arg1)
+        return True
+
+    def translate_conditional_jump(self, instruction, operator):
+        value1 = self.read(instruction.arg2)
+        value2 = self.read(instruction.arg3)
+        if instruction.checked:
+            self.emit("if not type(" + value1 + ") == type(" + value2 + ") and " + value1 + " is not None and "
+                      + value2 + " is not None:")
+            self.emit("    fail(\"Wrong operand type!\", 53)")
+        self.emit("if " + value1 + " " + operator + " " + value2 + ":")
+        self.indentation += 1
+        self.jump_to(instruction.arg1)
+        self.indentation -= 1
+        self.emit("else:")
+        self.emit("    block += 1")
+        return True
+
+    def translate_exit(self, instruction, index):
+        value = self.read(instruction.arg1)
+        self.emit("if type(" + value + ") != int:")
+        self.emit("    fail(\"Wrong operand type!\", 53)")
+        self.emit("if " + value + " < 0 or " + value + " > 49:")
+        self.emit("    fail(\"Wrong operand value!\", 57)")
+        self.emit("raise ProgramExit(" + value + ")")
+
+    def translate_stack_arithmetic(self, instruction, operator):
+        value1, value2 = self.pop(2)
+        self.check_types(instruction, value1, value2, "int", "int")
+        self.emit("S.append(" + value1 + " " + operator + " " + value2 + ")")
+
+    def translate_idivs(self, instruction, index):
+        value1, value2 = self.pop(2)
+        self.check_types(instruction, value1, value2, "int", "int")
+        self.emit("if " + value2 + " == 0:")
+        self.emit("    fail(\"Division by zero!\", 57)")
+        self.emit("S.append(" + value1 + " // " + value2 + ")")
+
+    def translate_stack_relational(self, instruction, operator):
+        value1, value2 = self.pop(2)
+        self.emit("if " + value1 + " is None or " + value2 + " is None:")
+        self.emit("    fail(\"Cannot compare with nil@nil\", 53)")
+        self.emit("elif not type(" + value1 + ") == type(" + value2 + "):")
+        self.emit("    fail(\"Cannot compare operands with different types!\", 53)")
+        self.emit("S.append(" + value1 + " " + operator + " " + value2 + ")")
+
+    def translate_eqs(self, instruction, index):
+        value1, value2 = self.pop(2)
+        self.emit("if not type(" + value1 + ") == type(" + value2 + ") and " + value1 + " is not None and "
+                  + value2 + " is not None:")
+        self.emit("    fail(\"Cannot compare operands with different types!\", 53)")
+        self.emit("S.append(" + value1 + " == " + value2 + ")")
+
+    def translate_stack_logical(self, instruction, operator):
+        value1, value2 = self.pop(2)
+        self.check_types(instruction, value1, value2, "bool", "bool")
+        self.emit("S.append(" + value1 + " " + operator + " " + value2 + ")")
+
+    def translate_nots(self, instruction, index):
+        value, = self.pop(1)
+        self.emit("if type(" + value + ") != bool:")
+        self.emit("    fail(\"Wrong operand type!\", 53)")
+        self.emit("S.append(not " + value + ")")
+
+    def translate_int2chars(self, instruction, index):
+        value, = self.pop(1)
+        self.emit("if type(" + value + ") != int:")
+        self.emit("    fail(\"Wrong operand type!\", 53)")
+        self.emit("try:")
+        self.emit("    S.append(chr(" + value + "))")
+        self.emit("except ValueError:")
+        self.emit("    fail(\"Non valid value!\", 58)")
+
+    def translate_stri2ints(self, instruction, index):
+        value1, value2 = self.pop(2)
+        self.check_types(instruction, value1, value2, "str", "int")
+        self.emit("if " + value2 + " >= len(" + value1 + "):")
+        self.emit("    fail(\"Index out of range!\", 58)")
+        self.emit("S.append(ord(" + value1 + "[" + value2 + "]))")
+
+    def translate_stack_conditional_jump(self, instruction, operator):
+        value1, value2 = self.pop(2)
+        self.emit("if not type(" + value1 + ") == type(" + value2 + ") and " + value1 + " is not None and "
+                  + value2 + " is not None:")
+        self.emit("    fail(\"Wrong operand type!\", 53)")
+        self.emit("if " + value1 + " " + operator + " " + value2 + ":")
+        self.indentation += 1
+        self.jump_to(instruction.arg1)
+        self.indentation -= 1
+        self.emit("else:")
+        self.emit("    block += 1")
+        return True
+
+    # emits all instructions of a block and the setting of the next block
+    def translate_block(self, number):
+        if number == len(self.leaders):
+            self.emit("return")
+            return
+
+        start = self.leaders[number]
+        end = self.leaders[number + 1] if number + 1 < len(self.leaders) else len(self.program)
+        # the whole block is counted before it runs, the limits are checked when the allowed steps would run out
+        # (with a label starting the block, the jumps to the label give its step back)
+        length = end - start
+        if self.watched and length:
+            self.emit("if steps < " + str(length) + ":")
+            self.emit("    vm.pc = " + str(start))
+            self.emit("    steps = W.check(vm, steps)")
+            self.emit("steps -= " + str(length))
+        jumped = False
+        for index in range(start, end):
+            instruction = self.program[index]
+            for position, part in enumerate(parts(instruction)):
+                translation = self.translation(part)
+                if translation is None:
+                    # the program counter is set for instructions that print it (BREAK)
+                    self.emit("vm.pc = " + str(index))
+                    if part is instruction:
+                        self.emit("P[" + str(index) + "].do(vm)")
+                    else:
+                        self.emit("P[" + str(index) + "].parts[" + str(position) + "].do(vm)")
+                else:
+                    jumped = translation(part, index)
+        if not jumped:
+            self.emit("block = " + str(number + 1))
+
+    # emits branches for blocks with numbers from first up to (not including) last as a binary search tree
+    def translate_blocks(self, first, last):
+        if last - first == 1:
+            self.translate_block(first)
+            return
+
+        middle = (first + last) // 2
+        self.emit("if block < " + str(middle) + ":")
+        self.indentation += 1
+        self.translate_blocks(first, middle)
+        self.indentation -= 1
+        self.emit("else:")
+        self.indentation += 1
+        self.translate_blocks(middle, last)
+        self.indentation -= 1
+
+    # generates the source of the "run" function executing the whole program in an interpreter
+    def translate(self):
+        self.emit("def run(vm):")
+        self.indentation += 1
+        self.emit("GF = vm.global_f")
+        self.emit("G = GF.dictionary")
+        self.emit("S = vm.stack.list")
+        self.emit("O = vm.order_stack.list")
+        self.emit("block = 0")
+        body_start = len(self.lines)
+        if self.watched:
+            self.emit("W = vm.watchdog")
+            self.emit("steps = W.start()")
+            self.emit("try:")
+            self.indentation += 1
+        self.emit("while True:")
+        self.indentation += 1
+        self.translate_blocks(0, len(self.leaders) + 1)
+        if self.watched:
+            # the promoted global variables go back into the global frame for the statistics of the run
+            self.indentation -= 2
+            self.emit("finally:")
+            self.emit("    W.stop(steps)")
+            for name, local in self.locals.items():
+                self.emit("    if " + local + " is not UNDEFINED:")
+                self.emit("        G[" + repr(name) + "] = " + local)
+
+        # all promoted global variables start undefined
+        self.lines[body_start:body_start] = (["    " + local + " = UNDEFINED" for local in self.locals.values()]
+                                             + ["    " + local + " = " + constant
+                                                for constant, local in self.constants.items()])
+        return "\n".join(self.lines) + "\n"
+
+
+# a helper function for telling if the aot engine translates the program (or runs it by the closure engine)
+def is_translated(program):
+    return len(program.instructions) <= max_instructions
+
+
+# translates the program into a Python function and returns it (the function takes the Interpreter to run in)
+def translate(program, watched=False):
+    translator = Translator(program, watched)
+    source = translator.translate()
+    namespace = {
+        "fail": error.error_exit,
+        "ProgramExit": error.ProgramExit,
+        "UNINITIALIZED": mem.UNINITIALIZED,
+        "UNDEFINED": UNDEFINED,
+        "CharBuffer": mem.CharBuffer,
+        "STRINGS": ins.string_types,
+        "P": program.instructions,
+        "block_of": translator.block_of,
+        "read_value": ins.read_value,
+        "write_value": ins.write_value,
+        "type_name": type_name,
+    }
+    exec(compile(source, "<ippcode23>", "exec"), namespace)
+    return namespace["run"]
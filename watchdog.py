@@ -0,0 +1,84 @@
+import time
+
+import instructions as ins
+import error
+
+
+# a class for the limits of a running program (so an untrusted program cannot run forever or take all the memory),
+# the loops count the instructions down and call "check" only when the count reaches zero, the number of
+# instructions to the next check is at most the interval and never more than the instructions a limit allows
+# (each instruction grows a stack by at most one item, a full stack is checked before every instruction),
+# so the reference and closure engines stop exactly before the first instruction over a limit and the aot
+# engine (checking at the start of the basic blocks) within one block of it
+class Watchdog:
+    interval = 4096  # the most instructions between two checks (the time is checked this often)
+
+    # the instructions pushing into the data stack, the orders stack and the frame stack
+    pushing_values = (ins.PushS,)
+    pushing_orders = (ins.Call, ins.CallFrame)
+    pushing_frames = (ins.PushFrame, ins.CallFrame)
+
+    def __init__(self, max_instructions=None, max_time=None, max_stack_depth=None, max_call_depth=None):
+        self.max_instructions = max_instructions  # number of executed instructions
+        self.max_time = max_time  # seconds of the execution
+        self.max_stack_depth = max_stack_depth  # number of values in the data stack
+        self.max_call_depth = max_call_depth  # number of nested calls (the orders stack and the frame stack)
+        self.executed = 0  # number of the instructions executed before the last check
+        self.steps = 0  # number of the instructions allowed by the last check
+        self.start_time = 0.0
+
+    # prepares the checks of a new run, returns the number of instructions to the first check (zero, the loops
+    # check before their first instruction)
+    def start(self):
+        self.executed = 0
+        self.steps = 0
+        self.start_time = time.perf_counter()
+        return 0
+
+    # adds the instructions executed since the last check (the loops call it however they end)
+    def stop(self, steps):
+        self.executed += self.steps - steps
+        self.steps = steps
+
+    # checks the limits before the instruction at vm.pc and returns the number of instructions to the next check
+    def check(self, vm, steps=0):
+        self.executed += self.steps - steps
+        self.steps = steps
+        interval = Watchdog.interval
+
+        if self.max_instructions is not None:
+            if self.executed >= self.max_instructions:
+                self.breach(vm, "The limit of executed instructions ({}) was exceeded!".format(self.max_instructions))
+            interval = min(interval, self.max_instructions - self.executed)
+        if self.max_time is not None and time.perf_counter() - self.start_time > self.max_time:
+            self.breach(vm, "The limit of the execution time ({} s) was exceeded!".format(self.max_time))
+        if self.max_stack_depth is not None:
+            interval = min(interval, self.headroom(vm, len(vm.stack.list), self.max_stack_depth,
+                                                   Watchdog.pushing_values,
+                                                   "The limit of the data stack depth ({}) was exceeded!"))
+        if self.max_call_depth is not None:
+            message = "The limit of the call depth ({}) was exceeded!"
+            interval = min(interval,
+                           self.headroom(vm, len(vm.order_stack.list), self.max_call_depth, Watchdog.pushing_orders,
+                                         message),
+                           self.headroom(vm, len(vm.frame_stack.list) - 1, self.max_call_depth,
+                                         Watchdog.pushing_frames, message))
+
+        self.steps = interval
+        return interval
+
+    # gets the number of instructions that cannot make the stack deeper than the limit, a full stack stops
+    # the program before an instruction pushing into it (only the aot engine can get over the limit)
+    def headroom(self, vm, depth, limit, pushing, message):
+        if depth > limit or (depth == limit and isinstance(vm.program.instructions[vm.pc], pushing)):
+            self.breach(vm, message.format(limit))
+        return max(limit - depth, 1)
+
+    # prints where the program stopped (like BREAK) and ends it with the error
+    def breach(self, vm, message):
+        vm.output.flush()  # everything written before has to be printed before this
+        print("Current instruction order: " + str(vm.program.instructions[vm.pc].order), file=vm.stderr)
+        print("Executed instructions: " + str(self.executed), file=vm.stderr)
+        print("Execution time: {:.3f} s".format(time.perf_counter() - self.start_time), file=vm.stderr)
+        ins.print_stack_sizes(vm)
+        error.error_exit(message, 59)